@@ -1,8 +1,8 @@
-import pendulum, asyncio, re, logging, time
+import pendulum, asyncio, re, logging
 from datetime import datetime, timedelta
 from pathlib import Path
-from c2dwh.utils import csv_reader, athena_sql_executor
-from c2dwh.webcrawler import Crawler, Scraper
+from c2dwh.utils import csv_iter, s3_prefix_lister, s3_object_lister, AthenaExecutor, QueryCache
+from c2dwh.webcrawler import Crawler, Scraper, RateLimiter, Canonicalizer, Transport, Metrics
 from airflow.sdk import DAG
 from airflow.providers.standard.operators.bash import BashOperator
 from airflow.providers.standard.operators.python import (
@@ -16,10 +16,16 @@ from airflow.providers.standard.operators.python import (
 ** ALL PATHS BEING USED IN DAGS ARE FROM AIRFLOW IMAGE, DOUBLE-CHECK IN DOCKER-COMPOSE OR DOCKERFILE.
 ** EDIT logging_level IN airflow.cfg FOR MORE DETAILS IF NEEDED.
 ** SET chunksize AND Semaphore VALUE CAREFULLY TO AVOID BEING BANNED BY WEBSITE.
+** RateLimiter KEEPS REQUESTS PER SECOND UNDER WHAT THE SITE TOLERATES AND BACKS OFF ON 429/503.
+** DROP BRONZE TABLES ONCE WHEN SWITCHING bronze_format, BOTH FORMATS SHARE SAME TABLE NAMES.
+** partition_projection NEEDS PROJECTION TBLPROPERTIES, RECREATE BRONZE TABLES MADE BEFORE THEY WERE ADDED TO DDL.
 """
 
 local_tz = pendulum.timezone("Asia/Ho_Chi_Minh")
 log = logging.getLogger("airflow_task")
+bronze_format = "csv"  # or parquet for typed columnar bronze files
+partition_projection = True  # False adds partitions found on S3 with alter table
+athena_cache = "/home/data/athena_cache.db"  # pass QueryCache(athena_cache) to ad-hoc athena queries
 
 
 def crawling_work(upload_to_s3: bool = False):
@@ -40,6 +46,10 @@ def crawling_work(upload_to_s3: bool = False):
         save_in="/home/data/crawled",
         upload_to_s3=upload_to_s3,
         s3_attrs={"bucket": "crawling-to-dwh", "obj_prefix": "crawled/"},
+        frontier="/home/data/crawled/thegioididong_frontier.db",  # resume on task retries
+        validator_cache="/home/data/crawled/thegioididong_validators.db",  # skip unchanged pages
+        # product pages are identified by path only, listing pages of the link-walk fallback also by page number
+        canonicalizer=Canonicalizer(keep_params=("page", "p", "pi")),
     )
 
     asyncio.run(
@@ -47,6 +57,11 @@ def crawling_work(upload_to_s3: bool = False):
             timeout=20.0,
             chunksize=5,
             semaphore=asyncio.Semaphore(5),
+            rate_limiter=RateLimiter(rate=2.0, burst=5),
+            discovery="sitemap",  # walk the site only if sitemaps give nothing
+            sitemap_filter=f"^/({'|'.join([i[0] for i in include])})",
+            transport=Transport(max_connections=5, max_keepalive=5),  # as many as semaphore
+            metrics=Metrics(save_to="/home/data/metrics/crawling.json"),  # time per url phase
         )
     )
     crawler.reset()
@@ -56,14 +71,27 @@ def scraping_work(upload_to_s3: bool = False):
     log.info("Start scraping process...")
 
     urls = [
-        i["url"]
-        for i in csv_reader("/home/data/crawled/thegioididong_urls.csv", logger=log)
+        i[0]
+        for i in csv_iter(
+            "/home/data/crawled/thegioididong_urls.csv",
+            fields="url",
+            row_type="tuple",
+            logger=log,
+        )
     ]
+    # every product is scraped, no lastmod skipping: fact tables read each day's bronze partition as a full snapshot
     scraper = Scraper(
         urls,
         save_in="/home/data/scraped",
         upload_to_s3=upload_to_s3,
-        s3_attrs={"bucket": "crawling-to-dwh", "obj_prefix": "bronze/"},
+        s3_attrs={
+            "bucket": "crawling-to-dwh",
+            "obj_prefix": "bronze/" if bronze_format == "csv" else "bronze_parquet/",
+        },
+        output_format=bronze_format,
+        stream_to_s3=upload_to_s3,  # upload while scraping, save_in only keeps spilled parts
+        archive="/home/data/archive",  # raw pages for reprocessing after parser changes
+        archive_days=14,  # two weeks of pages, older days are deleted
     )
 
     asyncio.run(
@@ -71,34 +99,36 @@ def scraping_work(upload_to_s3: bool = False):
             timeout=20.0,
             chunksize=5,
             semaphore=asyncio.Semaphore(5),
+            rate_limiter=RateLimiter(rate=2.0, burst=5),
+            transport=Transport(max_connections=5, max_keepalive=5),
+            metrics=Metrics(save_to="/home/data/metrics/scraping.json"),
         )
     )
     scraper.reset()
 
 
 def check_records():
-    res = csv_reader("/home/data/crawled/thegioididong_urls.csv", logger=log)
-
-    if not res:  # empty file
-        log.info("End the pipeline.")
-        return False
-
-    for i in res:
-        if (
-            i.get("created_at")
-            and datetime.fromisoformat(i.get("created_at")).date()
-            == datetime.today().date()
-        ):
-            log.info("Conditions passed. Start scraping after 5 min.")
-            time.sleep(300)  # prevent ip banned
+    # urls are appended by crawling time, only the newest rows can be from today
+    for (created_at,) in csv_iter(
+        "/home/data/crawled/thegioididong_urls.csv",
+        fields="created_at",
+        row_type="tuple",
+        reverse=True,
+        logger=log,
+    ):
+        if not created_at:
+            continue
+        if datetime.fromisoformat(created_at).date() == datetime.today().date():
+            log.info("Conditions passed. Start scraping.")
             return True
+        break
 
     log.info("End the pipeline.")
     return False
 
 
 def build_bronze_layer():
-    files_location = "/home/sql"
+    files_location = "/home/sql" if bronze_format == "csv" else "/home/sql/parquet"
     database = "c2dwh_bronze"
     queries = []
     tables_meta = []
@@ -110,7 +140,7 @@ def build_bronze_layer():
         log.error(f"No such directory named {files_location}.")
         return
 
-    for i in Path(files_location).rglob("*.sql"):
+    for i in Path(files_location).glob("*.sql"):
         with i.open("r") as file:
             queries.append(file.read())
 
@@ -126,29 +156,79 @@ def build_bronze_layer():
         log.warning("No SQL queries found.")
         return
 
-    log.info(f"Start creating tables in {database}...")
-    for i in range(len(queries)):
-        resp = athena_sql_executor(queries[i], database=database, logger=log)
+    cache = QueryCache(athena_cache, logger=log)
+    executor = AthenaExecutor(database=database, cache=cache, logger=log)
+
+    async def build_table(query: str, table: str, location: str):
+        """
+        Create table and its partitions, return table name if files landed since its cached results were
+        last dropped, **None** otherwise.
+        """
+
+        resp = await executor.execute(query)
 
         if resp.get("query_execution_state") == "SUCCEEDED":
-            log.info(f"Create {tables_meta[i][0]} successfully.")
+            log.info(f"Create {table} successfully.")
         else:
-            log.error(f"Cannot create table {tables_meta[i][0]}.")
-
-    # update partitions
-    log.info("Start adding tables partition...")
-    for i in tables_meta:
-        resp = athena_sql_executor(
-            f"alter table {i[0]} add partition (partition_date = '{datetime.today().date()}') "
-            + f"location '{i[1]}date={datetime.today().date()}'",
-            database=database,
-            logger=log,
+            log.error(f"Cannot create table {table}.")
+
+        # files uploaded after cached results of table were dropped, either in new or existing partitions
+        bucket, prefix = location.removeprefix("s3://").split("/", 1)
+        changed = await asyncio.to_thread(
+            s3_object_lister, prefix, bucket=bucket, since=cache.invalidated_at(table), logger=log
         )
+        if not changed:
+            log.info(f"No new files in {table}.")
 
-        if resp.get("query_execution_state") == "SUCCEEDED":
-            log.info(f"Update partition in {i[0]} successfully.")
+        # new dates are visible as soon as their files are uploaded
+        if partition_projection:
+            return table if changed else None
+
+        # add every partition folder found on S3, existing ones are skipped
+        partitions = []
+        for i in await asyncio.to_thread(
+            s3_prefix_lister, prefix, bucket=bucket, logger=log
+        ):
+            date = re.search(r"date=(.*?)/$", i)
+            if date:
+                partitions.append(
+                    f"partition (partition_date = '{date.group(1)}') location 's3://{bucket}/{i}'"
+                )
+
+        if not partitions:
+            log.warning(f"No partition found in {location}.")
+            return
+
+        resps = await executor.execute_many(
+            [
+                f"alter table {table} add if not exists " + " ".join(partitions[i : i + 100])
+                for i in range(0, len(partitions), 100)
+            ]
+        )
+
+        if all(i.get("query_execution_state") == "SUCCEEDED" for i in resps):
+            log.info(f"Update {len(partitions)} partitions in {table} successfully.")
+            return table if changed else None
         else:
-            log.warning(f"Cannot update partition in {i[0]}.")
+            log.warning(f"Cannot update partitions in {table}.")
+            succeeded = any(i.get("query_execution_state") == "SUCCEEDED" for i in resps)
+            return table if changed and succeeded else None
+
+    async def build_tables():
+        return await asyncio.gather(
+            *[build_table(queries[i], *tables_meta[i]) for i in range(len(queries))]
+        )
+
+    # tables are independent, each one is created then partitioned in its own chain
+    log.info(f"Start creating tables and partitions in {database}...")
+    changed = asyncio.run(build_tables())
+    log.info(f"Athena usage >> {executor.summary()}")
+
+    # new data changes every layer built on bronze, cached results of any of them are stale now
+    if any(changed):
+        log.info(f"New files in {', '.join(i for i in changed if i)}.")
+        cache.invalidate()
+    cache.close()
 
 
 # ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** #
@@ -0,0 +1,293 @@
+"""
+Local copy of the retailer site for offline benchmarks, with injected latency, server errors and 429s.
+
+    python benchmarks/mock_site.py [--port 8765] [--products 50] [--latency 0.05] [--error-rate 0.01]
+                                   [--throttle-rate 0.01] [--archive DIR]
+
+Synthetic pages follow the layout Crawler and Scraper expect: a home page linking device categories,
+category pages linking products (also through tracking-param variants) and product pages holding
+JSON-LD and a spec list, padded to **--page-kb**. With **--archive**, product pages recorded by
+**PageArchive** are served by path instead, behind home and category pages linking them.
+"""
+
+import argparse, json, random, sys, threading, time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+from urllib.parse import urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from c2dwh.webcrawler import PageArchive
+from specs_bench import synthetic_rows
+
+# url hint and spec table of each device
+DEVICES = {
+    "dtdd": "phone",
+    "laptop": "laptop",
+    "may-tinh-bang": "tablet",
+    "dong-ho-thong-minh": "watch",
+    "tai-nghe": "earphones",
+    "man-hinh-may-tinh": "screen",
+}
+
+
+# ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** #
+def product_page(host: str, category: str, i: int, page_kb: int):
+    data = {
+        "sku": str(100000 + i),
+        "name": f"{category} {i}",
+        "offers": {"price": 1000000 + 10000 * i},
+        "brand": {"name": ["Acme"]},
+        "url": f"http://{host}/{category}/item-{i}",
+        "aggregateRating": {"ratingValue": 4.5, "reviewcount": 10 + i},
+        "additionalProperty": [
+            {"name": "Thời điểm ra mắt", "value": "09/2024"},
+            {"name": "Kích thước, khối lượng", "value": "Dài 150 mm - Nặng 180 g"},
+            {"name": "Jack cắm", "value": "3.5 mm"},
+        ],
+    }
+    specs = "".join(
+        f'<li><span class="circle"></span><p>{label}: </p><div><span>{value}</span></div></li>'
+        for label, value in synthetic_rows(DEVICES[category])
+    )
+    pad = (
+        "<p>" + "lorem ipsum dolor " * (page_kb * 1024 // 72) + "</p>"
+    )  # markup around specs
+    return (
+        f'<html><head><script id="productld" type="application/ld+json">{json.dumps(data, ensure_ascii=False)}'
+        + f"</script></head><body>{pad}"
+        + f'<section class="detail detailv2"><div class="box-specifi"><ul>{specs}</ul></div></section>'
+        + f'{pad * 3}<a href="/{category}">{category}</a></body></html>'
+    )
+
+
+class MockSite:
+    """
+    Threaded HTTP server of synthetic or recorded pages, every response waits **latency** on average
+    and fails with a 5xx or 429 at given rates.
+
+    Attributes
+    ----------
+    port: int, optional
+        Listening port, **0** picks a free one (default: **0**).
+    products: int, optional
+        Synthetic products per device category (default: **50**).
+    page_kb: int, optional
+        Approximate size of synthetic product pages in KB (default: **100**).
+    latency: float, optional
+        Mean response delay in seconds, exponentially distributed (default: **0.0**).
+    error_rate: float, optional
+        Fraction of requests answered by 500/502/503 (default: **0.0**).
+    throttle_rate: float, optional
+        Fraction of requests answered by 429 with **Retry-After** (default: **0.0**).
+    retry_after: int, optional
+        **Retry-After** seconds sent with 429 (default: **1**).
+    archive: str, optional
+        Directory of **PageArchive** whose latest pages are served instead of synthetic ones (default: **None**).
+    seed: int, optional
+        Random seed of injected failures and delays (default: **0**).
+    """
+
+    def __init__(
+        self,
+        *,
+        port: int = 0,
+        products: int = 50,
+        page_kb: int = 100,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: int = 1,
+        archive: str | None = None,
+        seed: int = 0,
+    ):
+        self.products = products
+        self.page_kb = page_kb
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.served = 0
+        self.errors = 0
+        self.throttled = 0
+        self.__random = random.Random(seed)
+        self.__lock = threading.Lock()
+        self.__recorded = self.__load(archive) if archive else None
+        self.__server = ThreadingHTTPServer(("127.0.0.1", port), self.__handler())
+        self.__server.daemon_threads = True
+        self.__thread = None
+
+    @staticmethod
+    def __load(archive: str):  # path -> body of recorded pages
+        pages = PageArchive(archive, replay=True)
+        try:
+            return {urlsplit(i).path: pages.read(i) for i in pages.urls()}
+        finally:
+            pages.close()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.__server.server_address[1]}/"
+
+    def fault(
+        self,
+    ):  # status to fail with and delay, drawn under lock from the shared generator
+        with self.__lock:
+            self.served += 1
+            delay = self.__random.expovariate(1 / self.latency) if self.latency else 0
+            draw = self.__random.random()
+            if draw < self.throttle_rate:
+                self.throttled += 1
+                return 429, delay
+            if draw < self.throttle_rate + self.error_rate:
+                self.errors += 1
+                return self.__random.choice([500, 502, 503]), delay
+            return None, delay
+
+    def page(self, host: str, path: str):
+        """
+        Body of page at given path, **None** if there is no such page.
+        """
+
+        path = path.rstrip("/")
+
+        parts = path.strip("/").split("/")
+
+        if self.__recorded is not None:  # same layout over recorded product pages
+            if not path:
+                categories = sorted({i.split("/")[1] for i in self.__recorded})
+                return "".join(f'<a href="/{i}">{i}</a>' for i in categories)
+            if len(parts) == 1:
+                return "".join(
+                    f'<a href="{i}">{i}</a>'
+                    for i in sorted(self.__recorded)
+                    if i.startswith(f"/{parts[0]}/")
+                )
+            if path in self.__recorded:  # recorded pages may be cut after specs
+                return (
+                    self.__recorded[path]
+                    + f'<a href="/{parts[0]}">{parts[0]}</a>'.encode()
+                )
+            return
+
+        if not path:
+            return "".join(f'<a href="/{i}">{i}</a>' for i in DEVICES)
+
+        if parts[0] not in DEVICES:
+            return
+        if len(parts) == 1:
+            return "".join(
+                f'<a href="/{parts[0]}/item-{i}">{i}</a>'
+                + f'<a href="/{parts[0]}/item-{i}?utm_source=home#specs">{i}</a>'
+                for i in range(self.products)
+            )
+        if len(parts) == 2 and parts[1].removeprefix("item-").isdigit():
+            i = int(parts[1].removeprefix("item-"))
+            if i < self.products:
+                return product_page(host, parts[0], i, self.page_kb)
+
+    def __handler(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def send(self, status: int, body: bytes = b"", headers: dict | None = None):
+                self.send_response(status)
+                for i, j in (headers or {}).items():
+                    self.send_header(i, j)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                status, delay = site.fault()
+                time.sleep(delay)
+
+                if status == 429:
+                    return self.send(
+                        429, headers={"Retry-After": str(site.retry_after)}
+                    )
+                if status:
+                    return self.send(status)
+
+                body = site.page(self.headers["Host"], urlsplit(self.path).path)
+                if body is None:
+                    return self.send(404)
+                if isinstance(body, str):
+                    body = (
+                        f"<html><body>{body}</body></html>"
+                        if "<html" not in body
+                        else body
+                    )
+                    body = body.encode()
+                self.send(200, body, {"Content-Type": "text/html; charset=utf-8"})
+
+        return Handler
+
+    def start(self):
+        self.__thread = threading.Thread(
+            target=self.__server.serve_forever, daemon=True
+        )
+        self.__thread.start()
+        return self
+
+    def stop(self):
+        self.__server.shutdown()
+        self.__server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def stats(self):
+        return {
+            "served": self.served,
+            "errors": self.errors,
+            "throttled": self.throttled,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--products", type=int, default=50, help="products per category"
+    )
+    parser.add_argument("--page-kb", type=int, default=100)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="mean delay in seconds"
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--archive", help="PageArchive directory to serve")
+    args = parser.parse_args()
+
+    site = MockSite(
+        port=args.port,
+        products=args.products,
+        page_kb=args.page_kb,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        archive=args.archive,
+    )
+    print(f"Serving {site.url}, Ctrl+C to stop.")
+    try:
+        site.start()
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        site.stop()
+        print(site.stats())
+
+
+if __name__ == "__main__":
+    main()
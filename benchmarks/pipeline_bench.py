@@ -0,0 +1,259 @@
+"""
+Offline benchmark of Crawler and Scraper runs against the local mock site (**mock_site.py**), each
+chunksize/semaphore setting in a fresh process so peak memory is not carried over between them.
+
+    python benchmarks/pipeline_bench.py [--chunksize 5 20] [--semaphore 5 20] [--products 50]
+                                        [--latency 0.02] [--error-rate 0.01] [--throttle-rate 0.01]
+                                        [--archive DIR] [--workers N] [--pool thread] [--json FILE]
+
+Reported per stage: pages/sec, p50/p99 fetch latency (request sent until response headers), parse time
+per page, CPU seconds and peak RSS. Parsing is timed in the event loop only, so with **--workers** the
+parse time is not reported and CPU includes the pool processes.
+"""
+
+import argparse, asyncio, json, logging, multiprocessing, resource, statistics, sys, tempfile, time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from c2dwh.webcrawler import Crawler, Scraper, Transport, RetryPolicy, Canonicalizer
+from c2dwh.utils import csv_iter
+from mock_site import MockSite, DEVICES
+
+SEARCH = "//a[{}]/@href".format(
+    " or ".join(f"substring(@href,1,{len(i) + 1})='/{i}'" for i in DEVICES)
+)
+
+
+# ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** #
+class TimedTransport(Transport):
+    """
+    Transport also keeping latency of every request, from sending it until its response headers.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.latencies = []
+
+    def client(self, **kwargs):
+        kwargs["event_hooks"] = {
+            "request": [self.__sent],
+            "response": [self.__received],
+        }
+        return super().client(**kwargs)
+
+    async def __sent(self, request):
+        request.extensions["sent_at"] = time.perf_counter()
+
+    async def __received(self, response):
+        self.latencies.append(
+            time.perf_counter() - response.request.extensions["sent_at"]
+        )
+
+
+@contextmanager
+def timed(cls, name: str, times: list):
+    """
+    Replace static method of class by one appending its duration to **times**.
+    """
+
+    func = getattr(cls, name)
+
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            times.append(time.perf_counter() - start)
+
+    setattr(cls, name, staticmethod(wrapper))
+    try:
+        yield
+    finally:
+        setattr(cls, name, staticmethod(func))
+
+
+def measure(
+    stage: str, run, transport: TimedTransport, parses: list, retry: RetryPolicy
+):
+    before = [
+        resource.getrusage(i) for i in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN)
+    ]
+    start = time.perf_counter()
+    run()
+    wall = time.perf_counter() - start
+    after = [
+        resource.getrusage(i) for i in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN)
+    ]
+
+    latencies = sorted(transport.latencies)
+    percentiles = (
+        statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    )
+    return {
+        "stage": stage,
+        "pages": transport.requests,
+        "seconds": wall,
+        "pages_sec": transport.requests / wall if wall else 0.0,
+        "p50_ms": percentiles[49] * 1000 if percentiles else None,
+        "p99_ms": percentiles[98] * 1000 if percentiles else None,
+        "parse_ms": statistics.fmean(parses) * 1000 if parses else None,
+        "cpu_sec": sum(
+            (j.ru_utime + j.ru_stime) - (i.ru_utime + i.ru_stime)
+            for i, j in zip(before, after)
+        ),
+        "peak_rss_mb": after[0].ru_maxrss / 1024,  # KB on Linux
+        "connections": transport.connections,
+        "retries": retry.retries,
+        "gave_up": sum(retry.gave_up.values()),
+    }
+
+
+def run_setting(
+    base_url: str, chunksize: int, semaphore: int, workers: int | None, pool: str
+):
+    """
+    Crawl then scrape the mock site with one setting, return stats of both stages.
+    """
+
+    logging.disable(logging.WARNING)  # retries are counted, not printed
+    results = []
+
+    with tempfile.TemporaryDirectory() as out:
+        transport = TimedTransport(max_connections=semaphore)
+        retry, parses = RetryPolicy(), []
+        crawler = Crawler(
+            base_url,
+            search=SEARCH,
+            save_in=f"{out}/crawled",
+            canonicalizer=Canonicalizer(keep_params=()),
+        )
+        # parsing pool cannot pickle the timed wrapper
+        with timed(Crawler, "inspect", parses) if not workers else nullcontext():
+            results.append(
+                measure(
+                    "crawler",
+                    lambda: asyncio.run(
+                        crawler.execute(
+                            chunksize=chunksize,
+                            semaphore=asyncio.Semaphore(semaphore),
+                            workers=workers,
+                            pool=pool,
+                            transport=transport,
+                            retry_policy=retry,
+                        )
+                    ),
+                    transport,
+                    parses,
+                    retry,
+                )
+            )
+        crawled = crawler.saving_path
+        crawler.reset()
+
+        urls = [i[0] for i in csv_iter(crawled, fields="url", row_type="tuple")]
+        if not urls:  # nothing to scrape
+            results[0].update(chunksize=chunksize, semaphore=semaphore, workers=workers)
+            return results
+        transport = TimedTransport(max_connections=semaphore)
+        retry, parses = RetryPolicy(), []
+        scraper = Scraper(urls, save_in=f"{out}/scraped")
+        with timed(Scraper, "parse_product", parses) if not workers else nullcontext():
+            results.append(
+                measure(
+                    "scraper",
+                    lambda: asyncio.run(
+                        scraper.execute(
+                            chunksize=chunksize,
+                            semaphore=asyncio.Semaphore(semaphore),
+                            workers=workers,
+                            pool=pool,
+                            transport=transport,
+                            retry_policy=retry,
+                        )
+                    ),
+                    transport,
+                    parses,
+                    retry,
+                )
+            )
+        results[-1]["products"] = len(Scraper.result)
+        scraper.reset()
+
+    for i in results:
+        i.update(chunksize=chunksize, semaphore=semaphore, workers=workers)
+    return results
+
+
+def report(row: dict):
+    ms = lambda i: f"{i:.1f} ms" if i is not None else "-"
+    print(
+        f"{row['stage']:<8} chunk={row['chunksize']:<3} sem={row['semaphore']:<3} | "
+        + f"{row['pages']} pages in {row['seconds']:.2f}s ({row['pages_sec']:.1f}/s) | "
+        + f"p50 {ms(row['p50_ms'])} p99 {ms(row['p99_ms'])} | "
+        + f"parse {ms(row['parse_ms'])}/page | CPU {row['cpu_sec']:.2f}s | "
+        + f"RSS {row['peak_rss_mb']:.0f} MB | retries {row['retries']} gave up {row['gave_up']}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--chunksize", type=int, nargs="+", default=[5, 20])
+    parser.add_argument("--semaphore", type=int, nargs="+", default=[5, 20])
+    parser.add_argument("--workers", type=int, help="parsing pool size")
+    parser.add_argument("--pool", choices=["process", "thread"], default="process")
+    parser.add_argument(
+        "--products", type=int, default=50, help="products per category"
+    )
+    parser.add_argument("--page-kb", type=int, default=100)
+    parser.add_argument(
+        "--latency", type=float, default=0.02, help="mean delay in seconds"
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--archive", help="PageArchive directory to serve instead of synthetic pages"
+    )
+    parser.add_argument("--json", type=Path, help="file to write results to")
+    args = parser.parse_args()
+
+    site = MockSite(
+        products=args.products,
+        page_kb=args.page_kb,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        archive=args.archive,
+    )
+    context = multiprocessing.get_context("spawn")  # fresh interpreter, own peak RSS
+    results = []
+
+    with site:
+        print(
+            f"Mock site: {site.url} | latency {args.latency}s | errors {args.error_rate:.1%} | 429 {args.throttle_rate:.1%}"
+        )
+        for chunksize in args.chunksize:
+            for semaphore in args.semaphore:
+                # pool processes are daemonic and could not start parsing workers
+                with ProcessPoolExecutor(1, mp_context=context) as pool:
+                    rows = pool.submit(
+                        run_setting,
+                        site.url,
+                        chunksize,
+                        semaphore,
+                        args.workers,
+                        args.pool,
+                    ).result()
+                for row in rows:
+                    report(row)
+                results.extend(rows)
+        print(f"Served: {site.stats()}")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
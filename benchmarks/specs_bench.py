@@ -0,0 +1,494 @@
+"""
+Micro-benchmark of spec mapping: the indexed spec table (**webcrawler.specs**) against the former
+linear-scan closures of Scraper.__parse_specs_info, checking both give identical output.
+
+    python benchmarks/specs_bench.py [--pages DIR | --synthetic] [--rounds N]
+
+Saved product pages are read from **DIR/<device>/*.html** (device: phone, tablet, laptop, watch, earphones,
+screen), by default the sample pages in **benchmarks/pages** trimmed to the parts Scraper reads. With
+**--synthetic**, spec rows covering every label alias are used instead.
+"""
+
+import argparse, re, sys, timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from c2dwh.webcrawler import Scraper
+from c2dwh.webcrawler.specs import SPECS, parse_specs
+
+
+# ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** #
+def legacy_parse_specs(data: list[tuple], device: str):
+    """
+    Scraper.__parse_specs_info before the spec table, kept for output comparison.
+    """
+
+    def cpu():
+        value = [
+            j.strip()
+            for i, j in data
+            if i in ["Công nghệ CPU", "Chip xử lý (CPU)", "CPU"]
+        ]
+        return value[0] if value else None
+
+    def cpu_cores():
+        value = [j.strip() for i, j in data if i == "Số nhân"]
+        return value[0] if value else None
+
+    def cpu_threads():
+        value = [j.strip() for i, j in data if i == "Số luồng"]
+        return value[0] if value else None
+
+    def cpu_speed():
+        value = [j.strip() for i, j in data if i == "Tốc độ CPU"]
+        return value[0] if value else None
+
+    def gpu():
+        value = [
+            j.strip()
+            for i, j in data
+            if i in ["Chip đồ hoạ (GPU)", "Chip đồ họa (GPU)", "Card màn hình"]
+        ]
+        return value[0] if value else None
+
+    def ram():
+        value = [j.strip() for i, j in data if i == "RAM"]
+        return value[0] if value else None
+
+    def max_ram():
+        value = [j.strip() for i, j in data if i == "Hỗ trợ RAM tối đa"]
+        return value[0] if value else None
+
+    def ram_type():
+        value = [j.strip() for i, j in data if i == "Loại RAM"]
+        return value[0] if value else None
+
+    def ram_bus():
+        value = [j.strip() for i, j in data if i == "Tốc độ Bus RAM"]
+        return value[0] if value else None
+
+    def storage():
+        value = [
+            j.strip()
+            for i, j in data
+            if i in ["Ổ cứng", "Dung lượng lưu trữ", "Bộ nhớ trong"]
+        ]
+        return value[0] if value else None
+
+    def webcam():
+        value = [j.strip() for i, j in data if i == "Webcam"]
+        return value[0] if value else None
+
+    def rearcam_specs():
+        if device == "tablet":
+            value = [j.strip() for i, j in data if i == "Độ phân giải"]
+            return value[1] if value else None
+        else:
+            value = [j.strip() for i, j in data if i == "Độ phân giải camera sau"]
+            return value[0] if value else None
+
+    def frontcam_specs():
+        if device == "tablet":
+            value = [j.strip() for i, j in data if i == "Độ phân giải"]
+            return value[-1] if value else None
+        value = [j.strip() for i, j in data if i == "Độ phân giải camera trước"]
+        return value[0] if value else None
+
+    def screen_tech():
+        value = [j.strip() for i, j in data if i == "Công nghệ màn hình"]
+        return value[0] if value else None
+
+    def screen_type():
+        value = [
+            j.strip()
+            for i, j in data
+            if i in ["Chất liệu mặt", "Mặt kính cảm ứng", "Loại màn hình"]
+        ]
+        return value[0] if value else None
+
+    def screen_size():
+        value = [
+            j.strip() for i, j in data if i in ["Kích thước màn hình", "Màn hình rộng"]
+        ]
+        return value[0].split("-")[0].strip() if value else None
+
+    def screen_panel():
+        if device in ["laptop", "screen"]:
+            value = [j.strip() for i, j in data if i == "Tấm nền"]
+            return value[0] if value else None
+        value = [j.strip() for i, j in data if i == "Công nghệ màn hình"]
+        return value[0] if value else None
+
+    def screen_res():
+        value = [
+            j.strip() for i, j in data if i in ["Độ phân giải", "Độ phân giải màn hình"]
+        ]
+        return value[0] if value else None
+
+    def screen_rate():
+        if device in ["screen", "laptop"]:
+            value = [j.strip() for i, j in data if i == "Tần số quét"]
+            return value[0] if value else None
+        value = [j.strip() for i, j in data if i == "Màn hình rộng"]
+        return (
+            re.sub(r".*?(\d+\.?\d*\s*Hz)", r"\1", value[0])
+            if value and re.findall(r"\d+\.?\d*\s*Hz", value[0])
+            else None
+        )
+
+    def screen_nits():
+        if device == "laptop":
+            value = [j.strip() for i, j in data if i == "Công nghệ màn hình"]
+            return (
+                re.sub(r".*?(\d+\s?nits).*", r"\1", value[0])
+                if value and re.findall(r"\d+\s?nits", value[0])
+                else None
+            )
+        value = [j.strip() for i, j in data if i == "Độ sáng tối đa"]
+        return value[0] if value else None
+
+    def os():
+        value = [j.strip() for i, j in data if i == "Hệ điều hành"]
+        return value[0] if value else None
+
+    def water_resistant():
+        if device == "earphones":
+            value = [j.strip() for i, j in data if i == "Tiện ích"]
+            return (
+                re.sub(r".*?(IP[X0-9]+).*", r"\1", value[0])
+                if value and re.findall(r"IP[X0-9]+", value[0])
+                else None
+            )
+        value = [
+            j.strip()
+            for i, j in data
+            if i in ["Chống nước / Kháng nước", "Kháng nước, bụi"]
+        ]
+        return value[0] if value else None
+
+    def battery():
+        value = [
+            j.strip()
+            for i, j in data
+            if i in ["Thông tin Pin", "Dung lượng pin", "Thời lượng pin tai nghe"]
+        ]
+        return value[0] if value else None
+
+    def charger():
+        value = [j.strip() for i, j in data if i == "Hỗ trợ sạc tối đa"]
+        return value[0] if value else None
+
+    def weight():
+        if device in ["laptop", "screen"]:
+            value = [
+                j.strip()
+                for i, j in data
+                if i in ["Khối lượng có chân đế", "Kích thước"]
+            ]
+            return value[0].split("-")[-1].strip() if value else None
+        value = [
+            j.strip() for i, j in data if i in ["Kích thước, khối lượng", "Khối lượng"]
+        ]
+        return (
+            re.sub(r"(.*Nặng\s+)?(\d+\.?\d*)\s*[g(].*", r"\2", value[0]) + " g"
+            if value and re.findall(r"(.*Nặng\s+)?\d+\.?\d*\s*[g(]", value[0])
+            else None
+        )
+
+    def material():
+        value = [
+            j.strip() for i, j in data if i in ["Chất liệu khung viền", "Chất liệu"]
+        ]
+        return value[0] if value else None
+
+    def connectivity():
+        value = {
+            j.strip() if j else ""
+            for i, j in data
+            if i
+            in [
+                "Wifi",
+                "Bluetooth",
+                "Kết nối khác",
+                "Kết nối không dây",
+                "Kết nối",
+                "Công nghệ kết nối",
+            ]
+        }
+        return ", ".join(value) if value else None
+
+    def network():
+        value = [j.strip() for i, j in data if i == "Mạng di động"]
+        return value[0] if value else None
+
+    def ports():
+        value = {
+            j.strip() if j else ""
+            for i, j in data
+            if i
+            in [
+                "Jack tai nghe",
+                "Cổng kết nối/sạc",
+                "Cổng giao tiếp",
+                "Cổng sạc",
+                "Jack cắm",
+                "Cổng kết nối",
+            ]
+        }
+        return ", ".join(value) if value else None
+
+    def sound_tech():
+        value = [j.strip() for i, j in data if i == "Công nghệ âm thanh"]
+        return value[0] if value else None
+
+    def compatible():
+        value = [j.strip() for i, j in data if i == "Tương thích"]
+        return value[0] if value else None
+
+    def control():
+        value = [j.strip() for i, j in data if i == "Điều khiển"]
+        return value[0] if value else None
+
+    def case_battery():
+        value = [j.strip() for i, j in data if i == "Thời lượng pin hộp sạc"]
+        return value[0] if value else None
+
+    def power_consumption():
+        value = [j.strip() for i, j in data if i == "Công suất tiêu thụ điện"]
+        return value[0] if value else None
+
+    match device:
+        case "phone":
+            return {
+                "cpu": cpu(),
+                "cpu_speed": cpu_speed(),
+                "gpu": gpu(),
+                "ram": ram(),
+                "storage": storage(),
+                "rearcam_specs": rearcam_specs(),
+                "frontcam_specs": frontcam_specs(),
+                "screen_type": screen_type(),
+                "screen_size": screen_size(),
+                "screen_panel": screen_panel(),
+                "screen_res": screen_res(),
+                "screen_rate": screen_rate(),
+                "screen_nits": screen_nits(),
+                "os": os(),
+                "water_resistant": water_resistant(),
+                "battery": battery(),
+                "charger": charger(),
+                "weight": weight(),
+                "material": material(),
+                "connectivity": connectivity(),
+                "network": network(),
+                "ports": ports(),
+            }
+        case "tablet":
+            return {
+                "cpu": cpu(),
+                "cpu_speed": cpu_speed(),
+                "gpu": gpu(),
+                "ram": ram(),
+                "storage": storage(),
+                "rearcam_specs": rearcam_specs(),
+                "frontcam_specs": frontcam_specs(),
+                "screen_size": screen_size(),
+                "screen_panel": screen_panel(),
+                "screen_res": screen_res(),
+                "screen_rate": screen_rate(),
+                "os": os(),
+                "water_resistant": water_resistant(),
+                "battery": battery(),
+                "charger": charger(),
+                "weight": weight(),
+                "material": material(),
+                "connectivity": connectivity(),
+                "network": network(),
+                "ports": ports(),
+            }
+        case "laptop":
+            return {
+                "cpu": cpu(),
+                "cpu_cores": cpu_cores(),
+                "cpu_threads": cpu_threads(),
+                "cpu_speed": cpu_speed(),
+                "gpu": gpu(),
+                "ram": ram(),
+                "max_ram": max_ram(),
+                "ram_type": ram_type(),
+                "ram_bus": ram_bus(),
+                "storage": storage(),
+                "webcam": webcam(),
+                "screen_panel": screen_panel(),
+                "screen_size": screen_size(),
+                "screen_tech": screen_tech(),
+                "screen_res": screen_res(),
+                "screen_rate": screen_rate(),
+                "screen_nits": screen_nits(),
+                "os": os(),
+                "battery": battery(),
+                "weight": weight(),
+                "material": material(),
+                "connectivity": connectivity(),
+                "ports": ports(),
+            }
+        case "watch":
+            return {
+                "cpu": cpu(),
+                "storage": storage(),
+                "screen_type": screen_type(),
+                "screen_panel": screen_panel(),
+                "screen_size": screen_size(),
+                "os": os(),
+                "water_resistant": water_resistant(),
+                "connectivity": connectivity(),
+                "battery": battery(),
+                "weight": weight(),
+                "material": material(),
+            }
+        case "earphones":
+            return {
+                "sound_tech": sound_tech(),
+                "compatible": compatible(),
+                "control": control(),
+                "water_resistant": water_resistant(),
+                "ports": ports(),
+                "connectivity": connectivity(),
+                "battery": battery(),
+                "case_battery": case_battery(),
+                "weight": weight(),
+            }
+        case "screen":
+            return {
+                "screen_type": screen_type(),
+                "screen_panel": screen_panel(),
+                "screen_size": screen_size(),
+                "screen_tech": screen_tech(),
+                "screen_res": screen_res(),
+                "screen_rate": screen_rate(),
+                "power_consumption": power_consumption(),
+                "ports": ports(),
+                "weight": weight(),
+            }
+
+
+# ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** #
+SAMPLE = {  # typical values seen on product pages
+    "Độ phân giải": "Chính 50 MP & Phụ 12 MP",
+    "Màn hình rộng": '6.7" - Tần số quét 120 Hz',
+    "Kích thước màn hình": "14 inch - 60 Hz",
+    "Công nghệ màn hình": "Dynamic AMOLED 2X, 500 nits, Tấm nền IPS",
+    "Tiện ích": "Chống nước IPX4, Sạc không dây",
+    "Kích thước, khối lượng": "Dài 163.4 mm - Ngang 77.9 mm - Dày 8.25 mm - Nặng 221 g",
+    "Khối lượng": "5.6 g (mỗi tai)",
+    "Kích thước": "Dài 312 mm - Rộng 221 mm - Dày 17.9 mm - Nặng 1.34 kg",
+    "Khối lượng có chân đế": "3.2 kg",
+}
+
+
+def synthetic_rows(device: str):
+    """
+    Spec rows with every label alias of the device, repeated labels and unrelated rows like a real page.
+    """
+
+    rows = [(f"Thông tin khác {i}", f"Giá trị {i}") for i in range(15)]  # noise
+    for spec in SPECS[device].specs:
+        for n, label in enumerate(spec.labels):
+            rows.append((label, SAMPLE.get(label, f"{spec.name} {n}")))
+    rows.append(("Độ phân giải", "Chính 12 MP"))  # tablets show resolution three times
+    rows.append(("Wifi", "Wi-Fi 6"))  # duplicated joined value
+    return rows
+
+
+def page_rows(pages: Path):
+    """
+    Spec rows of saved product pages, classified the same way Scraper does.
+    """
+
+    for path in sorted(pages.glob("*/*.html")):
+        if path.parent.name not in SPECS:
+            continue
+        content = "".join(
+            re.findall(
+                r'<script[^>]*id="productld"[^>]*>.*?</script>|<section[^>]*class="detail detailv2"[^>]*>.*?</section>',
+                path.read_text(encoding="utf-8"),
+                flags=re.DOTALL,
+            )
+        )
+        try:
+            yield path.parent.name, Scraper.classify(content)[1]
+        except Exception as e:
+            print(f"Skip {path} >> {repr(e)}")
+
+
+JOINED = {j.name for i in SPECS.values() for j in i.specs if j.join}
+
+
+def same(a: dict, b: dict):
+    """
+    Compare outputs, joined fields are compared as sets since legacy order depends on string hashing.
+    """
+
+    return a.keys() == b.keys() and all(
+        (
+            set(a[i].split(", ")) == set(b[i].split(", "))
+            if i in JOINED and a[i] and b[i]
+            else a[i] == b[i]
+        )
+        for i in a
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--pages",
+        type=Path,
+        default=Path(__file__).resolve().parent / "pages",
+        help="directory of saved product pages",
+    )
+    parser.add_argument(
+        "--synthetic", action="store_true", help="use synthetic rows instead of pages"
+    )
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    samples = (
+        [(i, synthetic_rows(i)) for i in SPECS]
+        if args.synthetic
+        else list(page_rows(args.pages))
+    )
+    if not samples:
+        sys.exit("No sample pages found.")
+
+    mismatches = [
+        (device, rows)
+        for device, rows in samples
+        if not same(legacy_parse_specs(rows, device), parse_specs(rows, device))
+    ]
+    for device, rows in mismatches:
+        print(f"Mismatch on {device}:")
+        print(f"  legacy: {legacy_parse_specs(rows, device)}")
+        print(f"  table:  {parse_specs(rows, device)}")
+
+    def run(func):
+        return min(
+            timeit.repeat(
+                lambda: [func(rows, device) for device, rows in samples],
+                number=args.rounds,
+                repeat=5,
+            )
+        )
+
+    legacy, table = run(legacy_parse_specs), run(parse_specs)
+    per_page = 1e6 / (args.rounds * len(samples))
+    print(f"Samples: {len(samples)} | Rounds: {args.rounds}")
+    print(f"Legacy: {legacy * per_page:.2f} us/page")
+    print(f"Table:  {table * per_page:.2f} us/page | Speedup: {legacy / table:.1f}x")
+    print(f"Identical output: {not mismatches}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -15,15 +15,15 @@ with temp as(
             )
         ) name,
         case
-            when price = '0' then null else cast(price as int)
+            when cast(price as varchar) = '0' then null else cast(price as int)
         end price,
         brand,
         category,
         case
-            when rating = '' then null else cast(rating as double)
+            when cast(rating as varchar) = '' then null else cast(rating as double)
         end rating,
         case
-            when reviews_count = '' then null else cast(reviews_count as int)
+            when cast(reviews_count as varchar) = '' then null else cast(reviews_count as int)
         end reviews_count,
         url,
         case
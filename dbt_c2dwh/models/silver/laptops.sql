@@ -24,7 +24,7 @@ with temp as(
 			)
 		end name,
 		case
-			when price = '0' then null else cast(price as int)
+			when cast(price as varchar) = '0' then null else cast(price as int)
 		end price,
 		brand,
 		category,
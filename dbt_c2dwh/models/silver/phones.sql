@@ -15,7 +15,7 @@ with temp as(
 			)
 		) name,
 		case
-			when price = '0' then null else cast(price as int)
+			when cast(price as varchar) = '0' then null else cast(price as int)
 		end price,
 		case
 			when brand = 'iPhone (Apple)' then 'Apple' else brand
@@ -1,3 +1,4 @@
+-- partition projection: partitions come from the date range, no alter table needed
 create external table if not exists c2dwh_bronze.phones (
 	sku string,
 	name string,
@@ -44,5 +45,12 @@ stored as inputformat 'org.apache.hadoop.mapred.TextInputFormat' outputformat 'o
 location 's3://crawling-to-dwh/bronze/phones/'
 tblproperties (
 	'classification' = 'csv',
-	'skip.header.line.count' = '1'
+	'skip.header.line.count' = '1',
+	'projection.enabled' = 'true',
+	'projection.partition_date.type' = 'date',
+	'projection.partition_date.format' = 'yyyy-MM-dd',
+	'projection.partition_date.range' = '2025-09-01,NOW',
+	'projection.partition_date.interval' = '1',
+	'projection.partition_date.interval.unit' = 'DAYS',
+	'storage.location.template' = 's3://crawling-to-dwh/bronze/phones/date=${partition_date}/'
 );
\ No newline at end of file
@@ -0,0 +1,50 @@
+-- partition projection: partitions come from the date range, no alter table needed
+create external table if not exists c2dwh_bronze.laptops (
+	sku bigint,
+	name string,
+	price bigint,
+	brand string,
+	category string,
+	rating double,
+	reviews_count bigint,
+	url string,
+	release_date string,
+	updated_at timestamp,
+	cpu string,
+	cpu_cores string,
+	cpu_threads string,
+	cpu_speed string,
+	gpu string,
+	ram string,
+	max_ram string,
+	ram_type string,
+	ram_bus string,
+	storage string,
+	webcam string,
+	screen_panel string,
+	screen_size string,
+	screen_tech string,
+	screen_res string,
+	screen_rate string,
+	screen_nits string,
+	os string,
+	battery string,
+	weight string,
+	material string,
+	connectivity string,
+	ports string
+)
+partitioned by (partition_date string)
+stored as parquet
+location 's3://crawling-to-dwh/bronze_parquet/laptops/'
+tblproperties (
+	'classification' = 'parquet',
+	'parquet.compression' = 'SNAPPY',
+	'projection.enabled' = 'true',
+	'projection.partition_date.type' = 'date',
+	'projection.partition_date.format' = 'yyyy-MM-dd',
+	'projection.partition_date.range' = '2025-09-01,NOW',
+	'projection.partition_date.interval' = '1',
+	'projection.partition_date.interval.unit' = 'DAYS',
+	'storage.location.template' = 's3://crawling-to-dwh/bronze_parquet/laptops/date=${partition_date}/'
+);
\ No newline at end of file
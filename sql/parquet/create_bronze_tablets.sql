@@ -0,0 +1,47 @@
+-- partition projection: partitions come from the date range, no alter table needed
+create external table if not exists c2dwh_bronze.tablets (
+	sku bigint,
+	name string,
+	price bigint,
+	brand string,
+	category string,
+	rating double,
+	reviews_count bigint,
+	url string,
+	release_date string,
+	updated_at timestamp,
+	cpu string,
+	cpu_speed string,
+	gpu string,
+	ram string,
+	storage string,
+	rearcam_specs string,
+	frontcam_specs string,
+	screen_size string,
+	screen_panel string,
+	screen_res string,
+	screen_rate string,
+	os string,
+	water_resistant string,
+	battery string,
+	charger string,
+	weight string,
+	material string,
+	connectivity string,
+	network string,
+	ports string
+)
+partitioned by (partition_date string)
+stored as parquet
+location 's3://crawling-to-dwh/bronze_parquet/tablets/'
+tblproperties (
+	'classification' = 'parquet',
+	'parquet.compression' = 'SNAPPY',
+	'projection.enabled' = 'true',
+	'projection.partition_date.type' = 'date',
+	'projection.partition_date.format' = 'yyyy-MM-dd',
+	'projection.partition_date.range' = '2025-09-01,NOW',
+	'projection.partition_date.interval' = '1',
+	'projection.partition_date.interval.unit' = 'DAYS',
+	'storage.location.template' = 's3://crawling-to-dwh/bronze_parquet/tablets/date=${partition_date}/'
+);
\ No newline at end of file
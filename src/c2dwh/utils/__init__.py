@@ -3,9 +3,19 @@ from .utils import (
     colorized,
     timetext,
     dict_to_csv,
+    CsvSink,
+    ParquetSink,
+    S3MultipartWriter,
     csv_reader,
+    csv_iter,
     s3_file_uploader,
+    s3_batch_uploader,
+    aws_client,
     s3_folder_cleaner,
+    s3_prefix_lister,
+    s3_object_lister,
     athena_sql_executor,
+    AthenaExecutor,
+    QueryCache,
     Cursor,
 )
@@ -1,7 +1,15 @@
-import threading, time, functools, inspect, os, csv, boto3, re, logging
+import threading, asyncio, random, uuid, hashlib, pickle, sqlite3, time, functools, itertools, inspect, os, io, csv, boto3, re, atexit, tempfile, logging
+import pyarrow as pa, pyarrow.parquet as pq
 from pathlib import Path
+from datetime import datetime
 from botocore.exceptions import ClientError as AwsClientError
 from botocore.client import BaseClient
+from botocore.config import Config as AwsConfig
+from boto3.s3.transfer import TransferConfig
+from boto3.exceptions import S3UploadFailedError
+from concurrent.futures import ThreadPoolExecutor
+from abc import ABC, abstractmethod
+from typing import Callable
 
 
 # ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** #
@@ -217,20 +225,477 @@ def dict_to_csv(
         return
 
 
-def csv_reader(
+class S3MultipartWriter(io.RawIOBase):
+    """
+    Writable binary stream uploading to AWS S3 while being written. Data is buffered until **part_size**
+    and sent as one part of a multipart upload, objects smaller than one part are sent with a single put.
+
+    Attributes
+    ----------
+    bucket: str
+        Target bucket.
+    key: str
+        Target object key, replaced if it exists.
+    client: BaseClient, optional
+        S3 client, shared client is used if not given (default: **None**).
+    part_size: int, optional
+        Bytes per uploaded part, at least 5 MB as required by S3 (default: **8 MB**).
+    spill_dir: str, optional
+        Directory where part buffer spills once it passes 1 MB, keeps memory flat (default: **None**, in memory).
+    """
+
+    def __init__(
+        self,
+        *,
+        bucket: str,
+        key: str,
+        client: BaseClient | None = None,
+        part_size: int = 8 * 1024**2,
+        spill_dir: str | None = None,
+    ):
+        super().__init__()
+        self.bucket = bucket
+        self.key = key
+        self.client = client if client else aws_client("s3")
+        self.part_size = max(5 * 1024**2, part_size)
+        self.uploaded = 0
+
+        if spill_dir:
+            Path(spill_dir).mkdir(parents=True, exist_ok=True)
+        self.__buffer = tempfile.SpooledTemporaryFile(
+            max_size=1024**2 if spill_dir else 0, dir=spill_dir
+        )
+        self.__upload_id = None
+        self.__parts = []
+        self.__position = 0
+
+    def writable(self):
+        return True
+
+    def tell(self):
+        return self.__position
+
+    def write(self, data):
+        size = self.__buffer.write(data)
+        self.__position += size
+        if self.__buffer.tell() >= self.part_size:
+            self.__upload_part()
+        return size
+
+    def close(self):
+        if self.closed:
+            return
+
+        try:
+            if self.__upload_id:
+                if self.__buffer.tell():
+                    self.__upload_part()
+                self.client.complete_multipart_upload(
+                    Bucket=self.bucket,
+                    Key=self.key,
+                    UploadId=self.__upload_id,
+                    MultipartUpload={"Parts": self.__parts},
+                )
+            else:  # small object
+                self.__buffer.seek(0)
+                self.client.put_object(
+                    Bucket=self.bucket, Key=self.key, Body=self.__buffer.read()
+                )
+                self.uploaded = self.__position
+        except Exception:
+            self.abort()
+            raise
+        finally:
+            self.__buffer.close()
+            super().close()
+
+    def abort(self):
+        """
+        Cancel upload and close the stream, existing object is left untouched and uploaded parts are discarded by S3.
+        """
+
+        try:
+            if self.__upload_id:
+                self.client.abort_multipart_upload(
+                    Bucket=self.bucket, Key=self.key, UploadId=self.__upload_id
+                )
+                self.__upload_id = None
+        finally:
+            self.__buffer.close()
+            super().close()
+
+    def __upload_part(self):
+        if not self.__upload_id:
+            self.__upload_id = self.client.create_multipart_upload(
+                Bucket=self.bucket, Key=self.key
+            )["UploadId"]
+
+        size = self.__buffer.tell()
+        self.__buffer.seek(0)
+        resp = self.client.upload_part(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self.__upload_id,
+            PartNumber=len(self.__parts) + 1,
+            Body=self.__buffer.read(size),
+        )
+        self.__parts.append({"ETag": resp["ETag"], "PartNumber": len(self.__parts) + 1})
+        self.uploaded += size
+
+        self.__buffer.seek(0)
+        self.__buffer.truncate()
+
+
+class FileSink(ABC):
+    """
+    Buffered file writer keeping one open handle per output file. Rows are buffered in memory and
+    written in batches by a background thread, so callers never wait for disk. With **bucket**, paths
+    are S3 keys and files are streamed as multipart uploads instead of being written locally.
+    Subclasses define how a file is opened, written and closed.
+
+    Attributes
+    ----------
+    batch_size: int, optional
+        Number of buffered rows triggering a flush (default: **500**).
+    flush_interval: float, optional
+        Seconds after which buffered rows are flushed anyway (default: **2.0**).
+    bucket: str, optional
+        S3 bucket for streaming output, local files are written if not given (default: **None**).
+    client: BaseClient, optional
+        S3 client for streaming, shared client is used if not given (default: **None**).
+    spill_dir: str, optional
+        Directory for spilling S3 part buffers, see **S3MultipartWriter** (default: **None**).
+    on_write: Callable[[str, float], None], optional
+        Called with **write** and seconds taken after every batch written, e.g. **Metrics.observe**. Can be
+        set any time as attribute of the same name (default: **None**).
+    logger: logging.Logger, optional
+        Logger for reporting failed writes (default: **None**).
+    """
+
+    suffix = None
+
+    def __init__(
+        self,
+        *,
+        batch_size: int = 500,
+        flush_interval: float = 2.0,
+        bucket: str | None = None,
+        client: BaseClient | None = None,
+        spill_dir: str | None = None,
+        on_write: Callable[[str, float], None] | None = None,
+        logger: logging.Logger | None = None,
+    ):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.bucket = bucket
+        self.client = client
+        self.spill_dir = spill_dir
+        self.on_write = on_write
+        self.log = logging.getLogger("file_sink") if not logger else logger
+        self.written = 0
+
+        self.__buffer = {}  # path and its pending rows
+        self.__count = 0
+        self.__files = {}  # path and its open handle
+        self.__streams = {}  # path and its underlying stream
+        self.__options = {}  # path, overwrite and column types given at first write
+        self.__closed = False
+        self.__thread = None
+        self.__lock = threading.Lock()
+        self.__io_lock = threading.Lock()  # keeps batches in order
+        self.__event = threading.Condition(self.__lock)
+
+        atexit.register(self.close)
+
+    def write(
+        self,
+        row: dict,
+        *,
+        path: str,
+        overwrite: bool = False,
+        types: dict[str, type] | None = None,
+    ):
+        """
+        Buffer one row for given file. With **overwrite**, an existing file is truncated when it is first
+        opened by this sink, later rows are appended. **types** maps columns to python types for typed formats.
+        """
+
+        with self.__lock:
+            if self.__closed:
+                self.log.error(f"Writing to {path} after sink closed.")
+                return
+
+            self.__options.setdefault(str(path), (overwrite, types))
+            self.__buffer.setdefault(str(path), []).append(row)
+            self.__count += 1
+
+            if not self.__thread:  # start lazily, no thread for unused sinks
+                self.__thread = threading.Thread(
+                    target=self.__run, name="file_sink", daemon=True
+                )
+                self.__thread.start()
+            elif self.__count >= self.batch_size:
+                self.__event.notify()
+
+    def flush(self):
+        """
+        Write all buffered rows to disk or S3 part buffers, blocks until done.
+        """
+
+        with self.__io_lock:
+            with self.__lock:
+                buffer, self.__buffer, self.__count = self.__buffer, {}, 0
+
+            for path, rows in buffer.items():
+                try:
+                    if path not in self.__files:
+                        if Path(path).suffix != self.suffix:
+                            raise ValueError(f"Only accept {self.suffix} extension.")
+                        self.__files[path] = self._open(
+                            path, rows[0], *self.__options[path]
+                        )
+                    start = time.perf_counter()
+                    self._write(self.__files[path], rows)
+                    if self.on_write:  # real I/O, not the buffering
+                        self.on_write("write", time.perf_counter() - start)
+                    self.written += len(rows)
+                except Exception as e:
+                    self.log.error(f"Saving to {path} failed >> {e}")
+
+    def close(self, *, abort: bool = False):
+        """
+        Flush remaining rows, stop background thread and close all files, S3 uploads are completed here.
+        With **abort**, buffered rows are dropped and S3 uploads are cancelled, so a failed run never
+        replaces existing objects with partial ones. Local files are closed as they are.
+        """
+
+        with self.__lock:
+            if self.__closed:
+                return
+            self.__closed = True
+            self.__event.notify()
+
+        if self.__thread:
+            self.__thread.join()
+
+        if abort:
+            with self.__lock:
+                self.__buffer, self.__count = {}, 0
+        else:
+            self.flush()
+
+        with self.__io_lock:
+            for path, handle in self.__files.items():
+                try:
+                    stream = self.__streams.get(path)
+                    if abort and isinstance(stream, S3MultipartWriter):
+                        stream.abort()
+                        self.log.warning(f"Upload of {path} aborted.")
+                    else:
+                        self._close(handle)
+                except Exception as e:
+                    self.log.error(f"Closing {path} failed >> {e}")
+            self.__files.clear()
+            self.__streams.clear()
+
+        atexit.unregister(self.close)
+
+    def _stream(self, path: str, *, append: bool = False):
+        """
+        Open binary stream of given path, return it and whether it starts empty.
+        """
+
+        if self.bucket:
+            stream, is_new = (
+                S3MultipartWriter(
+                    bucket=self.bucket,
+                    key=path,
+                    client=self.client,
+                    spill_dir=self.spill_dir,
+                ),
+                True,
+            )
+        else:
+            actual_path = CWD / path
+            actual_path.parent.mkdir(parents=True, exist_ok=True)
+            append = append and actual_path.exists() and actual_path.stat().st_size > 0
+            stream, is_new = actual_path.open("ab" if append else "wb"), not append
+
+        self.__streams[str(path)] = stream
+        return stream, is_new
+
+    @abstractmethod
+    def _open(self, path: str, row: dict, overwrite: bool, types: dict | None):
+        """
+        Open file of given path, return handle passed to **_write** and **_close**.
+        """
+
+    @abstractmethod
+    def _write(self, handle, rows: list[dict]):
+        """
+        Write a batch of rows to opened file.
+        """
+
+    @abstractmethod
+    def _close(self, handle):
+        """
+        Finish and close opened file.
+        """
+
+    def __run(self):
+        while True:
+            with self.__lock:
+                self.__event.wait_for(
+                    lambda: self.__closed or self.__count >= self.batch_size,
+                    timeout=self.flush_interval,
+                )
+                if self.__closed:
+                    return
+            self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class CsvSink(FileSink):
+    """
+    Buffered CSV writer, header is taken from the first row of each file. Existing local files are
+    appended unless **overwrite** is given, S3 objects are always replaced.
+    """
+
+    suffix = ".csv"
+
+    def _open(self, path, row, overwrite, types):
+        stream, is_new = self._stream(path, append=not overwrite)
+        file = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+        writer = csv.DictWriter(file, row.keys())
+        if is_new:
+            writer.writeheader()
+        return file, writer
+
+    def _write(self, handle, rows):
+        handle[1].writerows(rows)
+        handle[0].flush()
+
+    def _close(self, handle):
+        handle[0].close()
+
+
+class ParquetSink(FileSink):
+    """
+    Buffered Parquet writer, every flushed batch becomes one row group. Columns are typed by **types**
+    given at first write (int, float, datetime, bool, others as string), a Parquet file cannot be
+    appended so an existing one is always replaced. Files are complete only after **close**.
+
+    Attributes
+    ----------
+    compression: str, optional
+        Parquet compression codec (default: **snappy**).
+    """
+
+    suffix = ".parquet"
+
+    def __init__(self, *, compression: str = "snappy", **kwargs):
+        super().__init__(**kwargs)
+        self.compression = compression
+
+    def _open(self, path, row, overwrite, types):
+        arrow_types = {
+            int: pa.int64(),
+            float: pa.float64(),
+            bool: pa.bool_(),
+            datetime: pa.timestamp("ms"),
+        }
+        types = types if types else {i: type(j) for i, j in row.items()}
+        schema = pa.schema(
+            [(i, arrow_types.get(types.get(i), pa.string())) for i in row.keys()]
+        )
+        converters = {
+            i: types.get(i) if types.get(i) in arrow_types else str for i in row.keys()
+        }
+        stream, _ = self._stream(path)
+        writer = pq.ParquetWriter(stream, schema, compression=self.compression)
+        return writer, converters, stream
+
+    def _write(self, handle, rows):
+        writer, converters, _ = handle
+
+        def convert(value, to: type, column: str):
+            if value is None or value == "":
+                return None
+            if isinstance(value, to):
+                return value
+            try:
+                if to is datetime:
+                    return datetime.fromisoformat(str(value))
+                return to(value)
+            except (TypeError, ValueError):  # one bad value must not drop the row group
+                self.log.warning(
+                    f"Cannot cast {column}={value!r} to {to.__name__}, set null."
+                )
+                return None
+
+        writer.write_table(
+            pa.Table.from_pylist(
+                [
+                    {i: convert(j.get(i), k, i) for i, k in converters.items()}
+                    for j in rows
+                ],
+                schema=writer.schema,
+            )
+        )
+
+    def _close(self, handle):
+        handle[0].close()
+        handle[2].close()
+
+
+def _csv_reverse_records(
+    file: io.BufferedReader, start: int, block_size: int = 64 * 1024
+):
+    # physical lines from the end of file down to start offset
+    def lines():
+        file.seek(0, os.SEEK_END)
+        position, rest = file.tell(), b""
+        while position > start:
+            size = min(block_size, position - start)
+            position -= size
+            file.seek(position)
+            chunk = (file.read(size) + rest).split(b"\n")
+            rest = chunk.pop(0)  # may continue in previous block
+            yield from reversed(chunk)
+        yield rest
+
+    # quoted values may span lines, an odd count of quotes means the record starts on an earlier line
+    record = None
+    for line in lines():
+        record = line if record is None else line + b"\n" + record
+        if record.count(b'"') % 2:
+            continue
+        yield from csv.reader([record.decode("utf-8")], skipinitialspace=True)
+        record = None
+
+
+def csv_iter(
     path: str,
     *,
     fields: str | list[str] | None = None,
+    row_type: str = "dict",
+    reverse: bool = False,
+    tail: int | None = None,
     logger: logging.Logger | None = None,
 ):
     """
-    Read CSV file and return list of dict-type data. Can extract by field names.
+    Stream rows of CSV file lazily so memory stays constant whatever the file size. Can extract by field
+    names, yield rows as **dict** or **tuple**, read from the last row with **reverse**, or read only the
+    last **tail** rows in file order. Stop iterating to stop reading.
     """
 
     log = logging.getLogger("csv_reader") if not logger else logger
     actual_path = CWD / path
-    data = []
-    header = []
 
     # validate the path
     if actual_path.is_dir():
@@ -239,35 +704,117 @@ def csv_reader(
     if not path:
         log.error("File path is missing.")
         return
+    if row_type not in ["dict", "tuple"]:
+        log.error(f"Unsupported row type {row_type}.")
+        return
 
-    # choose selected fields
-    if fields:
-        if isinstance(fields, str):
-            header.append(fields)
-        else:
-            header.extend(fields)
+    def records(rows):
+        rows = (i for i in rows if i)  # skip blank lines
+        if tail:
+            rows = reversed(list(itertools.islice(rows, tail)))
+
+        for row in rows:
+            if len(row) < len(columns):
+                row += [None] * (len(columns) - len(row))
+
+            values = tuple(row[i] for i in index)
+            yield dict(zip(names, values)) if row_type == "dict" else values
 
     try:
-        if header:
-            with actual_path.open("r") as file:
-                reader = csv.DictReader(file, skipinitialspace=True)
-                for i in reader:
-                    new = {}
-                    for j in header:
-                        if j not in reader.fieldnames:
-                            log.error(f"'{j}' does not exist in header.")
-                            return
-                        new[j] = i[j]
-                    data.append(new)
-        else:
-            with actual_path.open("r") as file:
-                reader = csv.DictReader(file, skipinitialspace=True)
-                for i in reader:
-                    data.append(i)
+        with actual_path.open("rb") as file:
+            columns = next(
+                csv.reader([file.readline().decode("utf-8")], skipinitialspace=True),
+                None,
+            )
+            if not columns:  # empty file
+                return
+
+            # resolve selected fields once
+            names = (
+                columns
+                if not fields
+                else [fields] if isinstance(fields, str) else list(fields)
+            )
+            for i in names:
+                if i not in columns:
+                    log.error(f"'{i}' does not exist in header.")
+                    return
+            index = [columns.index(i) for i in names]
+
+            # only reading backwards needs byte offsets
+            if reverse or tail:
+                yield from records(_csv_reverse_records(file, file.tell()))
+                return
+
+        with actual_path.open("r", encoding="utf-8", newline="") as file:
+            file.readline()  # header
+            yield from records(csv.reader(file, skipinitialspace=True))
     except Exception as e:
         log.error(f"Cannot read {actual_path.name} >> {e}")
-    finally:
-        return data
+
+
+def csv_reader(
+    path: str,
+    *,
+    fields: str | list[str] | None = None,
+    row_type: str = "dict",
+    logger: logging.Logger | None = None,
+):
+    """
+    Read CSV file and return list of dict-type data. Can extract by field names, return **tuple** rows,
+    or **columns** as dictionary of column arrays. Use **csv_iter** for large files.
+    """
+
+    log = logging.getLogger("csv_reader") if not logger else logger
+
+    # validate the path
+    if (CWD / path).is_dir():
+        log.error(f"Please provide a file path, not directory.")
+        return
+    if not path:
+        log.error("File path is missing.")
+        return
+
+    if row_type != "columns":
+        return list(csv_iter(path, fields=fields, row_type=row_type, logger=log))
+
+    data = {}
+    for row in csv_iter(path, fields=fields, logger=log):
+        for name, value in row.items():
+            data.setdefault(name, []).append(value)
+    return data
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024**2,
+    multipart_chunksize=8 * 1024**2,
+    max_concurrency=8,  # parts uploaded at once per file
+    use_threads=True,
+)
+
+
+def aws_client(service: str, *, max_pool_connections: int = 32):
+    """
+    Get a shared AWS client of given service, created once per process with a connection pool
+    large enough for concurrent transfers. Clients are thread-safe so they are reused across calls.
+    """
+
+    with _clients_lock:
+        if (service, max_pool_connections) not in _clients:
+            _clients[(service, max_pool_connections)] = boto3.session.Session().client(
+                service,
+                region_name=os.getenv("AWS_REGION"),
+                aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+                aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+                config=AwsConfig(
+                    max_pool_connections=max_pool_connections,
+                    retries={"max_attempts": 5, "mode": "adaptive"},
+                ),
+            )
+        return _clients[(service, max_pool_connections)]
 
 
 def s3_file_uploader(
@@ -276,10 +823,12 @@ def s3_file_uploader(
     client: BaseClient | None = None,
     bucket: str,
     key: str,
+    transfer_config: TransferConfig | None = None,
     logger: logging.Logger | None = None,
 ):
     """
-    Upload file to AWS S3 bucket basing on given key name.
+    Upload file to AWS S3 bucket basing on given key name. Large files are sent as concurrent multipart
+    uploads. Return file, key, uploaded bytes and seconds taken, **None** if failed.
     """
 
     log = logging.getLogger("s3_file_uploader") if not logger else logger
@@ -292,20 +841,444 @@ def s3_file_uploader(
     if not path:
         log.error("File path is missing.")
         return
+    if not actual_path.is_file():
+        log.error(f"No such file named {actual_path.name}.")
+        return
+
+    # initialize client
+    if not client:
+        client = aws_client("s3")
+
+    start = time.perf_counter()
+    try:
+        client.upload_file(
+            Filename=str(actual_path),
+            Bucket=bucket,
+            Key=key,
+            Config=transfer_config if transfer_config else TRANSFER_CONFIG,
+        )
+    except (AwsClientError, S3UploadFailedError) as e:
+        log.error(
+            f"Cannot upload {actual_path.name} >> {e.response if isinstance(e, AwsClientError) else e}"
+        )
+        return
+
+    return {
+        "file": str(path),
+        "key": key,
+        "bytes": actual_path.stat().st_size,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def s3_batch_uploader(
+    files: list[dict],
+    *,
+    client: BaseClient | None = None,
+    bucket: str,
+    workers: int = 4,
+    transfer_config: TransferConfig | None = None,
+    logger: logging.Logger | None = None,
+):
+    """
+    Upload many files to AWS S3 bucket at once with one shared client. **files** is a list of dict
+    with **path** and **key**. Return results of **s3_file_uploader** for uploaded files.
+    """
+
+    log = logging.getLogger("s3_batch_uploader") if not logger else logger
+
+    if not files:
+        return []
 
     # initialize client
     if not client:
-        client = boto3.client(
-            "s3",
-            region_name=os.getenv("AWS_REGION"),
-            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+        client = aws_client("s3")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(files)))) as pool:
+        results = list(
+            pool.map(
+                lambda i: s3_file_uploader(
+                    i["path"],
+                    client=client,
+                    bucket=bucket,
+                    key=i["key"],
+                    transfer_config=transfer_config,
+                    logger=log,
+                ),
+                files,
+            )
         )
+    results = [i for i in results if i]
+
+    elapsed = time.perf_counter() - start
+    total = sum(i["bytes"] for i in results)
+    log.info(
+        f"Uploaded {len(results)}/{len(files)} files | {total / 1024**2:.2f} MB in {timetext(elapsed)}"
+        + f" | {total / 1024**2 / elapsed if elapsed else 0:.2f} MB/s"
+    )
+    return results
+
+
+class QueryCache:
+    """
+    Local on-disk cache of Athena SELECT results, keyed by normalized query text and database. It also caps
+    how old results Athena itself may reuse, so both layers forget data older than the last invalidation.
+
+    Attributes
+    ----------
+    path: str
+        SQLite database file, created if missing.
+    ttl: int, optional
+        Seconds a result stays valid (default: **3600**).
+    """
+
+    def __init__(
+        self, path: str, *, ttl: int = 3600, logger: logging.Logger | None = None
+    ):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.log = logging.getLogger("query_cache") if not logger else logger
+        self.hits = 0
+        self.misses = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        # shared by executor threads, sqlite calls are serialized by the lock
+        self.__lock = threading.Lock()
+        self.__conn = sqlite3.connect(
+            self.path, isolation_level=None, check_same_thread=False
+        )
+        self.__conn.execute("pragma journal_mode=wal")
+        self.__conn.execute(
+            """
+            create table if not exists results (
+                key text primary key,
+                query text,
+                data blob,
+                created_at real
+            )
+            """
+        )
+        self.__conn.execute(
+            "create table if not exists meta (name text primary key, value real)"
+        )
+
+    @staticmethod
+    def normalize(query: str):
+        """
+        Drop comments, collapse whitespace and lowercase everything outside string literals.
+        """
+
+        parts = re.split(r"('(?:[^']|'')*')", query)
+        for i in range(0, len(parts), 2):
+            text = re.sub(r"--[^\n]*|/\*.*?\*/", " ", parts[i], flags=re.S)
+            parts[i] = re.sub(r"\s+", " ", text).lower()
+        return "".join(parts).strip().rstrip(";").strip()
+
+    def key(self, query: str, database: str | None = None, *extra: str):
+        text = "\x1f".join([self.normalize(query), database or "default", *extra])
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def get(self, query: str, database: str | None = None, *extra: str):
+        """
+        Cached result of a query, **None** if missing or expired.
+        """
+
+        key = self.key(query, database, *extra)
+        with self.__lock:
+            row = self.__conn.execute(
+                "select data, created_at from results where key=?", (key,)
+            ).fetchone()
+
+            if row and time.time() - row[1] > self.ttl:
+                self.__conn.execute("delete from results where key=?", (key,))
+                row = None
+
+        if not row:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return pickle.loads(row[0])
+
+    def put(self, data, query: str, database: str | None = None, *extra: str):
+        with self.__lock:
+            self.__conn.execute(
+                "insert or replace into results values (?, ?, ?, ?)",
+                (
+                    self.key(query, database, *extra),
+                    self.normalize(query),
+                    pickle.dumps(data),
+                    time.time(),
+                ),
+            )
 
+    def reuse_minutes(self):
+        """
+        Max age in minutes of results Athena may reuse, **0** right after an invalidation.
+        """
+
+        with self.__lock:
+            row = self.__conn.execute(
+                "select value from meta where name='invalidated_at'"
+            ).fetchone()
+
+        age = self.ttl if not row else min(self.ttl, time.time() - row[0])
+        return int(age // 60)
+
+    def invalidated_at(self, table: str | None = None):
+        """
+        Epoch seconds of last invalidation covering given table, or of any invalidation if table is not
+        given, **None** if never invalidated. Data landed after it may be missing from cached results.
+        """
+
+        names = (
+            ("invalidated_all", f"invalidated_at:{table.lower()}")
+            if table
+            else ("invalidated_at",)
+        )
+        with self.__lock:
+            row = self.__conn.execute(
+                f"select max(value) from meta where name in ({','.join('?' * len(names))})",
+                names,
+            ).fetchone()
+        return row[0]
+
+    def invalidate(self, table: str | None = None):
+        """
+        Drop cached results naming given table, with or without its schema, or everything if table is not
+        given. Results of queries built on the table through views or other layers are not found this way,
+        so invalidate everything when new data lands in a table others are built from.
+        """
+
+        now = time.time()
+        with self.__lock:
+            if table:
+                *schema, name = table.lower().replace('"', "").split(".")
+                # whole identifier, unqualified or in given schema, so phones never matches phones_specs
+                pattern = re.compile(
+                    r'(?<![\w."])(?:"?'
+                    + (re.escape(schema[-1]) if schema else r"\w+")
+                    + r'"?\.)?'
+                    + rf'"?{re.escape(name)}"?(?![\w"])'
+                )
+                keys = [
+                    (i,)
+                    for i, query in self.__conn.execute(
+                        "select key, query from results"
+                    )
+                    if pattern.search(query)
+                ]
+                count = self.__conn.executemany(
+                    "delete from results where key=?", keys
+                ).rowcount
+            else:
+                count = self.__conn.execute("delete from results").rowcount
+            self.__conn.executemany(
+                "insert or replace into meta values (?, ?)",
+                [
+                    ("invalidated_at", now),  # any table, caps athena reuse
+                    (
+                        (
+                            f"invalidated_at:{table.lower()}"
+                            if table
+                            else "invalidated_all"
+                        ),
+                        now,
+                    ),
+                ],
+            )
+
+        self.log.info(f"Invalidated {count} cached results of {table or 'all tables'}.")
+
+    def close(self):
+        self.__conn.close()
+
+
+ATHENA_DONE = ("SUCCEEDED", "FAILED", "CANCELLED")
+
+
+def _athena_is_select(query: str):
+    return (
+        True
+        if re.search(r"^\s*select|^\s*with.*?as.*?\(.*\)\s*select", query.lower(), re.S)
+        else False
+    )
+
+
+def _athena_request(
+    query: str,
+    database: str | None = None,
+    output_location: str | None = None,
+    encrypt_config: dict | None = None,
+    reuse_minutes: int = 0,
+):
+    request = {
+        "QueryString": query,
+        "QueryExecutionContext": {
+            "Database": "default" if not database else database,
+            "Catalog": "AwsDataCatalog",
+        },
+        "ResultConfiguration": {
+            "OutputLocation": (
+                "s3://c2dwh-athena-queries/" if not output_location else output_location
+            ),
+            "EncryptionConfiguration": (
+                {"EncryptionOption": "SSE_S3"} if not encrypt_config else encrypt_config
+            ),
+        },
+    }
+
+    if reuse_minutes > 0:
+        request["ResultReuseConfiguration"] = {
+            "ResultReuseByAgeConfiguration": {
+                "Enabled": True,
+                "MaxAgeInMinutes": reuse_minutes,
+            }
+        }
+    return request
+
+
+def _athena_start(client: BaseClient, request: dict, log: logging.Logger):
     try:
-        client.upload_file(Filename=actual_path, Bucket=bucket, Key=key)
+        return client.start_query_execution(**request)
     except AwsClientError as e:
-        log.error(f"Cannot upload {actual_path.name} >> {e.response}")
+        if "ResultReuseConfiguration" not in request:
+            raise
+
+        # reuse needs engine version 3, run without it on older workgroups
+        log.warning(f"Result reuse is not available >> {e.response.get('Error')}")
+        request = {k: v for k, v in request.items() if k != "ResultReuseConfiguration"}
+        return client.start_query_execution(**request)
+
+
+def _athena_metrics(execution: dict, latency: float):
+    stats = execution.get("Statistics", {})
+    return {
+        "query_execution_id": execution["QueryExecutionId"],
+        "state": execution["Status"]["State"],
+        "latency": round(latency, 3),  # seconds from submit until completion was seen
+        "engine_ms": stats.get("EngineExecutionTimeInMillis"),
+        "queue_ms": stats.get("QueryQueueTimeInMillis"),
+        "bytes_scanned": stats.get("DataScannedInBytes", 0),
+        "reused": stats.get("ResultReuseInformation", {}).get(
+            "ReusedPreviousResult", False
+        ),
+    }
+
+
+def _athena_api_batches(client: BaseClient, query_execution_id: str):
+    paginator = client.get_paginator("get_query_results")
+
+    columns = None
+    for page in paginator.paginate(QueryExecutionId=query_execution_id):
+        rows = page["ResultSet"]["Rows"]
+
+        if not columns:  # get list of columns and skip 1st row from 1st page only
+            columns = [
+                i.get("VarCharValue") for i in page["ResultSet"]["Rows"][0]["Data"]
+            ]
+            rows = rows[1:]
+
+        yield [
+            {
+                columns[i]: row["Data"][i].get("VarCharValue")
+                for i in range(len(columns))
+            }
+            for row in rows
+        ]
+
+
+def _athena_csv_batches(location: str, batch_size: int = 1000):
+    bucket, key = location.removeprefix("s3://").split("/", 1)
+    body = aws_client("s3").get_object(Bucket=bucket, Key=key)["Body"]
+
+    # athena quotes every value, unquoted empty fields are nulls
+    with io.TextIOWrapper(body, encoding="utf-8", newline="") as file:
+        reader = csv.reader(file, quoting=csv.QUOTE_NOTNULL)
+        columns = next(reader, None)
+        batch = []
+
+        for row in reader:
+            batch.append(dict(zip(columns, row)))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+
+        if batch:
+            yield batch
+
+
+def _athena_parquet_batches(location: str):
+    client = aws_client("s3")
+    bucket, prefix = location.removeprefix("s3://").split("/", 1)
+    paginator = client.get_paginator("list_objects_v2")
+
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get("Contents", []):
+            body = client.get_object(Bucket=bucket, Key=obj["Key"])["Body"].read()
+            yield from pq.ParquetFile(io.BytesIO(body)).iter_batches()
+
+
+def _athena_unload_location(output_location: str | None = None):
+    # unload target must be empty, every query gets its own folder
+    return (
+        f"{'s3://c2dwh-athena-queries/' if not output_location else output_location}"
+        + f"unload/{uuid.uuid4().hex}/"
+    )
+
+
+def _athena_unload(query: str, location: str):
+    return (
+        f"unload ({query.strip().rstrip(';')}) to '{location}' "
+        + "with (format = 'PARQUET', compression = 'SNAPPY')"
+    )
+
+
+def _athena_results(
+    client: BaseClient,
+    execution: dict,
+    *,
+    result_mode: str = "api",
+    row_type: str = "dict",
+    stream: bool = False,
+    unload_to: str | None = None,
+):
+    """
+    Read result of a succeeded SELECT query as list of rows, or as dictionary of column arrays when
+    **row_type** is **columns**. With **stream**, a generator of rows (or of column arrays per batch) is returned.
+    """
+
+    if result_mode == "csv":
+        batches = _athena_csv_batches(
+            execution["ResultConfiguration"]["OutputLocation"]
+        )
+    elif result_mode == "unload":
+        batches = _athena_parquet_batches(unload_to)
+    else:
+        batches = _athena_api_batches(client, execution["QueryExecutionId"])
+
+    def rows():
+        for batch in batches:
+            yield from batch.to_pylist() if isinstance(batch, pa.RecordBatch) else batch
+
+    def columns():
+        for batch in batches:
+            if isinstance(batch, pa.RecordBatch):
+                yield batch.to_pydict()
+            elif batch:
+                yield {i: [j[i] for j in batch] for i in batch[0]}
+
+    if row_type != "columns":
+        return rows() if stream else list(rows())
+    if stream:
+        return columns()
+
+    data = {}
+    for batch in columns():
+        for name, values in batch.items():
+            data.setdefault(name, []).extend(values)
+    return data
 
 
 def athena_sql_executor(
@@ -315,62 +1288,81 @@ def athena_sql_executor(
     database: str | None = None,
     output_location: str | None = None,
     encrypt_config: dict | None = None,
+    result_mode: str = "api",
+    row_type: str = "dict",
+    stream: bool = False,
+    cache: QueryCache | None = None,
     logger: logging.Logger | None = None,
 ):
     """
-    Execute SQL query on AWS Athena.
+    Execute SQL query on AWS Athena. Use **AthenaExecutor** for running many queries at once.
+
+    Results of SELECT queries are read by **result_mode**:
+    - **api**: pages of get_query_results, fine for small results.
+    - **csv**: result file Athena wrote to output location, downloaded in one streamed request.
+    - **unload**: query is wrapped in UNLOAD to Parquet under output location, values keep their types.
+
+    **row_type** is **dict** for list of rows or **columns** for dictionary of column arrays, and **stream**
+    returns a generator of rows (or of column arrays per batch) instead of loading everything.
+
+    With **cache**, SELECT results are served from it while fresh and Athena may reuse its own recent results.
     """
 
     log = logging.getLogger("athena_sql_executor") if not logger else logger
     data = {}
-    is_select = (
-        True
-        if re.search(r"^\s*select|^\s*with.*?as.*?\(.*\)\s*select", query.lower(), re.S)
-        else False
-    )
+    is_select = _athena_is_select(query)
+
+    if result_mode not in ["api", "csv", "unload"]:
+        log.error(f"Unsupported result mode {result_mode}.")
+        return data
+
+    # streamed results are read once, they are never cached
+    cache = cache if is_select and not stream else None
+    cache_key = (query, database, result_mode, row_type)
+    if cache and (cached := cache.get(*cache_key)) is not None:
+        log.info("Execution SUCCEEDED from cache.")
+        return {"query_execution_state": "SUCCEEDED", "data": cached, "cached": True}
 
     # initialize client
     if not client:
-        client = boto3.client(
-            "athena",
-            region_name=os.getenv("AWS_REGION"),
-            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-        )
+        client = aws_client("athena")
+
+    unload_to = None
+    if is_select and result_mode == "unload":
+        unload_to = _athena_unload_location(output_location)
+        query = _athena_unload(query, unload_to)
 
     # execute the query
+    started = time.perf_counter()
     try:
-        resp = client.start_query_execution(
-            QueryString=query,
-            QueryExecutionContext={
-                "Database": "default" if not database else database,
-                "Catalog": "AwsDataCatalog",
-            },
-            ResultConfiguration={
-                "OutputLocation": (
-                    "s3://c2dwh-athena-queries/"
-                    if not output_location
-                    else output_location
-                ),
-                "EncryptionConfiguration": (
-                    {"EncryptionOption": "SSE_S3"}
-                    if not encrypt_config
-                    else encrypt_config
-                ),
-            },
+        resp = _athena_start(
+            client,
+            _athena_request(
+                query,
+                database,
+                output_location,
+                encrypt_config,
+                cache.reuse_minutes() if cache else 0,
+            ),
+            log,
         )
         data["query_execution_id"] = resp["QueryExecutionId"]
     except AwsClientError as e:
         log.error(f"Cannot execute the query >> {e.response}")
         return data
 
-    # wait for executing
+    # wait for executing, check often at first then back off with jitter
+    delay = 0.2
     while True:
         execution = client.get_query_execution(
             QueryExecutionId=resp["QueryExecutionId"]
         )
         data["query_execution_state"] = execution["QueryExecution"]["Status"]["State"]
 
+        if data["query_execution_state"] in ATHENA_DONE:
+            data["metrics"] = _athena_metrics(
+                execution["QueryExecution"], time.perf_counter() - started
+            )
         if data["query_execution_state"] in [
             "FAILED",
             "CANCELLED",
@@ -386,32 +1378,219 @@ def athena_sql_executor(
                 log.info(f'Execution {data["query_execution_state"]}.')
                 return data
 
-        time.sleep(0.2)
+        time.sleep(random.uniform(0.2, delay))
+        delay = min(delay * 2, 5.0)
 
     # normalize result (only for SELECT queries)
-    data["data"] = []
-    paginator = client.get_paginator("get_query_results")
+    data["data"] = _athena_results(
+        client,
+        execution["QueryExecution"],
+        result_mode=result_mode,
+        row_type=row_type,
+        stream=stream,
+        unload_to=unload_to,
+    )
+    if cache:
+        cache.put(data["data"], *cache_key)
 
-    columns = None
-    for page in paginator.paginate(QueryExecutionId=resp["QueryExecutionId"]):
-        rows = page["ResultSet"]["Rows"]
+    log.info(f'Execution {data["query_execution_state"]}.')
+    return data
 
-        if not columns:  # get list of columns and skip 1st row from 1st page only
-            columns = [
-                i.get("VarCharValue") for i in page["ResultSet"]["Rows"][0]["Data"]
-            ]
-            rows = rows[1:]
 
-        for row in rows:
-            data["data"].append(
-                {
-                    columns[i]: row["Data"][i].get("VarCharValue")
-                    for i in range(len(columns))
-                }
+class AthenaExecutor:
+    """
+    Asynchronous AWS Athena query runner. Many queries are submitted at once and a single poller checks
+    all running ones with **batch_get_query_execution**, backing off with jitter while nothing finishes.
+
+    Attributes
+    ----------
+    client: BaseClient, optional
+        Athena client, the shared pooled one is used if not provided (default: **None**).
+    database: str, optional
+        Database to run queries in (default: **default**).
+    output_location: str, optional
+        S3 location of query results (default: **s3://c2dwh-athena-queries/**).
+    encrypt_config: dict, optional
+        Encryption of query results (default: **SSE_S3**).
+    max_running: int, optional
+        Queries running on Athena at the same time, keep under the account DML/DDL quota (default: **20**).
+    poll_interval: tuple[float, float], optional
+        Min and max seconds between status checks (default: **(0.2, 5.0)**).
+    cache: QueryCache, optional
+        Result cache of SELECT queries, see **athena_sql_executor** (default: **None**).
+    """
+
+    BATCH_SIZE = 50  # limit of batch_get_query_execution
+
+    def __init__(
+        self,
+        *,
+        client: BaseClient | None = None,
+        database: str | None = None,
+        output_location: str | None = None,
+        encrypt_config: dict | None = None,
+        max_running: int = 20,
+        poll_interval: tuple[float, float] = (0.2, 5.0),
+        cache: QueryCache | None = None,
+        logger: logging.Logger | None = None,
+    ):
+        self.client = aws_client("athena") if not client else client
+        self.database = database
+        self.output_location = output_location
+        self.encrypt_config = encrypt_config
+        self.poll_interval = poll_interval
+        self.cache = cache
+        self.log = logging.getLogger("athena_executor") if not logger else logger
+        self.metrics = []  # one entry per finished query
+
+        self.__running = asyncio.Semaphore(max_running)
+        self.__pending = {}  # query execution id -> future of final execution
+        self.__poller = None
+        self.__delay = poll_interval[0]
+
+    async def execute(
+        self, query: str, *, result_mode: str = "api", row_type: str = "dict"
+    ):
+        """
+        Run one query and wait for it, returns the same dictionary as **athena_sql_executor**.
+        """
+
+        data = {}
+        is_select = _athena_is_select(query)
+
+        if result_mode not in ["api", "csv", "unload"]:
+            self.log.error(f"Unsupported result mode {result_mode}.")
+            return data
+
+        cache = self.cache if is_select else None
+        cache_key = (query, self.database, result_mode, row_type)
+        if cache and (cached := cache.get(*cache_key)) is not None:
+            self.log.info("Execution SUCCEEDED from cache.")
+            return {
+                "query_execution_state": "SUCCEEDED",
+                "data": cached,
+                "cached": True,
+            }
+
+        unload_to = None
+        if is_select and result_mode == "unload":
+            unload_to = _athena_unload_location(self.output_location)
+            query = _athena_unload(query, unload_to)
+
+        async with self.__running:
+            started = time.perf_counter()
+            try:
+                resp = await asyncio.to_thread(
+                    _athena_start,
+                    self.client,
+                    _athena_request(
+                        query,
+                        self.database,
+                        self.output_location,
+                        self.encrypt_config,
+                        cache.reuse_minutes() if cache else 0,
+                    ),
+                    self.log,
+                )
+                data["query_execution_id"] = resp["QueryExecutionId"]
+            except AwsClientError as e:
+                self.log.error(f"Cannot execute the query >> {e.response}")
+                return data
+
+            future = asyncio.get_running_loop().create_future()
+            self.__pending[resp["QueryExecutionId"]] = future
+            self.__delay = self.poll_interval[0]  # new query, check again soon
+            if not self.__poller or self.__poller.done():
+                self.__poller = asyncio.create_task(self.__poll())
+
+            execution = await future
+
+        data["query_execution_state"] = execution["Status"]["State"]
+        data["metrics"] = _athena_metrics(execution, time.perf_counter() - started)
+        self.metrics.append(data["metrics"])
+
+        if data["query_execution_state"] != "SUCCEEDED":
+            self.log.error(
+                f'Execution {data["query_execution_state"]} >> {execution["Status"].get("AthenaError", {}).get("ErrorMessage")}',
             )
+            return data
 
-    log.info(f'Execution {data["query_execution_state"]}.')
-    return data
+        # normalize result (only for SELECT queries)
+        if is_select:
+            data["data"] = await asyncio.to_thread(
+                _athena_results,
+                self.client,
+                execution,
+                result_mode=result_mode,
+                row_type=row_type,
+                unload_to=unload_to,
+            )
+            if cache:
+                cache.put(data["data"], *cache_key)
+
+        self.log.info(
+            f'Execution {data["query_execution_state"]} in {timetext(data["metrics"]["latency"])}'
+            + f' | {data["metrics"]["bytes_scanned"] / 1024**2:.2f} MB scanned.'
+        )
+        return data
+
+    async def execute_many(self, queries: list[str], **kwargs):
+        """
+        Run queries concurrently, results are in the same order as queries.
+        """
+
+        return await asyncio.gather(*[self.execute(i, **kwargs) for i in queries])
+
+    async def __poll(self):
+        try:
+            while self.__pending:
+                await asyncio.sleep(random.uniform(self.poll_interval[0], self.__delay))
+                ids = list(self.__pending)
+                finished = 0
+
+                for i in range(0, len(ids), self.BATCH_SIZE):
+                    try:
+                        resp = await asyncio.to_thread(
+                            self.client.batch_get_query_execution,
+                            QueryExecutionIds=ids[i : i + self.BATCH_SIZE],
+                        )
+                    except AwsClientError as e:
+                        self.log.warning(f"Cannot check query executions >> {e}")
+                        continue
+
+                    for execution in resp["QueryExecutions"]:
+                        if execution["Status"]["State"] not in ATHENA_DONE:
+                            continue
+                        future = self.__pending.pop(execution["QueryExecutionId"], None)
+                        if future and not future.done():
+                            future.set_result(execution)
+                        finished += 1
+
+                self.__delay = (
+                    self.poll_interval[0]
+                    if finished
+                    else min(self.__delay * 2, self.poll_interval[1])
+                )
+        except Exception as e:  # do not leave callers waiting forever
+            for future in self.__pending.values():
+                if not future.done():
+                    future.set_exception(e)
+            self.__pending.clear()
+            raise
+
+    def summary(self):
+        """
+        Aggregate metrics of all finished queries.
+        """
+
+        latencies = [i["latency"] for i in self.metrics]
+        return {
+            "queries": len(self.metrics),
+            "succeeded": sum(1 for i in self.metrics if i["state"] == "SUCCEEDED"),
+            "bytes_scanned": sum(i["bytes_scanned"] or 0 for i in self.metrics),
+            "latency_total": round(sum(latencies), 3),
+            "latency_max": max(latencies, default=0),
+        }
 
 
 def s3_folder_cleaner(
@@ -419,31 +1598,148 @@ def s3_folder_cleaner(
     *,
     client: BaseClient | None = None,
     bucket: str,
+    workers: int = 8,
+    dry_run: bool = False,
     logger: logging.Logger | None = None,
 ):
     """
     Free up AWS S3 bucket folder by prefix name. If prefix name is empty, everything in bucket will be removed.
+    Each listed page (up to 1000 keys) is deleted in one request while next pages are listed. With **dry_run**,
+    objects are only counted. Return counts of **deleted** and **failed** objects and their **bytes**.
     """
 
     log = logging.getLogger("s3_folder_cleaner") if not logger else logger
+    counts = {"deleted": 0, "failed": 0, "bytes": 0}
 
     # initialize client
     if not client:
-        client = boto3.client(
-            "s3",
-            region_name=os.getenv("AWS_REGION"),
-            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+        client = aws_client("s3")
+
+    def delete(objs: list[dict]):
+        resp = client.delete_objects(
+            Bucket=bucket,
+            Delete={"Objects": [{"Key": i["Key"]} for i in objs], "Quiet": True},
         )
+        errors = resp.get("Errors", [])
+        for i in errors[:5]:
+            log.warning(f"Cannot remove {i['Key']} >> {i.get('Message')}")
+
+        failed = {i["Key"] for i in errors}
+        return (
+            len(objs) - len(failed),
+            len(failed),
+            sum(i["Size"] for i in objs if i["Key"] not in failed),
+        )
+
+    def collect(future):
+        try:
+            result = future.result()
+        except AwsClientError as e:
+            log.error(
+                f"Error occurs while cleaning {prefix if prefix else bucket} >> {e}"
+            )
+            return
+        for name, value in zip(["deleted", "failed", "bytes"], result):
+            counts[name] += value
+
+    # get objects list, deletes of listed pages run in the background
+    paginator = client.get_paginator("list_objects_v2")
+    start = time.perf_counter()
+    futures = []
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        try:
+            for page in paginator.paginate(
+                Bucket=bucket, Prefix=prefix if prefix else ""
+            ):
+                objs = page.get("Contents", [])  # empty prefix has no contents
+                if not objs:
+                    continue
+                if dry_run:
+                    counts["deleted"] += len(objs)
+                    counts["bytes"] += sum(i["Size"] for i in objs)
+                    continue
+
+                futures.append(pool.submit(delete, objs))
+                if len(futures) >= workers * 2:  # bound keys held in memory
+                    collect(futures.pop(0))
+        except AwsClientError as e:
+            log.error(
+                f"Error occurs while listing {prefix if prefix else bucket} >> {e}"
+            )
+
+        for future in futures:
+            collect(future)
+
+    log.info(
+        f"{'Would remove' if dry_run else 'Removed'} {counts['deleted']} objects"
+        + f" | {counts['bytes'] / 1024**2:.2f} MB in {timetext(time.perf_counter() - start)}"
+        + (f" | {counts['failed']} failed" if counts["failed"] else "")
+    )
+    return counts
+
+
+def s3_prefix_lister(
+    prefix: str | None = None,
+    *,
+    client: BaseClient | None = None,
+    bucket: str,
+    logger: logging.Logger | None = None,
+):
+    """
+    List folders directly under prefix name of AWS S3 bucket, e.g. partition folders of a table.
+    """
+
+    log = logging.getLogger("s3_prefix_lister") if not logger else logger
+    prefixes = []
+
+    # initialize client
+    if not client:
+        client = aws_client("s3")
+
+    paginator = client.get_paginator("list_objects_v2")
+
+    try:
+        for page in paginator.paginate(
+            Bucket=bucket, Prefix=prefix if prefix else "", Delimiter="/"
+        ):
+            prefixes.extend(i["Prefix"] for i in page.get("CommonPrefixes", []))
+    except AwsClientError as e:
+        log.error(f"Error occurs while listing {prefix if prefix else bucket} >> {e}")
+
+    return prefixes
+
+
+def s3_object_lister(
+    prefix: str | None = None,
+    *,
+    client: BaseClient | None = None,
+    bucket: str,
+    since: float | None = None,
+    logger: logging.Logger | None = None,
+):
+    """
+    List keys of all objects under prefix name of AWS S3 bucket, only those modified after **since**
+    (epoch seconds) if given, e.g. files uploaded since a table was last read.
+    """
+
+    log = logging.getLogger("s3_object_lister") if not logger else logger
+    keys = []
+
+    # initialize client
+    if not client:
+        client = aws_client("s3")
 
-    # get objects list
     paginator = client.get_paginator("list_objects_v2")
 
     try:
         for page in paginator.paginate(Bucket=bucket, Prefix=prefix if prefix else ""):
-            objs = [{"Key": i["Key"]} for i in page["Contents"]]
-            client.delete_objects(Bucket=bucket, Delete={"Objects": objs})
-            for i in page["Contents"]:
-                log.info(f"Removed {i['Key']}.")
+            keys.extend(
+                i["Key"]
+                for i in page.get("Contents", [])
+                if since is None or i["LastModified"].timestamp() > since
+            )
     except AwsClientError as e:
-        log.error(f"Error occurs while cleaning {prefix if prefix else bucket} >> {e}")
+        log.error(f"Error occurs while listing {prefix if prefix else bucket} >> {e}")
+
+    return keys
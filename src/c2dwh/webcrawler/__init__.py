@@ -1,2 +1,13 @@
 from .crawler import Crawler
 from .scraper import Scraper
+from .scheduler import SlidingWindow
+from .ratelimit import RateLimiter
+from .frontier import Frontier
+from .cache import ValidatorCache, NOT_MODIFIED
+from .sitemap import sitemap_urls
+from .urlset import UrlSet, BloomFilter
+from .canonical import Canonicalizer, TRACKING_PARAMS
+from .transport import Transport, close_shared_client
+from .retry import RetryPolicy, RETRY_STATUSES
+from .archive import PageArchive
+from .metrics import Metrics
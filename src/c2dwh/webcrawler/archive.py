@@ -0,0 +1,214 @@
+import sqlite3, httpx, gzip, uuid, logging
+from pathlib import Path
+from datetime import datetime, date, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+
+# ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** #
+log = logging.getLogger("page_archive")
+
+# decoded body is stored, these no longer describe it
+SKIPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+class PageArchive:
+    """
+    Append-only archive of fetched pages as WARC-style response records, one **pages-<date>.warc.gz** file per
+    fetch date. Every record is its own gzip member, so one page is read back without the rest of the file,
+    and an SQLite index keeps where the records of each URL are. In replay mode pages are read from it instead
+    of the network, so parsing can be rerun offline.
+
+    Records written with **truncated** hold a partial body and are marked **WARC-Truncated**.
+
+    Attributes
+    ----------
+    path: str
+        Archive directory, created if missing.
+    replay: bool, str, date, optional
+        Serve pages from archive, **True** for latest record of each URL or a date for latest record fetched
+        on or before it (default: **False**).
+    keep_days: int, optional
+        Fetch dates kept when opened for writing, files and index records of older ones are deleted so
+        the archive does not grow without limit, **None** keeps everything (default: **None**).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        replay: bool | str | date = False,
+        keep_days: int | None = None,
+        logger: logging.Logger | None = None,
+    ):
+        self.path = Path(path)
+        self.log = log if not logger else logger
+        self.replay = bool(replay)
+        self.until = (  # last fetch date replayed
+            datetime.fromisoformat(str(replay)).date().isoformat()
+            if replay and replay is not True
+            else None
+        )
+        self.written = 0
+        self.replayed = 0
+        self.missing = 0
+        self.bytes = 0  # compressed bytes written
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.__files = dict()  # fetch date -> file appended to
+
+        self.__conn = sqlite3.connect(self.path / "index.db", isolation_level=None)
+        self.__conn.execute("pragma journal_mode=wal")
+        self.__conn.execute("pragma synchronous=normal")
+        self.__conn.execute(
+            """
+            create table if not exists records (
+                url text,
+                day text,
+                fetched_at text,
+                file text,
+                offset integer,
+                length integer,
+                status integer,
+                truncated integer
+            )
+            """
+        )
+        self.__conn.execute(
+            "create index if not exists records_url on records (url, day)"
+        )
+
+        if keep_days and not self.replay:
+            self.prune(keep_days)
+
+    def prune(self, keep_days: int):
+        """
+        Delete files and index records of fetch dates older than the last **keep_days** days, return
+        number of files deleted.
+        """
+
+        # today is always kept, its file may be open for writing
+        today = datetime.now(tz=ZoneInfo("Asia/Ho_Chi_Minh")).date()
+        oldest = (today - timedelta(days=max(1, keep_days) - 1)).isoformat()
+        files = [
+            i
+            for i in self.path.glob("pages-*.warc.gz")
+            if i.name.removeprefix("pages-").removesuffix(".warc.gz") < oldest
+        ]
+
+        # index first, so a failed delete leaves orphan files but never records pointing nowhere
+        self.__conn.execute("delete from records where day<?", (oldest,))
+        for i in files:
+            i.unlink(missing_ok=True)
+
+        if files:
+            self.log.info(f"Pruned {len(files)} archive days before {oldest}.")
+        return len(files)
+
+    def __file(self, day: str):
+        if day not in self.__files:
+            self.__files[day] = open(self.path / f"pages-{day}.warc.gz", "ab")
+        return self.__files[day]
+
+    def write(
+        self, url: str, resp: httpx.Response, body: bytes, *, truncated: bool = False
+    ):
+        """
+        Append response record of URL with given decoded body.
+        """
+
+        now = datetime.now(tz=timezone.utc)
+        day = now.astimezone(ZoneInfo("Asia/Ho_Chi_Minh")).date().isoformat()
+
+        http = (
+            f"{resp.http_version} {resp.status_code} {resp.reason_phrase}\r\n"
+            + "".join(
+                f"{i}: {j}\r\n"
+                for i, j in resp.headers.multi_items()
+                if i.lower() not in SKIPPED_HEADERS
+            )
+            + "\r\n"
+        ).encode("utf-8", "replace") + body
+        warc = (
+            "WARC/1.1\r\n"
+            + "WARC-Type: response\r\n"
+            + f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>\r\n"
+            + f"WARC-Date: {now.strftime('%Y-%m-%dT%H:%M:%SZ')}\r\n"
+            + f"WARC-Target-URI: {url}\r\n"
+            + ("WARC-Truncated: length\r\n" if truncated else "")
+            + "Content-Type: application/http; msgtype=response\r\n"
+            + f"Content-Length: {len(http)}\r\n"
+            + "\r\n"
+        ).encode()
+        record = gzip.compress(warc + http + b"\r\n\r\n", compresslevel=6)
+
+        file = self.__file(day)
+        offset = file.tell()
+        file.write(record)
+        file.flush()
+
+        self.__conn.execute(
+            "insert into records values (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                url,
+                day,
+                now.isoformat(),
+                Path(file.name).name,  # archive directory can be moved
+                offset,
+                len(record),
+                resp.status_code,
+                int(truncated),
+            ),
+        )
+        self.written += 1
+        self.bytes += len(record)
+
+    def read(self, url: str):
+        """
+        Body of latest archived record of URL within replay date, **None** if it is not archived.
+        """
+
+        row = self.__conn.execute(
+            "select file, offset, length from records where url=? and day<=? "
+            + "order by fetched_at desc limit 1",
+            (url, self.until or "9999-12-31"),
+        ).fetchone()
+
+        if not row:
+            self.missing += 1
+            return
+
+        with open(self.path / row[0], "rb") as f:
+            f.seek(row[1])
+            record = gzip.decompress(f.read(row[2]))
+
+        warc, _, rest = record.partition(b"\r\n\r\n")
+        length = next(
+            int(i.split(b":", 1)[1])
+            for i in warc.split(b"\r\n")
+            if i.lower().startswith(b"content-length:")
+        )
+        self.replayed += 1
+        return rest[:length].partition(b"\r\n\r\n")[2]  # http headers dropped
+
+    def urls(self):
+        """
+        Archived URLs within replay date.
+        """
+
+        return [
+            i[0]
+            for i in self.__conn.execute(
+                "select distinct url from records where day<=?",
+                (self.until or "9999-12-31",),
+            )
+        ]
+
+    def summary(self):
+        if self.replay:
+            return f"Replayed: {self.replayed} | Not archived: {self.missing}"
+        return f"Archived: {self.written} pages | {self.bytes / 1024**2:.2f} MB"
+
+    def close(self):
+        for i in self.__files.values():
+            i.close()
+        self.__files.clear()
+        self.__conn.close()
@@ -0,0 +1,90 @@
+import sqlite3, httpx, time, logging
+from pathlib import Path
+
+
+# ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** #
+log = logging.getLogger("validator_cache")
+
+
+class NotModified:
+    """
+    Marker returned by **async_inspect** when server answers 304, the page is unchanged since last run.
+    """
+
+    def __repr__(self):
+        return "NOT_MODIFIED"
+
+
+NOT_MODIFIED = NotModified()
+
+
+class ValidatorCache:
+    """
+    Persistent store of **ETag** and **Last-Modified** validators per URL, used for sending conditional
+    requests so unchanged pages come back as empty 304 responses.
+
+    Attributes
+    ----------
+    path: str
+        SQLite database file, created if missing.
+    """
+
+    def __init__(self, path: str, *, logger: logging.Logger | None = None):
+        self.path = Path(path)
+        self.log = log if not logger else logger
+        self.hits = 0  # 304 responses
+        self.misses = 0  # full responses
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.__conn = sqlite3.connect(self.path, isolation_level=None)  # autocommit
+        self.__conn.execute("pragma journal_mode=wal")
+        self.__conn.execute("pragma synchronous=normal")
+        self.__conn.execute(
+            """
+            create table if not exists validators (
+                url text primary key,
+                etag text,
+                last_modified text,
+                updated_at real
+            )
+            """
+        )
+
+    def headers(self, url: str):
+        """
+        Build conditional request headers for given URL, empty if nothing is known about it.
+        """
+
+        row = self.__conn.execute(
+            "select etag, last_modified from validators where url=?", (url,)
+        ).fetchone()
+
+        if not row or not any(row):
+            return {}
+
+        # max-age=0 overrides no-cache default header, Pragma is ignored then
+        headers = {"Cache-Control": "max-age=0"}
+        if row[0]:
+            headers["If-None-Match"] = row[0]
+        if row[1]:
+            headers["If-Modified-Since"] = row[1]
+        return headers
+
+    def store(self, url: str, resp: httpx.Response):
+        """
+        Save validators of a full response, URLs without any validator are skipped.
+        """
+
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+
+        if not etag and not last_modified:
+            return
+
+        self.__conn.execute(
+            "insert or replace into validators values (?, ?, ?, ?)",
+            (url, etag, last_modified, time.time()),
+        )
+
+    def close(self):
+        self.__conn.close()
@@ -0,0 +1,125 @@
+import re, fnmatch, logging
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+
+# ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** #
+log = logging.getLogger("canonicalizer")
+
+TRACKING_PARAMS = (
+    "utm_*",
+    "gclid",
+    "gbraid",
+    "wbraid",
+    "fbclid",
+    "msclkid",
+    "yclid",
+    "_ga",
+    "_gl",
+    "mc_cid",
+    "mc_eid",
+    "srsltid",
+)
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+@dataclass
+class Canonicalizer:
+    """
+    URL canonicalization applied to found links before they are queued, so variants of one page
+    are fetched once. Callable on a URL, counts how many URLs it changed.
+
+    Attributes
+    ----------
+    keep_params: tuple[str], optional
+        Whitelist of query parameters, empty tuple drops the whole query, **None** keeps all but **drop_params** (default: **None**).
+    drop_params: tuple[str], optional
+        Query parameters removed, ***** works as wildcard (default: **TRACKING_PARAMS**).
+    sort_params: bool, optional
+        Sort query parameters by name so their order does not matter (default: **True**).
+    drop_fragment: bool, optional
+        Remove **#fragment** (default: **True**).
+    strip_slash: bool, optional
+        Remove trailing slash of non-root paths (default: **True**).
+    rewrites: tuple[tuple[str, str]], optional
+        Per-site (pattern, replacement) regex rules applied on the canonical URL in order (default: **()**).
+    """
+
+    keep_params: tuple[str, ...] | None = None
+    drop_params: tuple[str, ...] = TRACKING_PARAMS
+    sort_params: bool = True
+    drop_fragment: bool = True
+    strip_slash: bool = True
+    rewrites: tuple[tuple[str, str], ...] = ()
+    total: int = field(default=0, init=False)
+    rewritten: int = field(default=0, init=False)
+
+    def __post_init__(self):
+        self.__drop = (
+            re.compile("|".join(fnmatch.translate(i) for i in self.drop_params))
+            if self.drop_params
+            else None
+        )
+        self.__rewrites = [(re.compile(i), j) for i, j in self.rewrites]
+
+    def __call__(self, url: str):
+        canonical = self.canonicalize(url)
+
+        self.total += 1
+        if canonical != url:
+            self.rewritten += 1
+        return canonical
+
+    def canonicalize(self, url: str):
+        """
+        Canonical form of URL, malformed URLs are returned stripped only.
+        """
+
+        try:
+            parts = urlsplit(url.strip())
+            port = parts.port
+        except ValueError:
+            return url.strip()
+
+        # lowercase scheme and host, drop default port
+        scheme = parts.scheme.lower()
+        netloc = (parts.hostname or "").rstrip(".")
+        if ":" in netloc:  # IPv6 literal loses its brackets in hostname
+            netloc = f"[{netloc}]"
+        if port and DEFAULT_PORTS.get(scheme) != port:
+            netloc = f"{netloc}:{port}"
+        if parts.username:
+            netloc = f"{parts.netloc.rsplit('@', 1)[0]}@{netloc}"
+
+        path = re.sub(r"/{2,}", "/", parts.path) or "/"
+        if self.strip_slash and len(path) > 1:
+            path = path.rstrip("/") or "/"
+
+        params = [
+            (i, j)
+            for i, j in parse_qsl(parts.query, keep_blank_values=True)
+            if (self.keep_params is None or i in self.keep_params)
+            and not (self.__drop and self.__drop.match(i))
+        ]
+        if self.sort_params:
+            params.sort()
+
+        canonical = urlunsplit(
+            (
+                scheme,
+                netloc,
+                path,
+                urlencode(params),
+                "" if self.drop_fragment else parts.fragment,
+            )
+        )
+        for pattern, repl in self.__rewrites:
+            canonical = pattern.sub(repl, canonical)
+        return canonical
+
+    def stats(self):
+        return {
+            "urls": self.total,
+            "rewritten": self.rewritten,
+            "rate": self.rewritten / self.total if self.total else 0.0,
+        }
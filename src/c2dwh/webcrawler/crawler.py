@@ -1,6 +1,19 @@
-import asyncio, httpx, re, logging
+import asyncio, httpx, re, time, logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import get_context
 from pathlib import Path
-from ..utils import dict_to_csv, s3_file_uploader
+from .scheduler import SlidingWindow
+from .ratelimit import RateLimiter
+from .frontier import Frontier
+from .cache import ValidatorCache, NOT_MODIFIED
+from .sitemap import sitemap_urls
+from .urlset import UrlSet, BloomFilter
+from .canonical import Canonicalizer
+from .transport import Transport, shared_client, close_shared_client
+from .retry import RetryPolicy
+from .archive import PageArchive
+from .metrics import Metrics, observe, timed, timer
+from ..utils import s3_file_uploader, csv_iter, CsvSink
 from lxml import html
 from urllib.parse import urljoin, urlparse
 from datetime import datetime
@@ -31,15 +44,38 @@ class Crawler:
         For uploading result file to AWS S3 bucket (default: **False**).
     s3_attrs: dict, optional
         Provide S3 attributes such as **client** (optional), **bucket** and **obj_prefix** for uploading (default: **None**).
+    frontier: str, optional
+        SQLite file keeping crawl state on disk instead of in-memory sets, an interrupted run resumes from it (default: **None**).
+    validator_cache: str, optional
+        SQLite file of ETag/Last-Modified validators, enables incremental re-crawl where unchanged pages are skipped.
+        Use with **save_in** or **frontier** so known URLs are still re-queued (default: **None**).
+    bloom_filter: int, optional
+        Expected number of URLs, checks found URLs against a Bloom filter (0.1% false positives) instead of
+        exact fingerprints to save more memory on huge sites. Not used with **frontier** (default: **None**).
+    canonicalizer: Canonicalizer, optional
+        Normalizes found URLs before queueing so variants of one page are fetched once, links are only
+        joined and stripped if not provided (default: **None**).
+
+    Valid URLs are counted in **result**. It holds the URLs themselves only when neither **save_in** nor
+    **frontier** is given, otherwise it keeps fingerprints and **urls** reads them back from where they are stored.
     """
 
     base_url = None
     search = None
     saving_path = None
     __queue = set()
-    __crawled = set()  # found urls
-    result = set()  # valid urls
-    __history = set()  # old urls from file
+    __crawled = UrlSet()  # found urls, fingerprints only
+    result = (
+        set()
+    )  # valid urls, fingerprints only when they are stored in saving_path or frontier
+    lastmod = dict()  # urls and their lastmod from sitemaps
+    __history = UrlSet()  # old urls from file
+    __frontier = None  # persistent state, replaces the sets above
+    __validators = None
+    __sink = None  # buffered writer of saving_path
+    __canonical = None
+    __links = 0  # found links
+    __duplicates = 0  # found links already known
     upload_to_s3 = False
     s3_attrs = dict()
     __lock = asyncio.Lock()
@@ -52,10 +88,28 @@ class Crawler:
         save_in: str | None = None,
         upload_to_s3: bool = False,
         s3_attrs: dict | None = None,
+        frontier: str | None = None,
+        validator_cache: str | None = None,
+        bloom_filter: int | None = None,
+        canonicalizer: Canonicalizer | None = None,
     ):
+        Crawler.__canonical = canonicalizer
         Crawler.base_url = base_url
         Crawler.search = search
-        Crawler.__queue.add(base_url)
+        base_url = Crawler.__canonicalize(base_url)
+        # urls are kept in memory only if they are stored nowhere else
+        Crawler.result = UrlSet() if save_in or frontier else set()
+
+        if validator_cache:
+            Crawler.__validators = ValidatorCache(validator_cache, logger=log)
+
+        if frontier:
+            Crawler.__frontier = Frontier(frontier, logger=log)
+            Crawler.__frontier.add([base_url])
+        else:
+            Crawler.__queue.add(base_url)
+            if bloom_filter:
+                Crawler.__crawled = BloomFilter(bloom_filter, logger=log)
 
         if save_in:
             Crawler.saving_path = (
@@ -70,6 +124,9 @@ class Crawler:
             )
 
             Crawler.__history_check()
+            Crawler.__sink = CsvSink(logger=log)
+            if frontier:
+                Crawler.__recover()
 
         if upload_to_s3:
             if not save_in:
@@ -102,20 +159,104 @@ class Crawler:
         xpath: str | None = None,
         limit_content_in: str | list[str] | None = None,
         semaphore: asyncio.Semaphore | None = None,
+        limiter: RateLimiter | None = None,
+        validators: ValidatorCache | None = None,
         encoding: str | None = None,
         retries: int = 3,
         retry_delay: float = 2.0,
+        retry_policy: RetryPolicy | None = None,
+        archive: PageArchive | None = None,
+        executor: Executor | None = None,
         logger: logging.Logger | None = None,
     ):
         """
-        Asynchronously inspect HTML content from given URL. **limit_content_in** is used for reducing
-        encoded response content when inspecting which helps inspect efficiently.
+        Asynchronously inspect HTML content from given URL, see **async_fetch** for downloading options.
+        Parsing runs in **executor** if given so it does not block other requests.
         """
 
         log = logging.getLogger("async_inspect") if not logger else logger
+        content = await Crawler.async_fetch(
+            url,
+            client=client,
+            limit_content_in=limit_content_in,
+            semaphore=semaphore,
+            limiter=limiter,
+            validators=validators,
+            encoding=encoding,
+            retries=retries,
+            retry_delay=retry_delay,
+            retry_policy=retry_policy,
+            archive=archive,
+            logger=log,
+        )
+
+        if content is None or content is NOT_MODIFIED:
+            return content
+
+        # inspect
+        try:
+            if executor:
+                result, seconds = await asyncio.get_running_loop().run_in_executor(
+                    executor, timed, Crawler.inspect, content, xpath
+                )
+                observe("parse", seconds)
+                return result
+            with timer("parse"):
+                return Crawler.inspect(content, xpath)
+        except Exception as e:
+            log.error(f"Error occurs while inspecting {url} >> {e}")
+            return
+
+    @staticmethod
+    def inspect(content: str | bytes, xpath: str | None = None):
+        """
+        Parse HTML content and evaluate XPath on it. Text results are returned as plain strings,
+        so they can be sent back from a process pool.
+        """
+
+        with timer("lxml_parse"):
+            source = html.fromstring(content)
+
+        if xpath:
+            with timer("xpath"):
+                found = source.xpath(xpath)
+            if isinstance(found, list):
+                return [str(i) if isinstance(i, str) else i for i in found]
+            return found
+        return html.tostring(source, pretty_print=True, encoding="unicode")
+
+    @staticmethod
+    async def async_fetch(
+        url,
+        *,
+        client: httpx.AsyncClient | None = None,
+        limit_content_in: str | list[str] | None = None,
+        semaphore: asyncio.Semaphore | None = None,
+        limiter: RateLimiter | None = None,
+        validators: ValidatorCache | None = None,
+        encoding: str | None = None,
+        retries: int = 3,
+        retry_delay: float = 2.0,
+        retry_policy: RetryPolicy | None = None,
+        archive: PageArchive | None = None,
+        logger: logging.Logger | None = None,
+    ):
+        """
+        Asynchronously download HTML content from given URL. **limit_content_in** is used for reducing
+        encoded response content when inspecting which helps inspect efficiently, its patterns run on the
+        raw bytes so only matched fragments get decoded. Pages are always read in full, so connections stay
+        reusable over HTTP/1.1 and HTTP/2. **limiter** paces requests per host and
+        backs off when the site pushes back. With **validators**, conditional requests are sent and
+        **NOT_MODIFIED** is returned for unchanged pages. Failed requests are retried by **retry_policy**,
+        made of **retries** and **retry_delay** if not given, without holding the **semaphore** slot while waiting.
+        Fetched pages are stored in **archive**, or read from it without any request in its replay mode.
+        Without **client**, a client shared in the event loop is used, close it with **close_shared_client**.
+        """
+
+        log = logging.getLogger("async_fetch") if not logger else logger
         last_exception = None
         resp = None
-        content = None
+        body = None
 
         if limit_content_in and not encoding:
             log.error(
@@ -126,81 +267,95 @@ class Crawler:
         if not semaphore:  # limit number of concurrent processes
             semaphore = asyncio.Semaphore(5)
 
-        async def get_response(
-            client: httpx.AsyncClient = None,
-        ):  # handle retries
-            nonlocal resp, last_exception
-            for _ in range(retries):
+        if not retry_policy:
+            retry_policy = RetryPolicy(
+                attempts=retries, base_delay=retry_delay, logger=log
+            )
+
+        # patterns run on raw bytes, only matched fragments get decoded
+        patterns = [
+            re.compile(
+                i.encode(encoding), re.S
+            )  # get any characters including newlines
+            for i in (
+                [limit_content_in]
+                if isinstance(limit_content_in, str)
+                else limit_content_in or []
+            )
+        ]
+
+        async def attempt(
+            client: httpx.AsyncClient,
+        ):  # holds a slot only while requesting
+            nonlocal resp, body
+            async with semaphore:
+                if limiter:
+                    await limiter.acquire(url)
+                resp = await client.send(
+                    client.build_request(
+                        "GET",
+                        url,
+                        headers=validators.headers(url) if validators else None,
+                    ),
+                    stream=True,
+                )
                 try:
-                    resp = await client.get(url)
+                    if limiter:
+                        limiter.update(url, resp)
+                    if validators and resp.status_code == 304:  # unchanged page
+                        return
                     resp.raise_for_status()
+                    with timer("download"):
+                        body = await resp.aread()
+                finally:
+                    await resp.aclose()
+
+        if archive and archive.replay:  # no request sent, page comes from archive
+            body = archive.read(url)
+            if body is None:
+                log.warning(f"{url} is not archived.")
+        else:
+            # without a global client, one shared client keeps connections alive across calls
+            client = client if client else shared_client()
+            started = time.monotonic()
+
+            for i in range(retry_policy.attempts):
+                try:
+                    await attempt(client)
                     break
-                except httpx.HTTPStatusError as e:
-                    log.error(f"Inspecting {url} failed >> {e}")
-                    return
-                except (httpx.RequestError, httpx.TimeoutException) as e:
-                    log.warning(f"{repr(e)} - {url}. Retry after {retry_delay} sec...")
+                except (httpx.HTTPStatusError, httpx.RequestError) as e:
                     last_exception = e
-                    await asyncio.sleep(retry_delay)
-
-        async with semaphore:
-            if client:  # global client
-                await get_response(client)
-            else:
-                async with httpx.AsyncClient(
-                    timeout=10.0,
-                    headers={
-                        "User-Agent": "Mozilla/5.0 (X11; Linux x86_64; rv:141.0) Gecko/20100101 Firefox/141.0",
-                        "Connection": "keep-alive",
-                    },
-                ) as client:
-                    await get_response(client)
-
-        if not resp:  # in case failed 3 times
-            log.error(f"Inspecting {url} failed 3 times >> {last_exception}")
+                    wait = retry_policy.wait(i, e, time.monotonic() - started)
+                    if wait is None:
+                        break
+                    log.warning(f"{repr(e)} - {url}. Retry after {wait:.1f} sec...")
+                    await asyncio.sleep(wait)  # slot is free for other urls meanwhile
+
+        if resp is not None and validators:
+            if resp.status_code == 304:
+                validators.hits += 1
+                return NOT_MODIFIED
+            validators.misses += 1
+
+        if body is None:  # in case retries ran out or bad status
+            if last_exception:
+                log.error(
+                    f"Inspecting {url} failed after {i + 1} {'attempts' if i else 'attempt'} >> {last_exception}"
+                )
             return
 
-        # reduce html content
-        if limit_content_in:
-            if isinstance(limit_content_in, str):
-                found = re.findall(
-                    limit_content_in,
-                    resp.content if not encoding else resp.content.decode(encoding),
-                    re.S,  # get any characters including newlines
-                )
-                content = (
-                    "\n".join(found)
-                    if found
-                    else resp.content if not encoding else resp.content.decode(encoding)
-                )
-            else:
-                result = []
-                for i in limit_content_in:
-                    found = re.findall(
-                        i,
-                        resp.content if not encoding else resp.content.decode(encoding),
-                        re.S,
-                    )
-                    if not found:
-                        continue
-                    result.extend(found)
-                content = (
-                    "\n".join(result)
-                    if result
-                    else resp.content if not encoding else resp.content.decode(encoding)
-                )
-        else:
-            content = resp.content if not encoding else resp.content.decode(encoding)
+        if validators and resp is not None:
+            validators.store(url, resp)
 
-        # inspect
-        try:
-            source = html.fromstring(content)
-            if xpath:
-                return source.xpath(xpath)
-            return html.tostring(source, pretty_print=True, encoding="unicode")
-        except Exception as e:
-            log.error(f"Error occurs while inspecting {url} >> {e}")
-            return
+        if archive and not archive.replay:
+            archive.write(url, resp, body)
+
+        # reduce html content
+        with timer("reduce"):
+            if patterns:
+                found = [j for i in patterns for j in i.findall(body)]
+                return (b"\n".join(found) if found else body).decode(encoding)
+            return body if not encoding else body.decode(encoding)
 
     @classmethod
     async def __crawl(
@@ -208,50 +363,111 @@ class Crawler:
         url: str,
         client: httpx.AsyncClient,
         semaphore: asyncio.Semaphore,
+        limiter: RateLimiter | None = None,
+        executor: Executor | None = None,
+        retry: RetryPolicy | None = None,
     ):
         found = await cls.async_inspect(
             url,
             client=client,
             xpath=cls.search,
             semaphore=semaphore,
+            limiter=limiter,
+            validators=cls.__validators,
             limit_content_in=r"<a[^>]*href[^>]*>.*?</a>",
             encoding="utf-8",
+            executor=executor,
+            retry_policy=retry,
             logger=log,
         )
 
         if not found:  # url might be broken or facing IP banned
             async with cls.__lock:
-                cls.__queue.remove(url)
+                if cls.__frontier:
+                    cls.__frontier.fail(url)
+                else:
+                    cls.__queue.discard(url)
             return
 
-        result = [str(urljoin(cls.base_url, i)).strip() for i in found]
+        result = (
+            []  # unchanged since last run, its links are already known
+            if found is NOT_MODIFIED
+            else [cls.__canonicalize(i) for i in found]
+        )
 
         # update results
+        if cls.__frontier:
+            async with cls.__lock:
+                added, is_new = cls.__frontier.visit(url, result)  # one commit per page
+                cls.__links += len(result)
+                cls.__duplicates += len(result) - added
+                if is_new and cls.saving_path:
+                    cls.__save(url)
+            return
+
         async with cls.__lock:
-            cls.__queue.remove(url)  # remove inspected url
-            cls.__queue.update(
-                i for i in result if i not in cls.__crawled
-            )  # put new urls into queue for inspecting
+            cls.__queue.discard(url)  # remove inspected url
+            new = {i for i in result if i not in cls.__crawled}
+            cls.__queue.update(new)  # put new urls into queue for inspecting
+            cls.__links += len(result)
+            cls.__duplicates += len(result) - len(new)
 
             if url not in cls.__history:
                 cls.__crawled.add(url)  # put inspected url into crawled
                 cls.result.add(url)  # only save valid urls
                 if cls.saving_path:
-                    dict_to_csv(
-                        {
-                            "url": url,
-                            "created_at": datetime.now(
-                                tz=ZoneInfo("Asia/Ho_Chi_Minh")
-                            ).strftime(
-                                "%Y-%m-%d %H:%M:%S"
-                            ),  # for precise time
-                        },
-                        path=cls.saving_path,
-                        logger=log,
-                    )  # only save new valid urls
+                    cls.__save(url)  # only save new valid urls
 
             cls.__crawled.update(result)  # also put found urls into crawled
 
+    @classmethod
+    def __canonicalize(cls, href: str):
+        url = str(urljoin(cls.base_url, href)).strip()
+        return cls.__canonical(url) if cls.__canonical else url
+
+    @classmethod
+    def __save(cls, url: str):
+        created_at = datetime.now(tz=ZoneInfo("Asia/Ho_Chi_Minh")).strftime(
+            "%Y-%m-%d %H:%M:%S"
+        )  # for precise time
+
+        cls.__sink.write({"url": url, "created_at": created_at}, path=cls.saving_path)
+
+    @classmethod
+    def urls(cls):
+        """
+        Iterate over valid URLs, read back from frontier or saved file when **result** keeps fingerprints only.
+        """
+
+        if cls.__frontier:
+            yield from cls.__frontier.valid_urls()
+        elif isinstance(cls.result, set):
+            yield from cls.result
+        elif cls.saving_path and cls.saving_path.is_file():
+            if cls.__sink:  # rows still in buffer
+                cls.__sink.flush()
+            for (url,) in csv_iter(
+                cls.saving_path, fields="url", row_type="tuple", logger=log
+            ):
+                yield url
+        else:
+            log.warning(
+                f"{len(cls.result)} valid urls were not stored, only their fingerprints are kept."
+            )
+
+    @classmethod
+    def __stats(cls):  # pending, crawled, valid and new urls
+        if cls.__frontier:
+            stats = cls.__frontier.stats()
+            return stats["pending"], stats["total"], stats["valid"], stats["new"]
+
+        return (
+            len(cls.__queue),
+            len(cls.__crawled),
+            len(cls.result),
+            len(cls.result) - len(cls.__history),  # history is always part of result
+        )
+
     @classmethod
     async def execute(
         cls,
@@ -262,6 +478,14 @@ class Crawler:
         chunksize: int = 20,
         semaphore: asyncio.Semaphore | None = None,
         delay: float | None = None,
+        rate_limiter: RateLimiter | None = None,
+        discovery: str = "links",
+        sitemap_filter: str | None = None,
+        workers: int | None = None,
+        pool: str = "process",
+        transport: Transport | None = None,
+        retry_policy: RetryPolicy | None = None,
+        metrics: Metrics | None = None,
     ):
         """
         Start crawling process from given base URL.
@@ -275,11 +499,30 @@ class Crawler:
         headers: httpx.Header, optional
             Custom HTTP request headers (default: **None**).
         chunksize: int, optional
-            Number of URLs to process per batch. Be cautious, high request rate could lead to IP banned (default: **20**).
+            Number of URLs kept in flight at once, a new URL starts as soon as one finishes. Be cautious, high request rate could lead to IP banned (default: **20**).
         semaphore: asyncio.Semaphore, optional
             Concurrency limit for simultaneous requests, best range in **5-20**.
         delay: float, optional
-            Delay between chunks (default: **None**).
+            Delay before dispatching each next **chunksize** URLs (default: **None**).
+        rate_limiter: RateLimiter, optional
+            Per-host token bucket limiting requests per second with adaptive backoff (default: **None**).
+        discovery: str, optional
+            **links** walks every page following **search**, **sitemap** reads URLs from the site sitemaps
+            and only walks pages when no sitemap URL is found (default: **links**).
+        sitemap_filter: str, optional
+            Regex searched in URL path for picking wanted sitemap URLs (default: **None**).
+        workers: int, optional
+            Size of the pool parsing pages beside the event loop, parsing blocks the loop when not set (default: **None**).
+        pool: str, optional
+            **process** for using all cores or **thread** for lighter pages since lxml releases the GIL. Processes are
+            spawned, so scripts starting a run need an **if __name__ == "__main__"** guard (default: **process**).
+        transport: Transport, optional
+            HTTP/2 connection pool settings, share one between Crawler and Scraper to sum up connection stats
+            (default: **Transport()**).
+        retry_policy: RetryPolicy, optional
+            Backoff, retried status codes and time budget per URL for failed requests (default: **RetryPolicy()**).
+        metrics: Metrics, optional
+            Timing histograms of each URL phase, exported and closed at the end (default: **None**).
         """
 
         default_headers = {
@@ -311,29 +554,62 @@ class Crawler:
         if not semaphore:
             semaphore = asyncio.Semaphore(5)
 
-        async with httpx.AsyncClient(
-            timeout=timeout,
-            follow_redirects=follow_redirects,
-            headers=headers,
-        ) as client:
-            while cls.__queue:
-                in_use = list(cls.__queue)[:chunksize]
-                tasks = [
-                    asyncio.create_task(cls.__crawl(i, client, semaphore))
-                    for i in in_use
-                ]
+        if not transport:
+            transport = Transport(logger=log)
 
-                await asyncio.gather(*tasks)
+        if not retry_policy:
+            retry_policy = RetryPolicy(logger=log)
 
-                if delay:
-                    await asyncio.sleep(delay)  # delay between chunks
+        # forking once sink and event loop threads run is unsafe, pool processes start fresh instead
+        executor = (
+            (
+                ProcessPoolExecutor(workers, mp_context=get_context("spawn"))
+                if pool == "process"
+                else ThreadPoolExecutor(workers)
+            )
+            if workers
+            else None
+        )
 
-                log.debug(
-                    f"From: {cls.base_url} | Pending: {len(cls.__queue)} | Crawled: {len(cls.__crawled)} | Valid: {len(cls.result)}"
-                )
+        if metrics:
+            metrics.start()
+        if cls.__sink:  # batches written by sink are timed too
+            cls.__sink.on_write = metrics.observe if metrics else None
 
-        if cls.__history:
-            new = len(cls.result - cls.__history)
+        try:
+            async with transport.client(
+                timeout=timeout,
+                follow_redirects=follow_redirects,
+                headers=headers,
+            ) as client:
+                if discovery == "sitemap" and await cls.__discover(
+                    client, sitemap_filter
+                ):
+                    pass  # no need to walk the site
+                else:
+                    await cls.__walk(
+                        client,
+                        semaphore,
+                        chunksize,
+                        delay,
+                        rate_limiter,
+                        executor,
+                        retry_policy,
+                    )
+        finally:
+            await close_shared_client()  # in case fetches ran without the run client
+            if executor:
+                executor.shutdown()
+            if cls.__sink:  # rows still in buffer
+                cls.__sink.flush()
+                cls.__sink.on_write = None
+            if metrics:
+                metrics.stop()
+
+        _, crawled, valid, new = cls.__stats()
+        has_history = valid > new
+
+        if has_history:
             text = (
                 f"(Found {new} more {'urls'if new>1 else 'url'})"
                 if new > 0
@@ -341,41 +617,155 @@ class Crawler:
             )
 
         log.info("Crawling successfully.")
+        log.info(transport.summary())
+        if retry_policy.failures:
+            log.info(retry_policy.summary())
         log.info(
-            f"From: {cls.base_url} | Crawled: {len(cls.__crawled)} | Valid: {len(cls.result)} {text if cls.__history else ''}",
+            f"From: {cls.base_url} | Crawled: {crawled} | Valid: {valid} {text if has_history else ''}",
         )
+        if cls.__validators:
+            log.info(
+                f"Unchanged: {cls.__validators.hits} | Downloaded: {cls.__validators.misses}"
+            )
+        if cls.__links:
+            log.info(
+                f"Links: {cls.__links} | Duplicates: {cls.__duplicates} ({cls.__duplicates / cls.__links:.1%})"
+                + (
+                    f" | Canonicalized: {cls.__canonical.rewritten} ({cls.__canonical.stats()['rate']:.1%})"
+                    if cls.__canonical
+                    else ""
+                )
+            )
+        if metrics:  # prometheus endpoint is shut down too
+            metrics.export()
+            metrics.close()
 
         # upload to s3 bucket
         if cls.upload_to_s3 and cls.s3_attrs:
-            if len(cls.result - cls.__history) > 0:
+            if new > 0:
                 bucket = cls.s3_attrs["bucket"]
                 filename = Path(cls.saving_path).name
                 key = f"{cls.s3_attrs['obj_prefix'] if cls.s3_attrs.get('obj_prefix') else ''}{filename}"
 
                 log.info(f"Start uploading {filename} to {bucket}...")
-                s3_file_uploader(
+                uploaded = await asyncio.to_thread(
+                    s3_file_uploader,
                     cls.saving_path,
                     client=cls.s3_attrs.get("client"),
                     bucket=bucket,
                     key=key,
                     logger=log,
                 )
-                log.info(f"Uploading {filename} successfully.")
+                if uploaded:
+                    log.info(
+                        f"Uploading {filename} successfully. ({uploaded['bytes']} bytes in {uploaded['seconds']:.2f}s)"
+                    )
             else:
                 log.info("Uploading cancelled since no more urls found.")
 
+    @classmethod
+    async def __walk(
+        cls,
+        client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        chunksize: int,
+        delay: float | None,
+        limiter: RateLimiter | None,
+        executor: Executor | None,
+        retry: RetryPolicy | None,
+    ):
+        def pull():  # take next url out of queue as soon as a slot frees up
+            if cls.__frontier:
+                return cls.__frontier.pop()
+            return cls.__queue.pop() if cls.__queue else None
+
+        def progress():
+            pending, crawled, valid, _ = cls.__stats()
+            log.debug(
+                f"From: {cls.base_url} | Pending: {pending} | Crawled: {crawled} | Valid: {valid}"
+            )
+
+        window = SlidingWindow(chunksize, delay=delay, on_progress=progress, logger=log)
+        await window.run(
+            pull,
+            lambda url: cls.__crawl(url, client, semaphore, limiter, executor, retry),
+        )
+
+    @classmethod
+    async def __discover(cls, client: httpx.AsyncClient, match: str | None):
+        found = await sitemap_urls(cls.base_url, client=client, match=match, logger=log)
+
+        if not found:
+            log.warning("No urls found in sitemaps. Fall back to following links.")
+            return False
+
+        found = {cls.__canonicalize(i): j for i, j in found.items()}
+        log.info(f"Found {len(found)} urls in sitemaps of {cls.base_url}.")
+        cls.lastmod.update(found)
+
+        async with cls.__lock:
+            if cls.__frontier:
+                cls.__frontier.add(found)
+                new = cls.__frontier.done_many(found)  # batched, not one commit per url
+                if cls.saving_path:
+                    for i in new:
+                        cls.__save(i)
+                cls.__frontier.finish()
+            else:
+                for i in found:
+                    if i not in cls.__history:
+                        cls.result.add(i)
+                        if cls.saving_path:
+                            cls.__save(i)
+                    cls.__crawled.add(i)
+                cls.__queue.clear()
+
+        return True
+
+    @classmethod
+    def __recover(cls):
+        # frontier commits a url as done at once but its row sits in sink buffer for a while,
+        # rows lost by a killed run are saved again or resumed runs would never save them
+        saved = UrlSet()
+        if cls.saving_path.is_file():
+            saved.update(
+                cls.__canonicalize(i[0])
+                for i in csv_iter(
+                    cls.saving_path, fields="url", row_type="tuple", logger=log
+                )
+            )
+
+        missing = [i for i in cls.__frontier.valid_urls() if i not in saved]
+        for i in missing:
+            cls.__save(i)
+
+        if missing:
+            cls.__sink.flush()
+            log.warning(
+                f"Saved {len(missing)} valid urls missing from {cls.saving_path.name} after an interrupted run."
+            )
+
     @classmethod
     def __history_check(cls):
         if not cls.saving_path.is_file():
             return
+        if cls.__frontier and len(cls.__frontier) > 1:  # history already kept on disk
+            return
 
         log.info(f"Previous work with {cls.base_url} detected. Continuing...")
 
         try:
             with cls.saving_path.open("r") as file:
                 next(file)
+                if cls.__frontier:
+                    cls.__frontier.add(
+                        (cls.__canonicalize(str(i).split(",")[0]) for i in file),
+                        valid=True,
+                    )
+                    log.info("History updated.")
+                    return
                 for i in file:
-                    url = str(i).split(",")[0]
+                    url = cls.__canonicalize(str(i).split(",")[0])
                     cls.__history.add(url)
                     cls.result.add(url)
                     cls.__queue.add(url)
@@ -395,9 +785,23 @@ class Crawler:
         if cls.saving_path:
             cls.saving_path = None
 
+        if cls.__frontier:
+            cls.__frontier.close()
+            cls.__frontier = None
+        if cls.__validators:
+            cls.__validators.close()
+            cls.__validators = None
+        if cls.__sink:
+            cls.__sink.close()
+            cls.__sink = None
+
         cls.base_url = None
         cls.search = None
+        cls.__canonical = None
+        cls.__links = 0
+        cls.__duplicates = 0
         cls.result.clear()
+        cls.lastmod.clear()
         cls.__queue.clear()
-        cls.__crawled.clear()
+        cls.__crawled = UrlSet()  # also drops bloom filter
         cls.__history.clear()
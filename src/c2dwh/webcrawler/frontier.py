@@ -0,0 +1,240 @@
+import sqlite3, time, logging
+from pathlib import Path
+from itertools import islice
+from typing import Iterable
+
+
+# ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** #
+log = logging.getLogger("frontier")
+
+
+class Frontier:
+    """
+    Persistent crawl frontier stored in SQLite. Every state change is committed immediately (WAL journal),
+    so a restarted run resumes exactly where the previous one stopped without keeping URLs in memory.
+    Bulk changes (**add**, **done_many**, **visit**) are grouped into one transaction instead of one per URL.
+
+    Attributes
+    ----------
+    path: str
+        SQLite database file, created if missing.
+    """
+
+    PENDING, IN_FLIGHT, DONE, FAILED = 0, 1, 2, 3
+
+    def __init__(self, path: str, *, logger: logging.Logger | None = None):
+        self.path = Path(path)
+        self.log = log if not logger else logger
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.__conn = sqlite3.connect(self.path, isolation_level=None)  # autocommit
+        self.__conn.execute("pragma journal_mode=wal")
+        self.__conn.execute("pragma synchronous=normal")
+        self.__conn.executescript(
+            """
+            create table if not exists frontier (
+                url text primary key,
+                state integer not null default 0,
+                valid integer not null default 0, -- inspected successfully in any run
+                found_run integer, -- run which made url valid first time
+                attempts integer not null default 0,
+                updated_at real
+            );
+            create index if not exists frontier_state on frontier (state);
+            create table if not exists meta (key text primary key, value integer);
+            insert or ignore into meta values ('run', 1);
+            """
+        )
+        self.run = self.__conn.execute(
+            "select value from meta where key='run'"
+        ).fetchone()[0]
+        self.resume()
+
+    def resume(self):
+        """
+        Put in-flight URLs of an interrupted run back to pending. If the last run has finished,
+        start a new run which re-visits every known URL.
+        """
+
+        stats = self.stats()
+
+        if stats["in_flight"]:
+            self.__conn.execute(
+                "update frontier set state=? where state=?",
+                (self.PENDING, self.IN_FLIGHT),
+            )
+            self.log.info(
+                f"Resumed run {self.run} with {stats['pending'] + stats['in_flight']} pending urls."
+            )
+        elif not stats["pending"] and (stats["done"] or stats["failed"]):
+            self.run += 1
+            with self.__conn:
+                self.__conn.execute("begin")
+                self.__conn.execute(
+                    "update meta set value=? where key='run'", (self.run,)
+                )
+                self.__conn.execute("update frontier set state=?", (self.PENDING,))
+            self.log.info(f"Previous run finished. Start run {self.run}.")
+        elif stats["pending"]:
+            self.log.info(
+                f"Resumed run {self.run} with {stats['pending']} pending urls."
+            )
+
+    def add(self, urls: Iterable[str], *, valid: bool = False):
+        """
+        Put new URLs into frontier as pending, known URLs are ignored. **valid** marks them as
+        already inspected in earlier runs (history).
+        """
+
+        with self.__conn:
+            self.__conn.execute("begin")
+            return self.__add(urls, valid)
+
+    def pop(self):
+        """
+        Take next pending URL and mark it in-flight, return **None** if nothing is pending.
+        """
+
+        row = self.__conn.execute(
+            "select url from frontier where state=? limit 1", (self.PENDING,)
+        ).fetchone()
+
+        if not row:
+            return
+
+        self.__conn.execute(
+            "update frontier set state=?, attempts=attempts+1, updated_at=? where url=?",
+            (self.IN_FLIGHT, time.time(), row[0]),
+        )
+        return row[0]
+
+    def done(self, url: str):
+        """
+        Mark URL as done, return **True** if it is valid for the first time.
+        """
+
+        return bool(self.done_many([url]))
+
+    def done_many(self, urls: Iterable[str], *, batch: int = 500):
+        """
+        Mark URLs as done, **batch** URLs per transaction instead of one commit per URL. Return the URLs
+        which are valid for the first time.
+        """
+
+        new, urls = [], iter(urls)
+
+        while chunk := list(dict.fromkeys(islice(urls, batch))):
+            with self.__conn:
+                self.__conn.execute("begin")
+                new.extend(self.__done(chunk))
+
+        return new
+
+    def visit(self, url: str, links: Iterable[str]):
+        """
+        Put **links** found on URL into frontier and mark URL as done in a single transaction.
+        Return number of links added and whether URL is valid for the first time.
+        """
+
+        with self.__conn:
+            self.__conn.execute("begin")
+            added = self.__add(links, False)
+            return added, bool(self.__done([url]))
+
+    def __add(self, urls: Iterable[str], valid: bool):
+        before = self.__conn.total_changes
+        self.__conn.executemany(
+            (
+                "insert into frontier (url, valid, updated_at) values (?, ?, ?) "
+                + "on conflict (url) do update set valid=max(valid, excluded.valid)"
+                if valid
+                else "insert or ignore into frontier (url, valid, updated_at) values (?, ?, ?)"
+            ),
+            ((i, int(valid), time.time()) for i in urls),
+        )
+        return self.__conn.total_changes - before
+
+    def __done(self, urls: list[str]):
+        # urls are bound as variables of a single query, keep them under 999 (oldest sqlite limit)
+        valid = {
+            url
+            for (url,) in self.__conn.execute(
+                f"select url from frontier where valid=1 and url in ({', '.join('?' * len(urls))})",
+                urls,
+            )
+        }
+        self.__conn.executemany(
+            "insert into frontier (url, state, valid, found_run, updated_at) values (?, ?, 1, ?, ?) "
+            + "on conflict (url) do update set state=excluded.state, valid=1, updated_at=excluded.updated_at, "
+            + "found_run=coalesce(found_run, excluded.found_run)",
+            (
+                (i, self.DONE, None if i in valid else self.run, time.time())
+                for i in urls
+            ),
+        )
+        return [i for i in urls if i not in valid]
+
+    def fail(self, url: str):
+        """
+        Mark URL as failed in current run.
+        """
+
+        self.__conn.execute(
+            "update frontier set state=?, updated_at=? where url=?",
+            (self.FAILED, time.time(), url),
+        )
+
+    def finish(self):
+        """
+        End current run without visiting URLs still pending, next run starts a new pass.
+        """
+
+        self.__conn.execute(
+            "update frontier set state=? where state in (?, ?)",
+            (self.DONE, self.PENDING, self.IN_FLIGHT),
+        )
+
+    def stats(self):
+        """
+        Count URLs by state, plus valid ones and the ones found in current run.
+        """
+
+        names = {
+            self.PENDING: "pending",
+            self.IN_FLIGHT: "in_flight",
+            self.DONE: "done",
+            self.FAILED: "failed",
+        }
+        stats = {i: 0 for i in names.values()}
+
+        for state, count in self.__conn.execute(
+            "select state, count(*) from frontier group by state"
+        ):
+            stats[names[state]] = count
+
+        stats["total"] = sum(stats.values())
+        stats["valid"], stats["new"] = self.__conn.execute(
+            "select count(*), count(case when found_run=? then 1 end) from frontier where valid=1",
+            (self.run,),
+        ).fetchone()
+        return stats
+
+    def valid_urls(self):
+        """
+        Iterate over URLs inspected successfully in any run.
+        """
+
+        for (url,) in self.__conn.execute("select url from frontier where valid=1"):
+            yield url
+
+    def __contains__(self, url: str):
+        return (
+            self.__conn.execute("select 1 from frontier where url=?", (url,)).fetchone()
+            is not None
+        )
+
+    def __len__(self):
+        return self.__conn.execute("select count(*) from frontier").fetchone()[0]
+
+    def close(self):
+        self.__conn.close()
@@ -0,0 +1,254 @@
+import json, socket, threading, time, logging
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+
+
+# ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** #
+log = logging.getLogger("metrics")
+
+# upper bounds in seconds, doubling from 50us to ~52s
+DEFAULT_BUCKETS = tuple(50e-6 * 2**i for i in range(21))
+
+_active = None  # metrics of running execute, phases are not timed without it
+
+
+def observe(name: str, seconds: float):
+    """
+    Record duration of a phase in running metrics, no-op when none is running.
+    """
+
+    if _active:
+        _active.observe(name, seconds)
+
+
+@contextmanager
+def timer(name: str):
+    """
+    Time the block as a phase of running metrics, no-op when none is running.
+    """
+
+    if not _active:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _active.observe(name, time.perf_counter() - start)
+
+
+def timed(func, *args):
+    """
+    Call function, return its result and seconds taken. Sent to a pool, it times the work where it runs
+    so waiting in the pool queue is not counted.
+    """
+
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+class Histogram:
+    """
+    Durations of one phase counted per bucket, quantiles are interpolated within the bucket they fall in.
+    """
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last one is above every bound
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q: float):
+        if not self.count:
+            return 0.0
+
+        rank, seen = q * self.count, 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                low = self.buckets[i - 1] if i else 0.0
+                high = self.buckets[i] if i < len(self.buckets) else self.max
+                return min(self.max, low + (high - low) * (rank - seen) / n)
+            seen += n
+        return self.max
+
+
+class Metrics:
+    """
+    Timing histograms of the phases each URL goes through, filled while it runs in Crawler or Scraper
+    **execute**: **connect** (DNS and TCP), **tls**, **ttfb**, **download**, **reduce** (regex),
+    **lxml_parse**, **xpath**, **json_decode**, **specs_parse**, **parse** (whole page) and **write**
+    (batches flushed by the output sink). With a parsing pool, only **parse** is timed since the phases
+    inside run in other processes. **execute** closes it at the end, so use a new one per run.
+
+    Attributes
+    ----------
+    save_to: str, optional
+        JSON file the summary is written to at the end of **execute**, it is logged otherwise (default: **None**).
+    prometheus_port: int, optional
+        Serve histograms in Prometheus text format at **/metrics** on this port until closed (default: **None**).
+    statsd: str, optional
+        **host:port** of a StatsD server every duration is sent to as timing over UDP (default: **None**).
+    prefix: str, optional
+        Prefix of exported metric names (default: **c2dwh**).
+    buckets: tuple[float], optional
+        Histogram upper bounds in seconds (default: **DEFAULT_BUCKETS**).
+    """
+
+    def __init__(
+        self,
+        *,
+        save_to: str | None = None,
+        prometheus_port: int | None = None,
+        statsd: str | None = None,
+        prefix: str = "c2dwh",
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+        logger: logging.Logger | None = None,
+    ):
+        self.save_to = Path(save_to) if save_to else None
+        self.prometheus_port = prometheus_port
+        self.prefix = prefix
+        self.buckets = tuple(sorted(buckets))
+        self.log = log if not logger else logger
+        self.histograms = dict()  # phase -> histogram
+        self.__lock = threading.Lock()  # thread pools observe too
+        self.__server = None
+        self.__statsd = None
+
+        if statsd:
+            host, _, port = statsd.rpartition(":")
+            self.__statsd = (host or "127.0.0.1", int(port))
+            self.__socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.__socket.setblocking(False)
+
+    def observe(self, name: str, seconds: float):
+        with self.__lock:
+            if name not in self.histograms:
+                self.histograms[name] = Histogram(self.buckets)
+            self.histograms[name].observe(seconds)
+
+        if self.__statsd:
+            try:
+                self.__socket.sendto(
+                    f"{self.prefix}.{name}:{seconds * 1000:.3f}|ms".encode(),
+                    self.__statsd,
+                )
+            except OSError:  # metrics must never break a run
+                pass
+
+    def start(self):
+        """
+        Collect phases timed anywhere in the process until **stop**, start Prometheus endpoint if asked.
+        """
+
+        global _active
+        _active = self
+
+        if self.prometheus_port and not self.__server:
+            self.__server = ThreadingHTTPServer(
+                ("0.0.0.0", self.prometheus_port), self.__handler()
+            )
+            self.__server.daemon_threads = True
+            threading.Thread(target=self.__server.serve_forever, daemon=True).start()
+            self.log.info(f"Serving metrics at :{self.prometheus_port}/metrics")
+
+    def stop(self):
+        global _active
+        if _active is self:
+            _active = None
+
+    def summary(self):
+        with self.__lock:
+            return {
+                name: {
+                    "count": i.count,
+                    "sum": round(i.sum, 6),
+                    "mean": round(i.sum / i.count, 6) if i.count else 0.0,
+                    "p50": round(i.quantile(0.5), 6),
+                    "p90": round(i.quantile(0.9), 6),
+                    "p99": round(i.quantile(0.99), 6),
+                    "max": round(i.max, 6),
+                }
+                for name, i in sorted(self.histograms.items())
+            }
+
+    def export(self):
+        """
+        Write JSON summary to **save_to** or log it, return the summary.
+        """
+
+        summary = self.summary()
+
+        if self.save_to:
+            self.save_to.parent.mkdir(parents=True, exist_ok=True)
+            self.save_to.write_text(json.dumps(summary, indent=2))
+            self.log.info(f"Metrics of {len(summary)} phases saved to {self.save_to}")
+        else:
+            self.log.info(f"Metrics: {json.dumps(summary)}")
+        return summary
+
+    def prometheus(self):
+        """
+        Histograms in Prometheus text exposition format.
+        """
+
+        name = f"{self.prefix}_phase_seconds"
+        lines = [
+            f"# HELP {name} Time spent in each phase of fetching and parsing a URL.",
+            f"# TYPE {name} histogram",
+        ]
+
+        with self.__lock:
+            for phase, i in sorted(self.histograms.items()):
+                total = 0
+                for bound, n in zip(self.buckets, i.counts):
+                    total += n
+                    lines.append(
+                        f'{name}_bucket{{phase="{phase}",le="{bound:g}"}} {total}'
+                    )
+                lines.append(f'{name}_bucket{{phase="{phase}",le="+Inf"}} {i.count}')
+                lines.append(f'{name}_sum{{phase="{phase}"}} {i.sum:.6f}')
+                lines.append(f'{name}_count{{phase="{phase}"}} {i.count}')
+        return "\n".join(lines) + "\n"
+
+    def __handler(self):
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+
+                body = metrics.prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def close(self):
+        self.stop()
+        if self.__server:
+            self.__server.shutdown()
+            self.__server.server_close()
+            self.__server = None
+        if self.__statsd:
+            self.__socket.close()
+            self.__statsd = None
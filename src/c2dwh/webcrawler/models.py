@@ -13,7 +13,7 @@ class ProductInfo:
     rating: float | None = None
     reviews_count: int | None = None
     url: str | None = None
-    release_date: datetime | None = None
+    release_date: str | None = None  # month/year or year text
     updated_at: datetime | None = None
 
 
@@ -70,8 +70,8 @@ class Tablet(ProductInfo):
 @dataclass
 class Laptop(ProductInfo):
     cpu: str | None = None
-    cpu_cores: int | None = None
-    cpu_threads: int | None = None
+    cpu_cores: str | None = None  # raw label text, cast in silver
+    cpu_threads: str | None = None
     cpu_speed: str | None = None
     gpu: str | None = None
     ram: str | None = None
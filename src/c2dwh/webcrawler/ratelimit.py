@@ -0,0 +1,135 @@
+import asyncio, httpx, time, logging
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+
+# ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** #
+log = logging.getLogger("rate_limiter")
+
+
+@dataclass
+class Bucket:
+    rate: float  # current refill rate, lowered when server pushes back
+    tokens: float
+    last: float = field(default_factory=time.monotonic)
+    blocked_until: float = 0.0  # honour Retry-After
+    lock: asyncio.Lock | None = None
+    loop: asyncio.AbstractEventLoop | None = None  # lock is only valid in one loop
+
+
+class RateLimiter:
+    """
+    Per-host token bucket rate limiter with adaptive backoff, shared by Crawler and Scraper.
+
+    Attributes
+    ----------
+    rate: float
+        Requests per second allowed for each host (default: **2.0**).
+    burst: int
+        Maximum number of requests can be sent at once after idling (default: **5**).
+    min_rate: float, optional
+        Lowest rate the limiter can back off to (default: **0.1**).
+    backoff: float, optional
+        Rate multiplier applied on 429/503 responses (default: **0.5**).
+    recovery: float, optional
+        Fraction of **rate** regained after every successful response (default: **0.05**).
+    """
+
+    throttle_codes = {429, 503}
+
+    def __init__(
+        self,
+        rate: float = 2.0,
+        burst: int = 5,
+        *,
+        min_rate: float = 0.1,
+        backoff: float = 0.5,
+        recovery: float = 0.05,
+        logger: logging.Logger | None = None,
+    ):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.min_rate = min(min_rate, rate)
+        self.backoff = backoff
+        self.recovery = recovery
+        self.log = log if not logger else logger
+        self.__buckets = dict()  # hostname and its bucket
+
+    def __bucket(self, url: str):
+        host = urlparse(url).hostname or ""
+        if host not in self.__buckets:
+            self.__buckets[host] = Bucket(rate=self.rate, tokens=float(self.burst))
+        return self.__buckets[host]
+
+    async def acquire(self, url: str):
+        """
+        Wait until a request to the host of given URL is allowed.
+        """
+
+        bucket = self.__bucket(url)
+        loop = asyncio.get_running_loop()
+
+        if bucket.loop is not loop:  # limiter reused across asyncio.run calls
+            bucket.lock, bucket.loop = asyncio.Lock(), loop
+
+        async with bucket.lock:  # waiters are served in order
+            while True:
+                now = time.monotonic()
+
+                if bucket.blocked_until > now:
+                    await asyncio.sleep(bucket.blocked_until - now)
+                    continue
+
+                bucket.tokens = min(
+                    self.burst, bucket.tokens + (now - bucket.last) * bucket.rate
+                )
+                bucket.last = now
+
+                if bucket.tokens >= 1:
+                    bucket.tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - bucket.tokens) / bucket.rate)
+
+    def update(self, url: str, resp: httpx.Response):
+        """
+        Adapt the host rate from server response, back off on 429/503 or **Retry-After** and recover slowly on success.
+        """
+
+        bucket = self.__bucket(url)
+        retry_after = self.retry_after(resp)
+
+        if resp.status_code in self.throttle_codes or retry_after is not None:
+            bucket.rate = max(self.min_rate, bucket.rate * self.backoff)
+            bucket.tokens = 0.0
+            if retry_after:
+                bucket.blocked_until = max(
+                    bucket.blocked_until, time.monotonic() + retry_after
+                )
+            self.log.warning(
+                f"{urlparse(url).hostname} throttled ({resp.status_code}). Slow down to {bucket.rate:.2f} req/s"
+                + (f" and pause {retry_after:.1f} sec." if retry_after else ".")
+            )
+        elif resp.status_code < 400 and bucket.rate < self.rate:
+            bucket.rate = min(self.rate, bucket.rate + self.rate * self.recovery)
+
+    @staticmethod
+    def retry_after(resp: httpx.Response):
+        """
+        Get **Retry-After** header value in seconds, support both delay-seconds and HTTP-date forms.
+        """
+
+        value = resp.headers.get("Retry-After")
+
+        if not value:
+            return
+        if value.strip().isdigit():
+            return float(value)
+
+        try:
+            date = parsedate_to_datetime(value)
+            return max(0.0, (date - datetime.now(tz=timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return
@@ -0,0 +1,107 @@
+import httpx, random, logging
+from collections import Counter
+from .ratelimit import RateLimiter
+
+
+# ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** #
+log = logging.getLogger("retry_policy")
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class RetryPolicy:
+    """
+    Decides whether a failed request is tried again and how long to wait, with exponential backoff and
+    full jitter so failed requests do not come back at once. Transient status codes are retried, a
+    **Retry-After** header is honoured, and every URL has a time budget it cannot run over. Failures are
+    counted by type for the run summary.
+
+    Attributes
+    ----------
+    attempts: int, optional
+        Requests sent per URL at most, first one included (default: **3**).
+    base_delay: float, optional
+        Backoff ceiling in seconds after the first failure, doubled after each next one (default: **1.0**).
+    max_delay: float, optional
+        Highest backoff ceiling in seconds (default: **30.0**).
+    budget: float, optional
+        Seconds a URL may take in total including waits, no retry is started past it (default: **60.0**).
+    retry_statuses: tuple[int], optional
+        Status codes worth retrying, other bad statuses fail at once (default: **RETRY_STATUSES**).
+    """
+
+    def __init__(
+        self,
+        *,
+        attempts: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        budget: float = 60.0,
+        retry_statuses: tuple[int, ...] = RETRY_STATUSES,
+        logger: logging.Logger | None = None,
+    ):
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+        self.retry_statuses = set(retry_statuses)
+        self.log = log if not logger else logger
+        self.retries = 0
+        self.failures = Counter()  # failure type -> requests failed with it
+        self.gave_up = Counter()  # failure type -> urls lost to it
+
+    @staticmethod
+    def classify(error: Exception):
+        """
+        Failure type of error, **http_<status>** for bad statuses or the exception name like **ConnectTimeout**.
+        """
+
+        if isinstance(error, httpx.HTTPStatusError):
+            return f"http_{error.response.status_code}"
+        return type(error).__name__
+
+    def retryable(self, error: Exception):
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code in self.retry_statuses
+        # timeouts, connection and protocol errors
+        return isinstance(error, httpx.TransportError)
+
+    def wait(self, attempt: int, error: Exception, elapsed: float):
+        """
+        Seconds to wait before retrying after failed **attempt** (counted from 0), **None** to give up.
+        """
+
+        kind = self.classify(error)
+        self.failures[kind] += 1
+
+        if attempt + 1 >= self.attempts or not self.retryable(error):
+            self.gave_up[kind] += 1
+            return
+
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+        if isinstance(error, httpx.HTTPStatusError):
+            retry_after = RateLimiter.retry_after(error.response)
+            if retry_after is not None:  # server knows better when to come back
+                delay = max(delay, retry_after)
+
+        if elapsed + delay > self.budget:
+            self.gave_up[kind] += 1
+            return
+
+        self.retries += 1
+        return delay
+
+    def stats(self):
+        return {
+            "retries": self.retries,
+            "failures": dict(self.failures),
+            "gave_up": dict(self.gave_up),
+        }
+
+    def summary(self):
+        return (
+            f"Retries: {self.retries} | Failures: "
+            + (" ".join(f"{i}: {j}" for i, j in self.failures.most_common()) or "0")
+            + " | Gave up: "
+            + (" ".join(f"{i}: {j}" for i, j in self.gave_up.most_common()) or "0")
+        )
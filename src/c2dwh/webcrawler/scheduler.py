@@ -0,0 +1,79 @@
+import asyncio, logging
+from typing import Any, Awaitable, Callable
+
+
+# ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** #
+log = logging.getLogger("scheduler")
+
+
+class SlidingWindow:
+    """
+    Asynchronous worker pool that keeps a fixed number of tasks in flight and pulls a new item
+    from the frontier as soon as a slot frees up, instead of waiting for a whole chunk to finish.
+
+    Attributes
+    ----------
+    size: int
+        Maximum number of tasks in flight at once (default: **20**).
+    delay: float, optional
+        Pause before dispatching each next **size** items, keeps the old between-chunks pacing (default: **None**).
+    on_progress: callable, optional
+        Called every time another **size** tasks have finished, used for progress logging (default: **None**).
+    logger: logging.Logger, optional
+        Logger for reporting failed tasks (default: **None**).
+    """
+
+    def __init__(
+        self,
+        size: int = 20,
+        *,
+        delay: float | None = None,
+        on_progress: Callable[[], Any] | None = None,
+        logger: logging.Logger | None = None,
+    ):
+        self.size = max(1, size)
+        self.delay = delay
+        self.on_progress = on_progress
+        self.log = log if not logger else logger
+        self.dispatched = 0
+        self.completed = 0
+
+    async def run(
+        self,
+        pull: Callable[[], Any | None],
+        work: Callable[[Any], Awaitable],
+    ):
+        """
+        Run **work** on every item returned by **pull** until the frontier is empty and no task is left
+        in flight. **pull** returns **None** when nothing is available at the moment, it will be called
+        again after any running task finishes since that task might have put new items into the frontier.
+        """
+
+        in_flight = set()
+
+        while True:
+            # fill free slots
+            while len(in_flight) < self.size:
+                item = pull()
+                if item is None:
+                    break
+                if self.delay and self.dispatched and self.dispatched % self.size == 0:
+                    await asyncio.sleep(self.delay)  # pace every window of items
+                in_flight.add(asyncio.create_task(work(item)))
+                self.dispatched += 1
+
+            if not in_flight:  # frontier exhausted
+                break
+
+            done, in_flight = await asyncio.wait(
+                in_flight, return_when=asyncio.FIRST_COMPLETED
+            )
+
+            for i in done:
+                if not i.cancelled() and i.exception():
+                    self.log.error(f"Task failed >> {repr(i.exception())}")
+
+            before = self.completed // self.size
+            self.completed += len(done)
+            if self.on_progress and self.completed // self.size > before:
+                self.on_progress()
@@ -1,12 +1,23 @@
 import httpx, json, asyncio, re, logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import get_context
 from pathlib import Path
 from .crawler import Crawler
+from .scheduler import SlidingWindow
+from .ratelimit import RateLimiter
+from .cache import ValidatorCache, NOT_MODIFIED
+from .transport import Transport, close_shared_client
+from .retry import RetryPolicy
+from .archive import PageArchive
+from .metrics import Metrics, observe, timed, timer
+from .specs import parse_specs
 from .models import ProductInfo, Phone, Tablet, Laptop, Watch, Earphones, Screen
-from ..utils import dict_to_csv, s3_file_uploader
+from ..utils import s3_batch_uploader, CsvSink, ParquetSink
 from urllib.parse import urlparse
 from datetime import datetime
 from zoneinfo import ZoneInfo
-from dataclasses import asdict
+from dataclasses import asdict, fields
+from typing import get_args
 
 
 # ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** #
@@ -30,17 +41,65 @@ class Scraper:
         For uploading result file to AWS S3 bucket (default: **False**).
     s3_attrs: dict, optional
         Provide S3 attributes such as **client** (optional), **bucket** and **obj_prefix** for uploading (default: **None**).
+    validator_cache: str, optional
+        SQLite file of ETag/Last-Modified validators, products unchanged since last run are skipped (default: **None**).
+    lastmod: dict, optional
+        URLs and their sitemap **lastmod** dates, **Crawler.lastmod** of a crawl run in the same process (default: **None**).
+    modified_since: str, datetime, optional
+        Skip URLs whose **lastmod** is older than this date, requires **lastmod** (default: **None**).
+    output_format: str, optional
+        **csv** or **parquet**, Parquet files are typed and compressed for Athena (default: **csv**).
+    stream_to_s3: bool, optional
+        Stream products into S3 multipart uploads while scraping instead of uploading local files afterwards,
+        **save_in** then only holds spilled part buffers. Requires **upload_to_s3** (default: **False**).
+    archive: str, optional
+        Directory of WARC-style page archive, every fetched page is stored in it (default: **None**).
+    replay: bool, str, datetime, optional
+        Read pages from **archive** instead of the network for reprocessing them, **True** for latest page of each
+        URL or a date for pages fetched up to that day (default: **False**).
+    archive_days: int, optional
+        Fetch dates kept in **archive**, older pages are deleted when scraping starts, **None** keeps all
+        (default: **None**).
     """
 
     __retailer = None
     saving_dir = None
-    __saving_paths = dict()  # include path and is_removed status (1 and 0)
+    __saving_paths = set()  # output files of current run
+    __sink = None  # buffered writer of output files
+    output_format = "csv"
+    stream_to_s3 = False
     __queue = set()
     __scraped = set()
     result = list()
     upload_to_s3 = False
     s3_attrs = dict()
+    __validators = None
+    __archive = None
+    __unchanged = set()  # skipped by sitemap lastmod
     __lock = asyncio.Lock()
+    __devices = {  # url hint, model, specs type and file label
+        "dtdd": (Phone, "phone", "phones"),
+        "laptop": (Laptop, "laptop", "laptops"),
+        "may-tinh-bang": (Tablet, "tablet", "tablets"),
+        "dong-ho-thong-minh": (Watch, "watch", "watches"),
+        "tai-nghe": (Earphones, "earphones", "earphones"),
+        "man-hinh-may-tinh": (Screen, "screen", "screens"),
+    }
+    __xpath = (
+        "//script[@id='productld']|//div[@class='box-specifi']/ul/"
+        + "li[.//span[@class='circle'] or .//a[contains(@class,'tzLink')] or .//span[@class='']]"
+    )
+    __limit_content_in = [
+        r'<script[^>]*id="productld"[^>]*>.*?</script>',
+        r'<section[^>]*class="detail detailv2"[^>]*>.*?</section>',
+    ]  # [^>] and .*? are for non-greedy
+    __types = {  # column types of each model for typed output, X | None unwrapped
+        i[0]: {
+            j.name: get_args(j.type)[0] if get_args(j.type) else j.type
+            for j in fields(i[0])
+        }
+        for i in __devices.values()
+    }
 
     def __init__(
         self,
@@ -49,6 +108,14 @@ class Scraper:
         save_in: str = None,
         upload_to_s3: bool = False,
         s3_attrs: dict | None = None,
+        validator_cache: str | None = None,
+        lastmod: dict[str, str] | None = None,
+        modified_since: str | datetime | None = None,
+        output_format: str = "csv",
+        stream_to_s3: bool = False,
+        archive: str | None = None,
+        replay: bool | str | datetime = False,
+        archive_days: int | None = None,
     ):
         Scraper.__queue.update(urls)
         Scraper.__retailer = "".join(
@@ -62,8 +129,35 @@ class Scraper:
         if save_in:
             Scraper.saving_dir = save_in
 
+        if output_format not in ["csv", "parquet"]:
+            log.error("Only support csv and parquet output formats.")
+            exit(1)
+        Scraper.output_format = output_format
+
+        if validator_cache:
+            Scraper.__validators = ValidatorCache(validator_cache, logger=log)
+
+        if replay and not archive:
+            log.error("'replay' requires 'archive' to read pages from.")
+            exit(1)
+
+        if archive:
+            Scraper.__archive = PageArchive(
+                archive, replay=replay, keep_days=archive_days, logger=log
+            )
+
+        if lastmod and modified_since:  # sitemap dates of products
+            since = datetime.fromisoformat(str(modified_since)).date()
+            Scraper.__unchanged.update(
+                i for i, j in lastmod.items() if j and j[:10] < str(since)
+            )
+
+        if stream_to_s3 and not upload_to_s3:
+            log.error("'stream_to_s3' requires 'upload_to_s3' and S3 attributes.")
+            exit(1)
+
         if upload_to_s3:
-            if not save_in:
+            if not save_in and not stream_to_s3:
                 log.error(
                     "Cannot locate output file for uploading since 'save_in' is missing."
                 )
@@ -84,6 +178,7 @@ class Scraper:
 
             Scraper.upload_to_s3 = upload_to_s3
             Scraper.s3_attrs = s3_attrs
+            Scraper.stream_to_s3 = stream_to_s3
 
     def __parse_common_info(data: dict):
         prd = ProductInfo(
@@ -154,360 +249,55 @@ class Scraper:
 
         return asdict(prd)
 
-    def __parse_specs_info(data: list[tuple], device: str):
-        def cpu():
-            value = [
-                j.strip()
-                for i, j in data
-                if i in ["Công nghệ CPU", "Chip xử lý (CPU)", "CPU"]
-            ]
-            return value[0] if value else None
-
-        def cpu_cores():
-            value = [j.strip() for i, j in data if i == "Số nhân"]
-            return value[0] if value else None
-
-        def cpu_threads():
-            value = [j.strip() for i, j in data if i == "Số luồng"]
-            return value[0] if value else None
-
-        def cpu_speed():
-            value = [j.strip() for i, j in data if i == "Tốc độ CPU"]
-            return value[0] if value else None
-
-        def gpu():
-            value = [
-                j.strip()
-                for i, j in data
-                if i in ["Chip đồ hoạ (GPU)", "Chip đồ họa (GPU)", "Card màn hình"]
-            ]
-            return value[0] if value else None
-
-        def ram():
-            value = [j.strip() for i, j in data if i == "RAM"]
-            return value[0] if value else None
-
-        def max_ram():
-            value = [j.strip() for i, j in data if i == "Hỗ trợ RAM tối đa"]
-            return value[0] if value else None
-
-        def ram_type():
-            value = [j.strip() for i, j in data if i == "Loại RAM"]
-            return value[0] if value else None
-
-        def ram_bus():
-            value = [j.strip() for i, j in data if i == "Tốc độ Bus RAM"]
-            return value[0] if value else None
+    @staticmethod
+    def classify(content: str):
+        """
+        Split reduced product page content into product JSON-LD and (label, value) spec rows.
+        """
 
-        def storage():
-            value = [
-                j.strip()
-                for i, j in data
-                if i in ["Ổ cứng", "Dung lượng lưu trữ", "Bộ nhớ trong"]
-            ]
-            return value[0] if value else None
+        fetched = Crawler.inspect(content, Scraper.__xpath)
+
+        data = [
+            re.sub(r"\s{2,}", ", ", i.text_content().strip())
+            for i in fetched
+            if ":" in i.text_content()
+        ]  # remove noise from fetched json
+        json_content = [i for i in data if re.findall(r"{|}", i)]
+        tags_content = [
+            (
+                i.split(":")[0].strip(),
+                "".join(i.split(":")[1:]).removeprefix(",").strip(),
+            )
+            for i in data
+            if not re.findall(r"{|}", i)
+        ]
 
-        def webcam():
-            value = [j.strip() for i, j in data if i == "Webcam"]
-            return value[0] if value else None
+        with timer("json_decode"):
+            return json.loads(json_content[0]), tags_content
 
-        def rearcam_specs():
-            if device == "tablet":
-                value = [j.strip() for i, j in data if i == "Độ phân giải"]
-                return value[1] if value else None
-            else:
-                value = [j.strip() for i, j in data if i == "Độ phân giải camera sau"]
-                return value[0] if value else None
-
-        def frontcam_specs():
-            if device == "tablet":
-                value = [j.strip() for i, j in data if i == "Độ phân giải"]
-                return value[-1] if value else None
-            value = [j.strip() for i, j in data if i == "Độ phân giải camera trước"]
-            return value[0] if value else None
-
-        def screen_tech():
-            value = [j.strip() for i, j in data if i == "Công nghệ màn hình"]
-            return value[0] if value else None
-
-        def screen_type():
-            value = [
-                j.strip()
-                for i, j in data
-                if i in ["Chất liệu mặt", "Mặt kính cảm ứng", "Loại màn hình"]
-            ]
-            return value[0] if value else None
+    @staticmethod
+    def parse_product(url: str, content: str):
+        """
+        Parse reduced product page content into product dict, return **None** if the page has no product data.
+        Being a plain function of its arguments, it can run in a worker process.
+        """
 
-        def screen_size():
-            value = [
-                j.strip()
-                for i, j in data
-                if i in ["Kích thước màn hình", "Màn hình rộng"]
-            ]
-            return value[0].split("-")[0].strip() if value else None
-
-        def screen_panel():
-            if device in ["laptop", "screen"]:
-                value = [j.strip() for i, j in data if i == "Tấm nền"]
-                return value[0] if value else None
-            value = [j.strip() for i, j in data if i == "Công nghệ màn hình"]
-            return value[0] if value else None
-
-        def screen_res():
-            value = [
-                j.strip()
-                for i, j in data
-                if i in ["Độ phân giải", "Độ phân giải màn hình"]
-            ]
-            return value[0] if value else None
-
-        def screen_rate():
-            if device in ["screen", "laptop"]:
-                value = [j.strip() for i, j in data if i == "Tần số quét"]
-                return value[0] if value else None
-            value = [j.strip() for i, j in data if i == "Màn hình rộng"]
-            return (
-                re.sub(r".*?(\d+\.?\d*\s*Hz)", r"\1", value[0])
-                if value and re.findall(r"\d+\.?\d*\s*Hz", value[0])
-                else None
-            )
+        try:
+            # json include some specs info but messy, full specs info are in tags
+            full_data, specs_data = Scraper.classify(content)
+        except Exception:
+            return
 
-        def screen_nits():
-            if device == "laptop":
-                value = [j.strip() for i, j in data if i == "Công nghệ màn hình"]
-                return (
-                    re.sub(r".*?(\d+\s?nits).*", r"\1", value[0])
-                    if value and re.findall(r"\d+\s?nits", value[0])
-                    else None
-                )
-            value = [j.strip() for i, j in data if i == "Độ sáng tối đa"]
-            return value[0] if value else None
-
-        def os():
-            value = [j.strip() for i, j in data if i == "Hệ điều hành"]
-            return value[0] if value else None
-
-        def water_resistant():
-            if device == "earphones":
-                value = [j.strip() for i, j in data if i == "Tiện ích"]
-                return (
-                    re.sub(r".*?(IP[X0-9]+).*", r"\1", value[0])
-                    if value and re.findall(r"IP[X0-9]+", value[0])
-                    else None
-                )
-            value = [
-                j.strip()
-                for i, j in data
-                if i in ["Chống nước / Kháng nước", "Kháng nước, bụi"]
-            ]
-            return value[0] if value else None
+        if url.split("/")[3] not in Scraper.__devices:
+            return
 
-        def battery():
-            value = [
-                j.strip()
-                for i, j in data
-                if i in ["Thông tin Pin", "Dung lượng pin", "Thời lượng pin tai nghe"]
-            ]
-            return value[0] if value else None
-
-        def charger():
-            value = [j.strip() for i, j in data if i == "Hỗ trợ sạc tối đa"]
-            return value[0] if value else None
-
-        def weight():
-            if device in ["laptop", "screen"]:
-                value = [
-                    j.strip()
-                    for i, j in data
-                    if i in ["Khối lượng có chân đế", "Kích thước"]
-                ]
-                return value[0].split("-")[-1].strip() if value else None
-            value = [
-                j.strip()
-                for i, j in data
-                if i in ["Kích thước, khối lượng", "Khối lượng"]
-            ]
-            return (
-                re.sub(r"(.*Nặng\s+)?(\d+\.?\d*)\s*[g(].*", r"\2", value[0]) + " g"
-                if value and re.findall(r"(.*Nặng\s+)?\d+\.?\d*\s*[g(]", value[0])
-                else None
-            )
+        # parse product info
+        model, device, _ = Scraper.__devices[url.split("/")[3]]
+        with timer("specs_parse"):
+            specs = parse_specs(specs_data, device)
+        product = model(**Scraper.__parse_common_info(full_data), **specs)
 
-        def material():
-            value = [
-                j.strip() for i, j in data if i in ["Chất liệu khung viền", "Chất liệu"]
-            ]
-            return value[0] if value else None
-
-        def connectivity():
-            value = {
-                j.strip() if j else ""
-                for i, j in data
-                if i
-                in [
-                    "Wifi",
-                    "Bluetooth",
-                    "Kết nối khác",
-                    "Kết nối không dây",
-                    "Kết nối",
-                    "Công nghệ kết nối",
-                ]
-            }
-            return ", ".join(value) if value else None
-
-        def network():
-            value = [j.strip() for i, j in data if i == "Mạng di động"]
-            return value[0] if value else None
-
-        def ports():
-            value = {
-                j.strip() if j else ""
-                for i, j in data
-                if i
-                in [
-                    "Jack tai nghe",
-                    "Cổng kết nối/sạc",
-                    "Cổng giao tiếp",
-                    "Cổng sạc",
-                    "Jack cắm",
-                    "Cổng kết nối",
-                ]
-            }
-            return ", ".join(value) if value else None
-
-        def sound_tech():
-            value = [j.strip() for i, j in data if i == "Công nghệ âm thanh"]
-            return value[0] if value else None
-
-        def compatible():
-            value = [j.strip() for i, j in data if i == "Tương thích"]
-            return value[0] if value else None
-
-        def control():
-            value = [j.strip() for i, j in data if i == "Điều khiển"]
-            return value[0] if value else None
-
-        def case_battery():
-            value = [j.strip() for i, j in data if i == "Thời lượng pin hộp sạc"]
-            return value[0] if value else None
-
-        def power_consumption():
-            value = [j.strip() for i, j in data if i == "Công suất tiêu thụ điện"]
-            return value[0] if value else None
-
-        match device:
-            case "phone":
-                return {
-                    "cpu": cpu(),
-                    "cpu_speed": cpu_speed(),
-                    "gpu": gpu(),
-                    "ram": ram(),
-                    "storage": storage(),
-                    "rearcam_specs": rearcam_specs(),
-                    "frontcam_specs": frontcam_specs(),
-                    "screen_type": screen_type(),
-                    "screen_size": screen_size(),
-                    "screen_panel": screen_panel(),
-                    "screen_res": screen_res(),
-                    "screen_rate": screen_rate(),
-                    "screen_nits": screen_nits(),
-                    "os": os(),
-                    "water_resistant": water_resistant(),
-                    "battery": battery(),
-                    "charger": charger(),
-                    "weight": weight(),
-                    "material": material(),
-                    "connectivity": connectivity(),
-                    "network": network(),
-                    "ports": ports(),
-                }
-            case "tablet":
-                return {
-                    "cpu": cpu(),
-                    "cpu_speed": cpu_speed(),
-                    "gpu": gpu(),
-                    "ram": ram(),
-                    "storage": storage(),
-                    "rearcam_specs": rearcam_specs(),
-                    "frontcam_specs": frontcam_specs(),
-                    "screen_size": screen_size(),
-                    "screen_panel": screen_panel(),
-                    "screen_res": screen_res(),
-                    "screen_rate": screen_rate(),
-                    "os": os(),
-                    "water_resistant": water_resistant(),
-                    "battery": battery(),
-                    "charger": charger(),
-                    "weight": weight(),
-                    "material": material(),
-                    "connectivity": connectivity(),
-                    "network": network(),
-                    "ports": ports(),
-                }
-            case "laptop":
-                return {
-                    "cpu": cpu(),
-                    "cpu_cores": cpu_cores(),
-                    "cpu_threads": cpu_threads(),
-                    "cpu_speed": cpu_speed(),
-                    "gpu": gpu(),
-                    "ram": ram(),
-                    "max_ram": max_ram(),
-                    "ram_type": ram_type(),
-                    "ram_bus": ram_bus(),
-                    "storage": storage(),
-                    "webcam": webcam(),
-                    "screen_panel": screen_panel(),
-                    "screen_size": screen_size(),
-                    "screen_tech": screen_tech(),
-                    "screen_res": screen_res(),
-                    "screen_rate": screen_rate(),
-                    "screen_nits": screen_nits(),
-                    "os": os(),
-                    "battery": battery(),
-                    "weight": weight(),
-                    "material": material(),
-                    "connectivity": connectivity(),
-                    "ports": ports(),
-                }
-            case "watch":
-                return {
-                    "cpu": cpu(),
-                    "storage": storage(),
-                    "screen_type": screen_type(),
-                    "screen_panel": screen_panel(),
-                    "screen_size": screen_size(),
-                    "os": os(),
-                    "water_resistant": water_resistant(),
-                    "connectivity": connectivity(),
-                    "battery": battery(),
-                    "weight": weight(),
-                    "material": material(),
-                }
-            case "earphones":
-                return {
-                    "sound_tech": sound_tech(),
-                    "compatible": compatible(),
-                    "control": control(),
-                    "water_resistant": water_resistant(),
-                    "ports": ports(),
-                    "connectivity": connectivity(),
-                    "battery": battery(),
-                    "case_battery": case_battery(),
-                    "weight": weight(),
-                }
-            case "screen":
-                return {
-                    "screen_type": screen_type(),
-                    "screen_panel": screen_panel(),
-                    "screen_size": screen_size(),
-                    "screen_tech": screen_tech(),
-                    "screen_res": screen_res(),
-                    "screen_rate": screen_rate(),
-                    "power_consumption": power_consumption(),
-                    "ports": ports(),
-                    "weight": weight(),
-                }
+        return asdict(product)
 
     @classmethod
     async def __scrape(
@@ -515,14 +305,14 @@ class Scraper:
         url: str,
         client: httpx.AsyncClient,
         semaphore: asyncio.Semaphore,
+        limiter: RateLimiter | None = None,
+        executor: Executor | None = None,
+        retry: RetryPolicy | None = None,
     ):
-        full_data = None  # include some specs info but messy
-        specs_data = []  # full specs info
         product = None
-        path = None
 
-        # ignore which is not product pages
-        if all(
+        # ignore which is not product pages or unchanged since given date
+        if url in cls.__unchanged or all(
             [
                 not re.findall(r"/dtdd/", url),
                 not re.findall(r"/laptop/", url),
@@ -536,40 +326,37 @@ class Scraper:
                 cls.__scraped.add(url)
                 cls.__queue.discard(url)
             return
-        try:
-            fetched = await Crawler.async_inspect(
-                url,
-                xpath="//script[@id='productld']|//div[@class='box-specifi']/ul/"
-                + "li[.//span[@class='circle'] or .//a[contains(@class,'tzLink')] or .//span[@class='']]",
-                limit_content_in=[
-                    r'<script[^>]*id="productld"[^>]*>.*?</script>',
-                    r'<section[^>]*class="detail detailv2"[^>]*>.*?</section>',
-                ],  # [^>] and .*? are for non-greedy
-                encoding="utf-8",
-                client=client,
-                semaphore=semaphore,
-                logger=log,
-            )
 
-            # classify fetched data
-            data = [
-                re.sub(r"\s{2,}", ", ", i.text_content().strip())
-                for i in fetched
-                if ":" in i.text_content()
-            ]  # remove noise from fetched json
-            json_content = [i for i in data if re.findall(r"{|}", i)]
-            tags_content = [
-                (
-                    i.split(":")[0].strip(),
-                    "".join(i.split(":")[1:]).removeprefix(",").strip(),
+        content = await Crawler.async_fetch(
+            url,
+            limit_content_in=cls.__limit_content_in,
+            encoding="utf-8",
+            client=client,
+            semaphore=semaphore,
+            limiter=limiter,
+            validators=cls.__validators,
+            retry_policy=retry,
+            archive=cls.__archive,
+            logger=log,
+        )
+
+        if content is NOT_MODIFIED:  # nothing changed since last run
+            async with cls.__lock:
+                cls.__scraped.add(url)
+                cls.__queue.discard(url)
+            return
+
+        if content is not None:
+            if executor:
+                product, seconds = await asyncio.get_running_loop().run_in_executor(
+                    executor, timed, cls.parse_product, url, content
                 )
-                for i in data
-                if not re.findall(r"{|}", i)
-            ]
+                observe("parse", seconds)
+            else:
+                with timer("parse"):
+                    product = cls.parse_product(url, content)
 
-            full_data = json.loads(json_content[0])
-            specs_data.extend(tags_content)
-        except Exception:
+        if not product:
             log.warning(
                 f"{url} might be an advertisement, not for sale officially or be removed. Check again."
             )
@@ -578,92 +365,35 @@ class Scraper:
                 cls.__queue.discard(url)
             return
 
-        # parse product info
-        match url.split("/")[3]:
-            case "dtdd":
-                product = Phone(
-                    **cls.__parse_common_info(full_data),
-                    **cls.__parse_specs_info(specs_data, "phone"),
-                )
-                path = (
-                    Path(cls.saving_dir)
-                    / f"{cls.__retailer.lower()}_phones_{datetime.today().date()}.csv"
-                )
-
-                if not cls.__saving_paths.get(path):
-                    cls.__saving_paths[path] = 0
-            case "laptop":
-                product = Laptop(
-                    **cls.__parse_common_info(full_data),
-                    **cls.__parse_specs_info(specs_data, "laptop"),
-                )
-                path = (
-                    Path(cls.saving_dir)
-                    / f"{cls.__retailer.lower()}_laptops_{datetime.today().date()}.csv"
-                )
-
-                if not cls.__saving_paths.get(path):
-                    cls.__saving_paths[path] = 0
-            case "may-tinh-bang":
-                product = Tablet(
-                    **cls.__parse_common_info(full_data),
-                    **cls.__parse_specs_info(specs_data, "tablet"),
-                )
-                path = (
-                    Path(cls.saving_dir)
-                    / f"{cls.__retailer.lower()}_tablets_{datetime.today().date()}.csv"
-                )
-                if not cls.__saving_paths.get(path):
-                    cls.__saving_paths[path] = 0
-            case "dong-ho-thong-minh":
-                product = Watch(
-                    **cls.__parse_common_info(full_data),
-                    **cls.__parse_specs_info(specs_data, "watch"),
-                )
-                path = (
-                    Path(cls.saving_dir)
-                    / f"{cls.__retailer.lower()}_watches_{datetime.today().date()}.csv"
-                )
-                if not cls.__saving_paths.get(path):
-                    cls.__saving_paths[path] = 0
-            case "tai-nghe":
-                product = Earphones(
-                    **cls.__parse_common_info(full_data),
-                    **cls.__parse_specs_info(specs_data, "earphones"),
-                )
-                path = (
-                    Path(cls.saving_dir)
-                    / f"{cls.__retailer.lower()}_earphones_{datetime.today().date()}.csv"
-                )
-                if not cls.__saving_paths.get(path):
-                    cls.__saving_paths[path] = 0
-            case "man-hinh-may-tinh":
-                product = Screen(
-                    **cls.__parse_common_info(full_data),
-                    **cls.__parse_specs_info(specs_data, "screen"),
-                )
-                path = (
-                    Path(cls.saving_dir)
-                    / f"{cls.__retailer.lower()}_screens_{datetime.today().date()}.csv"
-                )
-                if not cls.__saving_paths.get(path):
-                    cls.__saving_paths[path] = 0
-
         # update results
         async with cls.__lock:
             cls.__scraped.add(url)
             cls.__queue.discard(url)
-            cls.result.append(asdict(product))
-
-            if cls.saving_dir:
-                if path.exists():  # remove duplicate files in a same date
-                    if cls.__saving_paths[path] == 0 and path.stat().st_size > 0:
-                        path.unlink()
-                        cls.__saving_paths.update({path: 1})  # update file status
-                else:
-                    cls.__saving_paths.update({path: 1})
+            cls.result.append(product)
+
+        if cls.__sink:
+            model, _, label = cls.__devices[url.split("/")[3]]
+            filename = f"{cls.__retailer.lower()}_{label}_{datetime.today().date()}.{cls.output_format}"
+            path = (
+                cls.__s3_key(filename)
+                if cls.stream_to_s3
+                else Path(cls.saving_dir) / filename
+            )
+            # file of a same date is replaced
+            overwrite = path not in cls.__saving_paths
+            cls.__saving_paths.add(path)
+            cls.__sink.write(
+                product, path=path, overwrite=overwrite, types=cls.__types[model]
+            )
 
-                dict_to_csv(asdict(product), path=path, logger=log)
+    @classmethod
+    def __s3_key(cls, filename: str):
+        # <prefix><category>/date=<date>/<category>.<format>
+        name, date = Path(filename).stem.split("_")[1:3]
+        return (
+            f"{cls.s3_attrs['obj_prefix'] if cls.s3_attrs.get('obj_prefix') else ''}"
+            + f"{name}/date={date}/{name}{Path(filename).suffix}"
+        )
 
     @classmethod
     async def execute(
@@ -675,6 +405,12 @@ class Scraper:
         chunksize: int = 20,
         semaphore: asyncio.Semaphore = None,
         delay: float = None,
+        rate_limiter: RateLimiter | None = None,
+        workers: int | None = None,
+        pool: str = "process",
+        transport: Transport | None = None,
+        retry_policy: RetryPolicy | None = None,
+        metrics: Metrics | None = None,
     ):
         """
         Start scraping process from given list of URLs.
@@ -688,11 +424,25 @@ class Scraper:
         headers: httpx.Header, optional
             Custom HTTP request headers (default: **None**).
         chunksize: int, optional
-            Number of URLs to process per batch. Be cautious, high request rate could lead to IP banned (default: **20**).
+            Number of URLs kept in flight at once, a new URL starts as soon as one finishes. Be cautious, high request rate could lead to IP banned (default: **20**).
         semaphore: asyncio.Semaphore, optional
             Concurrency limit for simultaneous requests, best range in **5-20**.
         delay: float, optional
-            Delay between chunks (default: **None**).
+            Delay before dispatching each next **chunksize** URLs (default: **None**).
+        rate_limiter: RateLimiter, optional
+            Per-host token bucket limiting requests per second with adaptive backoff (default: **None**).
+        workers: int, optional
+            Size of the pool parsing product pages beside the event loop, parsing blocks the loop when not set (default: **None**).
+        pool: str, optional
+            **process** for using all cores or **thread** for lighter pages since lxml releases the GIL. Processes are
+            spawned, so scripts starting a run need an **if __name__ == "__main__"** guard (default: **process**).
+        transport: Transport, optional
+            HTTP/2 connection pool settings, share one between Crawler and Scraper to sum up connection stats
+            (default: **Transport()**).
+        retry_policy: RetryPolicy, optional
+            Backoff, retried status codes and time budget per URL for failed requests (default: **RetryPolicy()**).
+        metrics: Metrics, optional
+            Timing histograms of each URL phase, exported and closed at the end (default: **None**).
         """
 
         default_headers = {
@@ -724,62 +474,111 @@ class Scraper:
         if not semaphore:
             semaphore = asyncio.Semaphore(5)
 
-        async with httpx.AsyncClient(
-            timeout=timeout,
-            follow_redirects=follow_redirects,
-            headers=headers,
-        ) as client:
-            while cls.__queue:
-                in_use = list(cls.__queue)[:chunksize]
-                tasks = [
-                    asyncio.create_task(cls.__scrape(i, client, semaphore))
-                    for i in in_use
-                ]
+        if not transport:
+            transport = Transport(logger=log)
 
-                await asyncio.gather(*tasks)
+        if not retry_policy:
+            retry_policy = RetryPolicy(logger=log)
 
-                if delay:
-                    await asyncio.sleep(delay)  # delay between chunks
+        # forking once sink and event loop threads run is unsafe, pool processes start fresh instead
+        executor = (
+            (
+                ProcessPoolExecutor(workers, mp_context=get_context("spawn"))
+                if pool == "process"
+                else ThreadPoolExecutor(workers)
+            )
+            if workers
+            else None
+        )
 
-                log.debug(
-                    f"From: {cls.__retailer} | Pending {len(cls.__queue)} | Scraped: {len(cls.__scraped)} | Valid: {len(cls.result)}",
+        # parquet files and streamed uploads are complete only once closed
+        if cls.saving_dir or cls.stream_to_s3:
+            cls.__sink = (ParquetSink if cls.output_format == "parquet" else CsvSink)(
+                bucket=cls.s3_attrs["bucket"] if cls.stream_to_s3 else None,
+                client=cls.s3_attrs.get("client"),
+                spill_dir=cls.saving_dir,
+                on_write=metrics.observe if metrics else None,
+                logger=log,
+            )
+
+        def pull():  # take next url out of queue as soon as a slot frees up
+            return cls.__queue.pop() if cls.__queue else None
+
+        def progress():
+            log.debug(
+                f"From: {cls.__retailer} | Pending {len(cls.__queue)} | Scraped: {len(cls.__scraped)} | Valid: {len(cls.result)}",
+            )
+
+        if metrics:
+            metrics.start()
+
+        failed = True  # streamed uploads are only completed after a full run
+        try:
+            async with transport.client(
+                timeout=timeout,
+                follow_redirects=follow_redirects,
+                headers=headers,
+            ) as client:
+                window = SlidingWindow(
+                    chunksize, delay=delay, on_progress=progress, logger=log
                 )
+                await window.run(
+                    pull,
+                    lambda url: cls.__scrape(
+                        url, client, semaphore, rate_limiter, executor, retry_policy
+                    ),
+                )
+            failed = False
+        finally:
+            await close_shared_client()  # in case fetches ran without the run client
+            if executor:
+                executor.shutdown()
+            if cls.__sink:  # write rows still in buffer, complete streamed uploads
+                cls.__sink.close(abort=failed)
+            if metrics:
+                metrics.stop()
 
         log.info("Scraping successfully.")
+        log.info(transport.summary())
+        if retry_policy.failures:
+            log.info(retry_policy.summary())
         log.info(
             f"From: {cls.__retailer} | Scraped: {len(cls.__scraped)} | Valid: {len(cls.result)}"
         )
+        if cls.__validators:
+            log.info(
+                f"Unchanged: {cls.__validators.hits} | Downloaded: {cls.__validators.misses}"
+            )
+        if cls.__archive:
+            log.info(cls.__archive.summary())
+        if metrics:  # prometheus endpoint is shut down too
+            metrics.export()
+            metrics.close()
 
         # upload to s3 bucket
-        if cls.upload_to_s3 and cls.s3_attrs:
+        if cls.stream_to_s3:
+            log.info(
+                f"Streamed {len(cls.__saving_paths)} files to {cls.s3_attrs['bucket']}."
+            )
+        elif cls.upload_to_s3 and cls.s3_attrs:
             bucket = cls.s3_attrs["bucket"]
-            files = []
-
-            # uploading work
-            def upload(file: str, bucket: str, key: str):
-                fname = Path(file).name
-                log.info(f"Start uploading {fname} to {bucket}...")
-                s3_file_uploader(
-                    file,
-                    client=cls.s3_attrs.get("client"),
-                    bucket=bucket,
-                    key=key,
-                    logger=log,
-                )
-                log.info(f"Uploading {fname} successfully.")
-
-            for i in cls.__saving_paths:
-                filename = Path(i).name
-                key = (
-                    f"{cls.s3_attrs['obj_prefix'] if cls.s3_attrs.get('obj_prefix') else ''}"
-                    + f"{filename.split('_')[1]}/"
-                    + f"date={filename.split('_')[2].removesuffix('.csv')}/"
-                    + f"{filename.split('_')[1]}.csv"
-                )
-                files.append({"file": i, "bucket": bucket, "key": key})
+            files = [
+                {"path": i, "key": cls.__s3_key(Path(i).name)}
+                for i in cls.__saving_paths
+            ]
 
-            tasks = [asyncio.to_thread(upload, **i) for i in files]
-            await asyncio.gather(*tasks)
+            log.info(f"Start uploading {len(files)} files to {bucket}...")
+            uploaded = await asyncio.to_thread(
+                s3_batch_uploader,
+                files,
+                client=cls.s3_attrs.get("client"),
+                bucket=bucket,
+                logger=log,
+            )
+            for i in uploaded:
+                log.debug(
+                    f"Uploaded {Path(i['file']).name} | {i['bytes']} bytes in {i['seconds']:.2f}s"
+                )
 
     @classmethod
     def reset(cls):
@@ -792,7 +591,21 @@ class Scraper:
         if cls.saving_dir:
             cls.saving_dir = None
 
+        if cls.__validators:
+            cls.__validators.close()
+            cls.__validators = None
+        if cls.__sink:
+            cls.__sink.close()
+            cls.__sink = None
+        if cls.__archive:
+            cls.__archive.close()
+            cls.__archive = None
+
         cls.__retailer = None
+        cls.output_format = "csv"
+        cls.stream_to_s3 = False
         cls.__queue.clear()
+        cls.__unchanged.clear()
+        cls.__saving_paths.clear()
         cls.__scraped.clear()
         cls.result.clear()
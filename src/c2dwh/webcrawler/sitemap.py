@@ -0,0 +1,106 @@
+import httpx, re, zlib, logging
+from lxml import etree
+from urllib.parse import urljoin, urlparse
+
+
+# ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** #
+log = logging.getLogger("sitemap")
+
+
+async def robots_sitemaps(
+    base_url: str,
+    *,
+    client: httpx.AsyncClient,
+    logger: logging.Logger | None = None,
+):
+    """
+    Get sitemap URLs declared in **robots.txt** of given site, fall back to **/sitemap.xml** if none.
+    """
+
+    log_ = log if not logger else logger
+    sitemaps = []
+
+    try:
+        resp = await client.get(urljoin(base_url, "/robots.txt"))
+        resp.raise_for_status()
+        sitemaps = [
+            i.split(":", 1)[1].strip()
+            for i in resp.text.splitlines()
+            if i.lower().startswith("sitemap:")
+        ]
+    except (httpx.HTTPStatusError, httpx.RequestError) as e:
+        log_.warning(f"Cannot read robots.txt of {base_url} >> {e}")
+
+    return sitemaps if sitemaps else [urljoin(base_url, "/sitemap.xml")]
+
+
+async def sitemap_urls(
+    base_url: str,
+    *,
+    client: httpx.AsyncClient,
+    match: str | None = None,
+    logger: logging.Logger | None = None,
+):
+    """
+    Discover page URLs with their **lastmod** from the sitemaps of given site. Sitemap indexes are followed,
+    gzipped sitemaps are inflated on the fly and every file is parsed while streaming so memory stays flat.
+    **match** is a regex searched in URL path for keeping only wanted pages.
+    """
+
+    log_ = log if not logger else logger
+    pattern = re.compile(match) if match else None
+    queue = await robots_sitemaps(base_url, client=client, logger=log_)
+    seen = set()
+    found = {}  # url and its lastmod
+
+    while queue:
+        sitemap = queue.pop(0)
+        if sitemap in seen:
+            continue
+        seen.add(sitemap)
+
+        parser = etree.XMLPullParser(events=("end",), recover=True, huge_tree=True)
+        inflater = None
+        entry = {}
+
+        def read_events():  # collect entries then free parsed elements
+            nonlocal entry
+            for _, el in parser.read_events():
+                tag = etree.QName(el).localname
+                if tag in ("loc", "lastmod"):
+                    entry[tag] = (el.text or "").strip()
+                elif tag in ("url", "sitemap"):
+                    loc = entry.get("loc")
+                    if loc and tag == "sitemap":
+                        queue.append(loc)
+                    elif loc and (not pattern or pattern.search(urlparse(loc).path)):
+                        found[loc] = entry.get("lastmod") or None
+                    entry = {}
+                    el.clear()
+                    while el.getprevious() is not None:
+                        del el.getparent()[0]
+
+        try:
+            async with client.stream("GET", sitemap) as resp:
+                resp.raise_for_status()
+                async for chunk in resp.aiter_bytes():
+                    if inflater is None:  # gzip file, not gzip transfer encoding
+                        inflater = (
+                            zlib.decompressobj(wbits=47)
+                            if chunk[:2] == b"\x1f\x8b"
+                            else False
+                        )
+                    parser.feed(inflater.decompress(chunk) if inflater else chunk)
+                    read_events()
+            parser.close()
+            read_events()
+        except (httpx.HTTPStatusError, httpx.RequestError, zlib.error) as e:
+            log_.warning(f"Cannot read sitemap {sitemap} >> {e}")
+            continue
+        except etree.XMLSyntaxError as e:
+            log_.warning(f"Malformed sitemap {sitemap} >> {e}")
+            continue
+
+        log_.debug(f"Sitemap: {sitemap} | Found: {len(found)}")
+
+    return found
@@ -0,0 +1,324 @@
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Iterable
+
+
+# ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** #
+@dataclass(frozen=True)
+class Spec:
+    """
+    Mapping from spec labels shown on product page to one output field.
+
+    Attributes
+    ----------
+    name: str
+        Output field name, same as in **models**.
+    labels: tuple[str]
+        Label aliases, the first matching row in page order is taken.
+    pick: int, optional
+        Which matching row to take, **None** if there are not enough rows (default: **0**).
+    join: bool, optional
+        Join all distinct matching rows with comma in page order instead of picking one (default: **False**).
+    post: callable, optional
+        Post-processor applied on picked value, returns **None** when value is unusable (default: **None**).
+    """
+
+    name: str
+    labels: tuple[str, ...]
+    pick: int = 0
+    join: bool = False
+    post: Callable[[str], str | None] | None = None
+
+    def resolve(self, values: list[str]):
+        if not values:
+            return None
+
+        if self.join:
+            return ", ".join(dict.fromkeys(i.strip() for i in values))
+
+        try:
+            value = values[self.pick].strip()
+        except IndexError:
+            return None
+
+        return self.post(value) if self.post else value
+
+
+@dataclass(frozen=True)
+class SpecTable:
+    """
+    Spec mapping of one device type, label aliases are indexed once so spec rows of a product
+    are resolved in a single pass.
+
+    Attributes
+    ----------
+    specs: tuple[Spec]
+        Output fields of the device.
+    """
+
+    specs: tuple[Spec, ...]
+    index: dict[str, tuple[str, ...]] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        index = {}
+        for spec in self.specs:
+            for label in spec.labels:
+                index.setdefault(label, []).append(spec.name)
+        object.__setattr__(self, "index", {i: tuple(j) for i, j in index.items()})
+
+    def parse(self, rows: Iterable[tuple[str, str]]):
+        """
+        Map (label, value) spec rows of a product to output fields, missing fields are **None**.
+        """
+
+        values = {i.name: [] for i in self.specs}
+
+        for label, value in rows:
+            for name in self.index.get(label, ()):
+                values[name].append(value)
+
+        return {i.name: i.resolve(values[i.name]) for i in self.specs}
+
+
+def _split(sep: str, pos: int):
+    def post(value: str):
+        return value.split(sep)[pos].strip()
+
+    return post
+
+
+def _extract(search: str, pattern: str, repl: str, suffix: str = ""):
+    search, pattern = re.compile(search), re.compile(pattern)
+
+    def post(value: str):
+        return pattern.sub(repl, value) + suffix if search.search(value) else None
+
+    return post
+
+
+# ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** #
+CPU = Spec("cpu", ("Công nghệ CPU", "Chip xử lý (CPU)", "CPU"))
+CPU_CORES = Spec("cpu_cores", ("Số nhân",))
+CPU_THREADS = Spec("cpu_threads", ("Số luồng",))
+CPU_SPEED = Spec("cpu_speed", ("Tốc độ CPU",))
+GPU = Spec("gpu", ("Chip đồ hoạ (GPU)", "Chip đồ họa (GPU)", "Card màn hình"))
+RAM = Spec("ram", ("RAM",))
+MAX_RAM = Spec("max_ram", ("Hỗ trợ RAM tối đa",))
+RAM_TYPE = Spec("ram_type", ("Loại RAM",))
+RAM_BUS = Spec("ram_bus", ("Tốc độ Bus RAM",))
+STORAGE = Spec("storage", ("Ổ cứng", "Dung lượng lưu trữ", "Bộ nhớ trong"))
+WEBCAM = Spec("webcam", ("Webcam",))
+REARCAM = Spec("rearcam_specs", ("Độ phân giải camera sau",))
+FRONTCAM = Spec("frontcam_specs", ("Độ phân giải camera trước",))
+SCREEN_TECH = Spec("screen_tech", ("Công nghệ màn hình",))
+SCREEN_TYPE = Spec(
+    "screen_type", ("Chất liệu mặt", "Mặt kính cảm ứng", "Loại màn hình")
+)
+SCREEN_SIZE = Spec(
+    "screen_size", ("Kích thước màn hình", "Màn hình rộng"), post=_split("-", 0)
+)
+SCREEN_PANEL = Spec("screen_panel", ("Công nghệ màn hình",))
+SCREEN_RES = Spec("screen_res", ("Độ phân giải", "Độ phân giải màn hình"))
+SCREEN_RATE = Spec(
+    "screen_rate",
+    ("Màn hình rộng",),
+    post=_extract(r"\d+\.?\d*\s*Hz", r".*?(\d+\.?\d*\s*Hz)", r"\1"),
+)
+SCREEN_NITS = Spec("screen_nits", ("Độ sáng tối đa",))
+OS = Spec("os", ("Hệ điều hành",))
+WATER_RESISTANT = Spec(
+    "water_resistant", ("Chống nước / Kháng nước", "Kháng nước, bụi")
+)
+BATTERY = Spec(
+    "battery", ("Thông tin Pin", "Dung lượng pin", "Thời lượng pin tai nghe")
+)
+CHARGER = Spec("charger", ("Hỗ trợ sạc tối đa",))
+WEIGHT = Spec(
+    "weight",
+    ("Kích thước, khối lượng", "Khối lượng"),
+    post=_extract(
+        r"(.*Nặng\s+)?\d+\.?\d*\s*[g(]",
+        r"(.*Nặng\s+)?(\d+\.?\d*)\s*[g(].*",
+        r"\2",
+        " g",
+    ),
+)
+MATERIAL = Spec("material", ("Chất liệu khung viền", "Chất liệu"))
+CONNECTIVITY = Spec(
+    "connectivity",
+    (
+        "Wifi",
+        "Bluetooth",
+        "Kết nối khác",
+        "Kết nối không dây",
+        "Kết nối",
+        "Công nghệ kết nối",
+    ),
+    join=True,
+)
+NETWORK = Spec("network", ("Mạng di động",))
+PORTS = Spec(
+    "ports",
+    (
+        "Jack tai nghe",
+        "Cổng kết nối/sạc",  # decomposed unicode, must match page text exactly
+        "Cổng giao tiếp",
+        "Cổng sạc",
+        "Jack cắm",
+        "Cổng kết nối",
+    ),
+    join=True,
+)
+SOUND_TECH = Spec("sound_tech", ("Công nghệ âm thanh",))
+COMPATIBLE = Spec("compatible", ("Tương thích",))
+CONTROL = Spec("control", ("Điều khiển",))
+CASE_BATTERY = Spec("case_battery", ("Thời lượng pin hộp sạc",))
+POWER_CONSUMPTION = Spec("power_consumption", ("Công suất tiêu thụ điện",))
+
+# device variants
+REARCAM_TABLET = Spec("rearcam_specs", ("Độ phân giải",), pick=1)
+FRONTCAM_TABLET = Spec("frontcam_specs", ("Độ phân giải",), pick=-1)
+SCREEN_PANEL_DISPLAY = Spec("screen_panel", ("Tấm nền",))  # laptops and screens
+SCREEN_RATE_DISPLAY = Spec("screen_rate", ("Tần số quét",))
+SCREEN_NITS_LAPTOP = Spec(
+    "screen_nits",
+    ("Công nghệ màn hình",),
+    post=_extract(r"\d+\s?nits", r".*?(\d+\s?nits).*", r"\1"),
+)
+WATER_RESISTANT_EARPHONES = Spec(
+    "water_resistant",
+    ("Tiện ích",),
+    post=_extract(r"IP[X0-9]+", r".*?(IP[X0-9]+).*", r"\1"),
+)
+WEIGHT_DISPLAY = Spec(
+    "weight", ("Khối lượng có chân đế", "Kích thước"), post=_split("-", -1)
+)
+
+SPECS = {
+    "phone": SpecTable(
+        (
+            CPU,
+            CPU_SPEED,
+            GPU,
+            RAM,
+            STORAGE,
+            REARCAM,
+            FRONTCAM,
+            SCREEN_TYPE,
+            SCREEN_SIZE,
+            SCREEN_PANEL,
+            SCREEN_RES,
+            SCREEN_RATE,
+            SCREEN_NITS,
+            OS,
+            WATER_RESISTANT,
+            BATTERY,
+            CHARGER,
+            WEIGHT,
+            MATERIAL,
+            CONNECTIVITY,
+            NETWORK,
+            PORTS,
+        )
+    ),
+    "tablet": SpecTable(
+        (
+            CPU,
+            CPU_SPEED,
+            GPU,
+            RAM,
+            STORAGE,
+            REARCAM_TABLET,
+            FRONTCAM_TABLET,
+            SCREEN_SIZE,
+            SCREEN_PANEL,
+            SCREEN_RES,
+            SCREEN_RATE,
+            OS,
+            WATER_RESISTANT,
+            BATTERY,
+            CHARGER,
+            WEIGHT,
+            MATERIAL,
+            CONNECTIVITY,
+            NETWORK,
+            PORTS,
+        )
+    ),
+    "laptop": SpecTable(
+        (
+            CPU,
+            CPU_CORES,
+            CPU_THREADS,
+            CPU_SPEED,
+            GPU,
+            RAM,
+            MAX_RAM,
+            RAM_TYPE,
+            RAM_BUS,
+            STORAGE,
+            WEBCAM,
+            SCREEN_PANEL_DISPLAY,
+            SCREEN_SIZE,
+            SCREEN_TECH,
+            SCREEN_RES,
+            SCREEN_RATE_DISPLAY,
+            SCREEN_NITS_LAPTOP,
+            OS,
+            BATTERY,
+            WEIGHT_DISPLAY,
+            MATERIAL,
+            CONNECTIVITY,
+            PORTS,
+        )
+    ),
+    "watch": SpecTable(
+        (
+            CPU,
+            STORAGE,
+            SCREEN_TYPE,
+            SCREEN_PANEL,
+            SCREEN_SIZE,
+            OS,
+            WATER_RESISTANT,
+            CONNECTIVITY,
+            BATTERY,
+            WEIGHT,
+            MATERIAL,
+        )
+    ),
+    "earphones": SpecTable(
+        (
+            SOUND_TECH,
+            COMPATIBLE,
+            CONTROL,
+            WATER_RESISTANT_EARPHONES,
+            PORTS,
+            CONNECTIVITY,
+            BATTERY,
+            CASE_BATTERY,
+            WEIGHT,
+        )
+    ),
+    "screen": SpecTable(
+        (
+            SCREEN_TYPE,
+            SCREEN_PANEL_DISPLAY,
+            SCREEN_SIZE,
+            SCREEN_TECH,
+            SCREEN_RES,
+            SCREEN_RATE_DISPLAY,
+            POWER_CONSUMPTION,
+            PORTS,
+            WEIGHT_DISPLAY,
+        )
+    ),
+}
+
+
+def parse_specs(rows: Iterable[tuple[str, str]], device: str):
+    """
+    Map (label, value) spec rows of a product page to output fields of given device type.
+    """
+
+    return SPECS[device].parse(rows)
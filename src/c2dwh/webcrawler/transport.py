@@ -0,0 +1,163 @@
+import asyncio, httpx, time, logging
+from collections import Counter
+from . import metrics
+
+try:
+    import h2  # needed by httpx for HTTP/2
+
+    HAS_HTTP2 = True
+except ImportError:
+    HAS_HTTP2 = False
+
+
+# ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** #
+log = logging.getLogger("transport")
+
+
+class Transport:
+    """
+    HTTP connection settings shared by Crawler and Scraper. Every client it makes multiplexes requests over
+    HTTP/2 when the server supports it, keeps connections alive within explicit pool limits, and counts
+    connections opened, TLS handshakes and requests, so connection reuse can be checked.
+
+    Attributes
+    ----------
+    http2: bool, optional
+        Negotiate HTTP/2, needs **h2** package (**httpx[http2]**), falls back to HTTP/1.1 otherwise (default: **True**).
+    max_connections: int, optional
+        Connections open at once, requests beyond it wait for a free one (default: **10**).
+    max_keepalive: int, optional
+        Idle connections kept for reuse, all requests go to one host so this is per host (default: **5**).
+    keepalive_expiry: float, optional
+        Seconds an idle connection is kept (default: **30.0**).
+    """
+
+    def __init__(
+        self,
+        *,
+        http2: bool = True,
+        max_connections: int = 10,
+        max_keepalive: int = 5,
+        keepalive_expiry: float = 30.0,
+        logger: logging.Logger | None = None,
+    ):
+        self.log = log if not logger else logger
+        self.http2 = http2 and HAS_HTTP2
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.connections = 0  # tcp connects
+        self.handshakes = 0  # tls handshakes
+        self.requests = 0
+        self.versions = Counter()  # responses per http version
+
+        if http2 and not HAS_HTTP2:
+            self.log.warning("HTTP/2 needs 'h2' package, falling back to HTTP/1.1.")
+
+    def client(self, **kwargs):
+        """
+        New **httpx.AsyncClient** using this transport, keyword arguments are passed to it.
+        """
+
+        hooks = kwargs.pop("event_hooks", {})
+        if self.http2 and kwargs.get("headers"):
+            # connection-specific headers are refused by HTTP/2, HTTP/1.1 keeps alive by default anyway
+            kwargs["headers"] = {
+                i: j
+                for i, j in dict(kwargs["headers"]).items()
+                if i.lower() != "connection"
+            }
+        return httpx.AsyncClient(
+            http2=self.http2,
+            limits=self.limits,
+            event_hooks={
+                "request": [self.__on_request, *hooks.get("request", [])],
+                "response": [self.__on_response, *hooks.get("response", [])],
+            },
+            **kwargs,
+        )
+
+    async def __on_request(self, request: httpx.Request):
+        request.extensions["trace"] = self.__tracer()
+
+    async def __on_response(self, response: httpx.Response):
+        self.requests += 1
+        self.versions[response.http_version] += 1
+
+    def __tracer(
+        self,
+    ):  # one per request, its httpcore events time connect, tls and ttfb
+        started = dict()
+
+        async def trace(event: str, info: dict):
+            now = time.perf_counter()
+            if event == "connection.connect_tcp.complete":
+                self.connections += 1
+                metrics.observe("connect", now - started.get("connect", now))
+            elif event == "connection.start_tls.complete":
+                self.handshakes += 1
+                metrics.observe("tls", now - started.get("tls", now))
+            elif event == "connection.connect_tcp.started":
+                started["connect"] = now
+            elif event == "connection.start_tls.started":
+                started["tls"] = now
+            elif event.endswith(".send_request_headers.started"):
+                started["ttfb"] = now
+            elif event.endswith(".receive_response_headers.complete"):
+                metrics.observe("ttfb", now - started.get("ttfb", now))
+
+        return trace
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "connections": self.connections,
+            "handshakes": self.handshakes,
+            "reused": max(0, self.requests - self.connections),
+            "versions": dict(self.versions),
+        }
+
+    def summary(self):
+        stats = self.stats()
+        return (
+            f"Requests: {stats['requests']} | Connections: {stats['connections']} | "
+            + f"TLS handshakes: {stats['handshakes']} | Reused: {stats['reused']} | "
+            + " ".join(f"{i}: {j}" for i, j in stats["versions"].items())
+        )
+
+
+_shared = {}  # event loop -> client for fetches without one
+
+
+def shared_client():
+    """
+    Client reused by every fetch given no client in the running event loop, instead of one per URL.
+    Close it with **close_shared_client** before the loop ends, its connections are leaked otherwise.
+    """
+
+    loop = asyncio.get_running_loop()
+
+    for i in [i for i in _shared if i.is_closed()]:  # forget finished loops
+        _shared.pop(i)
+
+    if loop not in _shared or _shared[loop].is_closed:
+        _shared[loop] = Transport(http2=HAS_HTTP2).client(
+            timeout=10.0,
+            headers={
+                "User-Agent": "Mozilla/5.0 (X11; Linux x86_64; rv:141.0) Gecko/20100101 Firefox/141.0",
+                "Connection": "keep-alive",
+            },
+        )
+    return _shared[loop]
+
+
+async def close_shared_client():
+    """
+    Close shared client of the running event loop if any and forget it.
+    """
+
+    client = _shared.pop(asyncio.get_running_loop(), None)
+    if client and not client.is_closed:
+        await client.aclose()
@@ -0,0 +1,179 @@
+import hashlib, math, logging
+from array import array
+from typing import Iterable
+
+
+# ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** #
+log = logging.getLogger("url_set")
+
+
+def fingerprint(url: str):
+    """
+    64-bit fingerprint of URL, never **0** since it marks empty slots.
+    """
+
+    return (
+        int.from_bytes(hashlib.blake2b(url.encode(), digest_size=8).digest(), "little")
+        or 1
+    )
+
+
+class UrlSet:
+    """
+    Compact set of URLs keeping only their 64-bit fingerprints in one open-addressing array, about 16 bytes
+    per URL instead of ~150 for a set of strings. URLs cannot be read back, only counted and tested.
+    Fingerprint collisions are negligible (~n²/2^65) for any crawl size.
+
+    Attributes
+    ----------
+    urls: Iterable[str], optional
+        Initial URLs (default: **()**).
+    capacity: int, optional
+        Expected number of URLs, the table doubles whenever it is two thirds full (default: **1024**).
+    """
+
+    def __init__(self, urls: Iterable[str] = (), *, capacity: int = 1024):
+        self.__capacity = capacity
+        self.__size = 0
+        self.__table = self.__empty(capacity)
+        self.update(urls)
+
+    @staticmethod
+    def __empty(capacity: int):
+        slots = 8
+        while slots * 2 < capacity * 3:
+            slots *= 2
+        return array("Q", bytes(8 * slots))
+
+    def __find(self, fp: int):
+        # slot holding fingerprint or empty slot where it belongs
+        table = self.__table
+        mask = len(table) - 1
+        i = fp & mask
+        while table[i] and table[i] != fp:
+            i = (i + 1) & mask
+        return i
+
+    def __grow(self):
+        old = self.__table
+        self.__table = array("Q", bytes(16 * len(old)))
+        for fp in old:
+            if fp:
+                self.__table[self.__find(fp)] = fp
+
+    def add(self, url: str):
+        """
+        Add URL, return **True** if it was not in the set.
+        """
+
+        fp = fingerprint(url)
+        i = self.__find(fp)
+        if self.__table[i]:
+            return False
+
+        self.__table[i] = fp
+        self.__size += 1
+        if self.__size * 3 > len(self.__table) * 2:
+            self.__grow()
+        return True
+
+    def update(self, urls: Iterable[str]):
+        for url in urls:
+            self.add(url)
+
+    def clear(self):
+        self.__size = 0
+        self.__table = self.__empty(self.__capacity)
+
+    @property
+    def nbytes(self):
+        return self.__table.itemsize * len(self.__table)
+
+    def __contains__(self, url: str):
+        return self.__table[self.__find(fingerprint(url))] != 0
+
+    def __len__(self):
+        return self.__size
+
+    def __iter__(self):
+        log.warning("UrlSet keeps fingerprints only, URLs cannot be read back.")
+        raise TypeError("'UrlSet' object is not iterable")
+
+    def __repr__(self):
+        return f"UrlSet(size={self.__size}, nbytes={self.nbytes})"
+
+
+class BloomFilter:
+    """
+    Probabilistic seen-check of URLs in a fixed bit array, about 1.8 bytes per URL at 0.1% false positives.
+    A false positive makes an unseen URL look seen, so it is skipped; there are no false negatives.
+
+    Attributes
+    ----------
+    capacity: int
+        Expected number of URLs, false positives rise above it.
+    error_rate: float, optional
+        False positive rate at capacity (default: **0.001**).
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        *,
+        error_rate: float = 0.001,
+        logger: logging.Logger | None = None,
+    ):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.log = log if not logger else logger
+
+        bits = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.__bits = bytearray((bits + 7) // 8)
+        self.__hashes = max(1, round(bits / capacity * math.log(2)))
+        self.__size = 0
+
+    def __positions(self, url: str):  # double hashing on halves of the fingerprint
+        fp = fingerprint(url)
+        m = len(self.__bits) * 8
+        h1, h2 = fp & 0xFFFFFFFF, (fp >> 32) | 1
+        return [(h1 + i * h2) % m for i in range(self.__hashes)]
+
+    def add(self, url: str):
+        """
+        Add URL, return **True** if it was not seen before.
+        """
+
+        new = False
+        for i in self.__positions(url):
+            if not self.__bits[i >> 3] & (1 << (i & 7)):
+                self.__bits[i >> 3] |= 1 << (i & 7)
+                new = True
+
+        if new:
+            self.__size += 1
+            if self.__size == self.capacity + 1:
+                self.log.warning(
+                    f"Bloom filter is over its capacity of {self.capacity} urls, false positives will rise."
+                )
+        return new
+
+    def update(self, urls: Iterable[str]):
+        for url in urls:
+            self.add(url)
+
+    def clear(self):
+        self.__size = 0
+        self.__bits = bytearray(len(self.__bits))
+
+    @property
+    def nbytes(self):
+        return len(self.__bits)
+
+    def __contains__(self, url: str):
+        return all(self.__bits[i >> 3] & (1 << (i & 7)) for i in self.__positions(url))
+
+    def __len__(self):  # urls added, approximate
+        return self.__size
+
+    def __repr__(self):
+        return f"BloomFilter(size={self.__size}, nbytes={self.nbytes})"
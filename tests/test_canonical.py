@@ -0,0 +1,52 @@
+from c2dwh.webcrawler import Canonicalizer
+
+
+# ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** #
+def test_scheme_host_port_and_slashes():
+    canonical = Canonicalizer()
+
+    assert (
+        canonical("HTTPS://Shop.Example.COM.:443//laptop//dell/")
+        == "https://shop.example.com/laptop/dell"
+    )
+    assert canonical("http://example.com:8080/") == "http://example.com:8080/"
+    assert canonical("http://example.com") == "http://example.com/"
+
+
+def test_ipv6_keeps_brackets():
+    canonical = Canonicalizer()
+
+    assert canonical("http://[::1]:8765/a/") == "http://[::1]:8765/a"
+    assert canonical("https://[2001:DB8::1]:443/") == "https://[2001:db8::1]/"
+
+
+def test_tracking_params_dropped_and_sorted():
+    canonical = Canonicalizer()
+
+    assert (
+        canonical("https://example.com/p?utm_source=x&b=2&gclid=y&a=1#reviews")
+        == "https://example.com/p?a=1&b=2"
+    )
+
+
+def test_keep_params_whitelist():
+    assert (
+        Canonicalizer(keep_params=("page",))("https://example.com/p?page=2&sort=asc")
+        == "https://example.com/p?page=2"
+    )
+    assert (
+        Canonicalizer(keep_params=())("https://example.com/p?page=2")
+        == "https://example.com/p"
+    )
+
+
+def test_rewrites_and_stats():
+    canonical = Canonicalizer(rewrites=((r"/amp$", ""),))
+
+    assert canonical("https://example.com/p/amp") == "https://example.com/p"
+    assert canonical("https://example.com/q") == "https://example.com/q"
+    assert canonical.stats() == {"urls": 2, "rewritten": 1, "rate": 0.5}
+
+
+def test_malformed_url_is_stripped_only():
+    assert Canonicalizer()(" http://[::1/a ") == "http://[::1/a"
@@ -0,0 +1,69 @@
+import pytest
+from c2dwh.utils import csv_iter
+
+
+# ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** #
+@pytest.fixture
+def path(tmp_path):
+    path = tmp_path / "urls.csv"
+    path.write_text(
+        "url, created_at\n"
+        "https://a.vn/1,2024-01-01\n"
+        "\n"
+        '"https://a.vn/2?x=1,2",2024-01-02\n'
+        '"https://a.vn/3\nnext line",2024-01-03\n'
+        "https://a.vn/4\n",
+        encoding="utf-8",
+    )
+    return path
+
+
+ROWS = [
+    ("https://a.vn/1", "2024-01-01"),
+    ("https://a.vn/2?x=1,2", "2024-01-02"),
+    ("https://a.vn/3\nnext line", "2024-01-03"),
+    ("https://a.vn/4", None),  # short row padded
+]
+
+
+def test_forward(path):
+    assert list(csv_iter(path, row_type="tuple")) == ROWS
+    assert next(csv_iter(path)) == {"url": ROWS[0][0], "created_at": ROWS[0][1]}
+
+
+def test_fields(path):
+    assert list(csv_iter(path, fields="created_at", row_type="tuple")) == [
+        (i[1],) for i in ROWS
+    ]
+    assert list(csv_iter(path, fields=["nope"])) == []
+
+
+def test_reverse(path):
+    assert list(csv_iter(path, row_type="tuple", reverse=True)) == ROWS[::-1]
+
+
+def test_tail(path):
+    assert list(csv_iter(path, row_type="tuple", tail=2)) == ROWS[-2:]
+    assert list(csv_iter(path, row_type="tuple", tail=10)) == ROWS
+
+
+def test_reverse_across_blocks(tmp_path):
+    path = tmp_path / "big.csv"
+    rows = [(f"https://a.vn/{i}", f'"quoted, {i}"') for i in range(3000)]
+    path.write_text(
+        "url,note\n" + "".join(f'{i},"""quoted, {i[13:]}"""\n' for i, _ in rows),
+        encoding="utf-8",
+    )
+
+    assert list(csv_iter(path, row_type="tuple", reverse=True)) == rows[::-1]
+    assert list(csv_iter(path, row_type="tuple", tail=3)) == rows[-3:]
+
+
+def test_empty_missing_and_bad_input(tmp_path):
+    empty = tmp_path / "empty.csv"
+    empty.touch()
+
+    assert list(csv_iter(empty)) == []
+    assert list(csv_iter(tmp_path / "missing.csv")) == []
+    assert list(csv_iter(tmp_path)) == []
+    assert list(csv_iter(empty, row_type="list")) == []
@@ -0,0 +1,76 @@
+import time, pytest
+from c2dwh.utils import QueryCache
+
+
+# ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** #
+QUERIES = {
+    "bare": "select * from phones",
+    "schema": "SELECT * FROM c2dwh_bronze.phones where id = 1",
+    "quoted": 'select * from "c2dwh_bronze"."phones"',
+    "other_schema": "select * from c2dwh_silver.phones",
+    "prefix": "select * from c2dwh_bronze.phones_specs",
+    "suffix": "select * from old_phones",
+    "column": "select phones from c2dwh_bronze.laptops",
+}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = QueryCache(tmp_path / "cache.db")
+    for name, query in QUERIES.items():
+        cache.put(name, query, "c2dwh")
+    yield cache
+    cache.close()
+
+
+def cached(cache: QueryCache):
+    return {i for i, j in QUERIES.items() if cache.get(j, "c2dwh") is not None}
+
+
+def test_get_put_normalized(cache):
+    assert cache.get("select  *\nFROM phones -- comment\n;", "c2dwh") == "bare"
+    assert cache.get("select * from phones", "other") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_expired(tmp_path):
+    cache = QueryCache(tmp_path / "cache.db", ttl=0)
+    cache.put([1], "select 1")
+    time.sleep(0.01)
+
+    assert cache.get("select 1") is None
+
+
+def test_invalidate_schema_qualified_table(cache):
+    cache.invalidate("c2dwh_bronze.phones")
+
+    # whole identifier only, unqualified names may live in the schema too; a column of the same name
+    # cannot be told apart from the table, so its query is dropped as well
+    assert cached(cache) == {"other_schema", "prefix", "suffix"}
+
+
+def test_invalidate_unqualified_table(cache):
+    cache.invalidate("phones")
+
+    assert cached(cache) == {"prefix", "suffix"}
+
+
+def test_invalidate_all(cache):
+    cache.invalidate()
+
+    assert cached(cache) == set()
+
+
+def test_invalidated_at(cache):
+    assert cache.invalidated_at() is None
+    assert cache.reuse_minutes() == 60
+
+    cache.invalidate("c2dwh_bronze.Phones")
+    table = cache.invalidated_at("c2dwh_bronze.phones")
+
+    assert table is not None and cache.invalidated_at() == table
+    assert cache.invalidated_at("c2dwh_bronze.laptops") is None
+    assert cache.reuse_minutes() == 0
+
+    cache.invalidate()
+    assert cache.invalidated_at("c2dwh_bronze.laptops") >= table
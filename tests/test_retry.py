@@ -0,0 +1,57 @@
+import httpx, pytest
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from c2dwh.webcrawler import RetryPolicy
+
+
+# ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** #
+def status_error(status: int, headers: dict | None = None):
+    request = httpx.Request("GET", "https://example.com/")
+    response = httpx.Response(status, headers=headers, request=request)
+    return httpx.HTTPStatusError(f"{status}", request=request, response=response)
+
+
+def test_retry_after_seconds_honoured():
+    policy = RetryPolicy(base_delay=0.01, budget=60)
+
+    assert policy.wait(0, status_error(503, {"Retry-After": "7"}), 0) >= 7
+    assert policy.retries == 1
+
+
+def test_retry_after_http_date_honoured():
+    policy = RetryPolicy(base_delay=0.01, budget=60)
+    date = format_datetime(
+        datetime.now(tz=timezone.utc) + timedelta(seconds=30), usegmt=True
+    )
+
+    assert policy.wait(0, status_error(429, {"Retry-After": date}), 0) == pytest.approx(
+        30, abs=2
+    )
+
+
+def test_retry_after_past_budget_gives_up():
+    policy = RetryPolicy(budget=10)
+
+    assert policy.wait(0, status_error(503, {"Retry-After": "120"}), 0) is None
+    assert policy.gave_up["http_503"] == 1
+    assert policy.retries == 0
+
+
+def test_backoff_within_ceiling():
+    policy = RetryPolicy(attempts=10, base_delay=1, max_delay=4)
+
+    for attempt in range(8):
+        assert 0 <= policy.wait(attempt, httpx.ConnectTimeout("timeout"), 0) <= 4
+
+
+def test_gives_up_on_last_attempt_and_bad_status():
+    policy = RetryPolicy(attempts=2)
+
+    assert policy.wait(1, httpx.ConnectError("refused"), 0) is None
+    assert policy.wait(0, status_error(404), 0) is None
+    assert policy.wait(0, ValueError("parse"), 0) is None
+    assert policy.stats() == {
+        "retries": 0,
+        "failures": {"ConnectError": 1, "http_404": 1, "ValueError": 1},
+        "gave_up": {"ConnectError": 1, "http_404": 1, "ValueError": 1},
+    }
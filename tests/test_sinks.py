@@ -0,0 +1,91 @@
+import pytest, pyarrow.parquet as pq
+from datetime import datetime
+from c2dwh.utils import CsvSink, ParquetSink, csv_iter
+
+
+# ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** ********** #
+def test_csv_sink_writes_header_once_and_appends(tmp_path):
+    path = tmp_path / "out.csv"
+
+    with CsvSink(batch_size=2) as sink:
+        for i in range(5):
+            sink.write({"url": f"https://a.vn/{i}", "price": i}, path=path)
+    assert sink.written == 5
+
+    with CsvSink() as sink:
+        sink.write({"url": "https://a.vn/5", "price": 5}, path=path)
+
+    assert list(csv_iter(path, row_type="tuple")) == [
+        (f"https://a.vn/{i}", str(i)) for i in range(6)
+    ]
+
+
+def test_csv_sink_overwrite(tmp_path):
+    path = tmp_path / "out.csv"
+    path.write_text("old\nrow\n")
+
+    with CsvSink() as sink:
+        sink.write({"url": "https://a.vn/1"}, path=path, overwrite=True)
+        sink.write({"url": "https://a.vn/2"}, path=path, overwrite=True)
+
+    assert path.read_text().splitlines() == ["url", "https://a.vn/1", "https://a.vn/2"]
+
+
+def test_sink_reports_write_time(tmp_path):
+    calls = []
+
+    with CsvSink(on_write=lambda name, seconds: calls.append((name, seconds))) as sink:
+        sink.write({"url": "https://a.vn/1"}, path=tmp_path / "out.csv")
+
+    assert [i for i, _ in calls] == ["write"] and calls[0][1] >= 0
+
+
+def test_sink_rejects_wrong_suffix_and_closed_writes(tmp_path):
+    sink = CsvSink()
+    sink.write({"url": "https://a.vn/1"}, path=tmp_path / "out.txt")
+    sink.close()
+    sink.write({"url": "https://a.vn/2"}, path=tmp_path / "out.csv")
+    sink.close()
+
+    assert sink.written == 0
+    assert not (tmp_path / "out.txt").exists()
+    assert not (tmp_path / "out.csv").exists()
+
+
+def test_parquet_sink_types_and_bad_values(tmp_path):
+    path = tmp_path / "out.parquet"
+    types = {"id": int, "price": float, "crawled_at": datetime, "name": str}
+
+    with ParquetSink(batch_size=2) as sink:
+        sink.write(
+            {"id": "1", "price": "9.5", "crawled_at": "2024-01-01 10:00:00", "name": 1},
+            path=path,
+            types=types,
+        )
+        sink.write(
+            {"id": "x", "price": "", "crawled_at": "not a date", "name": "b"},
+            path=path,
+            types=types,
+        )
+        sink.write({"id": 3, "price": 1, "crawled_at": None, "name": None}, path=path)
+
+    table = pq.read_table(path)
+
+    assert str(table.schema.field("id").type) == "int64"
+    assert str(table.schema.field("crawled_at").type) == "timestamp[ms]"
+    assert table.to_pylist() == [
+        {"id": 1, "price": 9.5, "crawled_at": datetime(2024, 1, 1, 10), "name": "1"},
+        {"id": None, "price": None, "crawled_at": None, "name": "b"},
+        {"id": 3, "price": 1.0, "crawled_at": None, "name": None},
+    ]
+
+
+def test_abort_drops_buffered_rows(tmp_path):
+    path = tmp_path / "out.csv"
+
+    sink = CsvSink(batch_size=100, flush_interval=60)
+    sink.write({"url": "https://a.vn/1"}, path=path)
+    sink.close(abort=True)
+
+    assert sink.written == 0
+    assert not path.exists()